@@ -1,6 +1,17 @@
+import io
+
+from django.core.exceptions import PermissionDenied
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
-from .models import User
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .forms import ImportarUsuariosForm
+from .importacao import importar_usuarios
+from .models import Tarefa, User
+from .replicas import marcar_escrita
+from .tarefas import resumo_fila
 
 
 @admin.register(User)
@@ -14,3 +25,65 @@ class UserAdmin(DjangoUserAdmin):
     list_display = ("username", "nome_completo", "email", "tipo", "is_active")
     search_fields = ("username", "nome_completo", "email", "matricula")
     list_filter = ("tipo", "is_active", "date_joined")
+    change_list_template = "admin/core/user/change_list.html"
+
+    def get_urls(self):
+        return [
+            path(
+                "importar/",
+                self.admin_site.admin_view(self.importar_view),
+                name="core_user_importar",
+            ),
+        ] + super().get_urls()
+
+    def importar_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        resultado = None
+        if request.method == "POST":
+            form = ImportarUsuariosForm(request.POST, request.FILES)
+            if form.is_valid():
+                arquivo = io.TextIOWrapper(
+                    form.cleaned_data["arquivo"].file, encoding="utf-8-sig", newline=""
+                )
+                resultado = importar_usuarios(arquivo, tipo_padrao=form.cleaned_data["tipo"])
+        else:
+            form = ImportarUsuariosForm()
+
+        contexto = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Importar usuários",
+            "form": form,
+            "resultado": resultado,
+        }
+        return TemplateResponse(request, "admin/core/user/importar.html", contexto)
+
+
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    list_display = ("id", "nome", "status", "tentativas", "executar_em", "concluida_em", "worker")
+    list_filter = ("status", "nome")
+    search_fields = ("nome",)
+    readonly_fields = ("criada_em", "iniciada_em", "concluida_em", "worker", "erro")
+    actions = ["reenfileirar"]
+    change_list_template = "admin/core/tarefa/change_list.html"
+
+    @admin.action(description="Colocar de volta na fila")
+    def reenfileirar(self, request, queryset):
+        total = queryset.exclude(status=Tarefa.Status.EXECUTANDO).update(
+            status=Tarefa.Status.PENDENTE, tentativas=0, executar_em=timezone.now(), erro=""
+        )
+        marcar_escrita()
+        self.message_user(request, f"{total} tarefas colocadas de volta na fila.")
+
+    def changelist_view(self, request, extra_context=None):
+        fila = resumo_fila()
+        extra_context = {
+            **(extra_context or {}),
+            "fila_por_status": [
+                (Tarefa.Status(status).label, total) for status, total in fila["por_status"].items()
+            ],
+            "pendente_desde": fila["pendente_desde"],
+        }
+        return super().changelist_view(request, extra_context)
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # registra as tarefas em segundo plano (core.tarefas) de cada app
+        autodiscover_modules("tarefas")
+        from . import autenticacao  # noqa: F401  (sinais que limpam o usuário em cache)
+        from . import replicas  # noqa: F401  (sinais que marcam a requisição que escreveu)
@@ -0,0 +1,52 @@
+"""Apoio às views assíncronas (servidas por ASGI, ``gestao_tcc/asgi.py``).
+
+* ``em_paralelo(*funcoes)``: roda funções síncronas (consultas do ORM) ao
+  mesmo tempo, cada uma numa thread com sua própria conexão. O ORM
+  assíncrono do Django (``afirst``, ``async for``...) executa todas as
+  consultas de uma requisição na mesma thread, uma depois da outra: serve
+  para não bloquear o event loop, mas não para paralelizar.
+* ``adaptar_fluxo(request, resposta)``: em ASGI o Django lê um iterador
+  síncrono de ``StreamingHttpResponse``/``FileResponse`` inteiro para a
+  memória antes de enviar; esta função troca o conteúdo por um iterador
+  assíncrono que lê um bloco de cada vez. Se o iterador consulta o banco
+  (``QuerySet.iterator()``), os blocos são gerados na thread da requisição,
+  a mesma da view síncrona, dona da conexão e do cursor aberto.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+from .profiling import medir_conexoes
+
+
+def _isolada(funcao):
+    def rodar():
+        try:
+            # a thread é do pool do event loop: a medição da requisição é instalada nela
+            with medir_conexoes():
+                return funcao()
+        finally:
+            close_old_connections()
+
+    return sync_to_async(rodar, thread_sensitive=False)
+
+
+async def em_paralelo(*funcoes):
+    """Resultados de ``funcoes`` (sem argumentos), na mesma ordem."""
+    return await asyncio.gather(*(_isolada(funcao)() for funcao in funcoes))
+
+
+async def _blocos(iterador, thread_sensitive):
+    proximo = sync_to_async(next, thread_sensitive=thread_sensitive)
+    fim = object()
+    while (bloco := await proximo(iterador, fim)) is not fim:
+        yield bloco
+
+
+def adaptar_fluxo(request, resposta, usa_banco=False):
+    if isinstance(request, ASGIRequest) and resposta.streaming and not resposta.is_async:
+        # os recursos (o arquivo aberto) continuam em _resource_closers e fecham no fim
+        resposta.streaming_content = _blocos(iter(resposta.streaming_content), usa_banco)
+    return resposta
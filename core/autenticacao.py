@@ -0,0 +1,133 @@
+"""Usuário autenticado lido do cache, sem consulta ao banco a cada requisição.
+
+``AuthenticationMiddleware`` (no lugar do de ``django.contrib.auth``) guarda
+no cache só os campos do usuário que as páginas usam o tempo todo, mais o
+hash de sessão (derivado da senha). Num acerto, ``request.user`` é montado
+com esses campos e o resto fica adiado: um campo fora da lista é buscado no
+banco só se for lido. Numa falha, se o hash não bater ou se o usuário estiver
+inativo, vale o caminho normal do Django (``auth.get_user``), que também
+encerra sessões inválidas.
+
+Cada usuário tem uma versão no cache, trocada (após o commit) quando ele é
+salvo, troca de senha inclusive, ou excluído. A entrada guarda a versão lida
+antes de ir ao banco e só vale enquanto ela for a atual, então um worker que
+leu o usuário antes da alteração não consegue gravar dados velhos por cima.
+``USUARIO_CACHE_TIMEOUT`` limita o quanto ela pode ficar desatualizada depois
+de um ``update()`` em massa, que não dispara sinais.
+
+Como o cache de páginas, depende de um backend compartilhado pelos workers
+(ver ``core.cache``): com o ``locmem`` o usuário vem sempre do banco.
+
+``request.user`` e ``await request.auser()`` (views assíncronas) carregam o
+usuário uma vez só por requisição.
+"""
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import middleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .cache import CACHE_ALIAS, compartilhado
+from .models import User
+
+# a senha fica de fora: o admin, que a consulta, busca só ela no banco
+CAMPOS = (
+    "id", "username", "first_name", "last_name", "tipo", "nome_completo",
+    "is_active", "is_staff", "is_superuser",
+)
+TIMEOUT = getattr(settings, "USUARIO_CACHE_TIMEOUT", 300)
+
+
+def _chave(user_id):
+    return f"auth:usuario:{user_id}"
+
+
+def _chave_versao(user_id):
+    return f"auth:versao:{user_id}"
+
+
+def _nova_versao(user_id):
+    caches[CACHE_ALIAS].set(_chave_versao(user_id), time.time_ns(), None)
+
+
+def _carregar(request):
+    try:
+        user_id = request.session[auth.SESSION_KEY]
+        backend = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+
+    if not compartilhado():
+        # a troca de versão feita num worker não chegaria aos outros
+        return auth.get_user(request)
+
+    cache = caches[CACHE_ALIAS]
+    valores = cache.get_many([_chave(user_id), _chave_versao(user_id)])
+    dados, versao = valores.get(_chave(user_id)), valores.get(_chave_versao(user_id))
+    hash_sessao = request.session.get(auth.HASH_SESSION_KEY)
+    if (
+        dados
+        and versao is not None
+        and dados["versao"] == versao
+        and dados["is_active"]
+        and dados["backend"] == backend
+        and constant_time_compare(hash_sessao, dados["hash"])
+    ):
+        # from_db espera os valores na ordem dos campos do model
+        campos = [f.attname for f in User._meta.concrete_fields if f.attname in CAMPOS]
+        return User.from_db(DEFAULT_DB_ALIAS, campos, [dados[campo] for campo in campos])
+
+    if versao is None:
+        versao = time.time_ns()
+        if not cache.add(_chave_versao(user_id), versao, None):
+            versao = cache.get(_chave_versao(user_id))
+
+    user = auth.get_user(request)
+    # dentro de uma transação o usuário lido pode não ser o que vai ficar
+    if user.is_authenticated and not transaction.get_connection().in_atomic_block:
+        dados = {campo: getattr(user, campo) for campo in CAMPOS}
+        dados["backend"] = backend
+        dados["hash"] = user.get_session_auth_hash()
+        dados["versao"] = versao
+        cache.set(_chave(user.pk), dados, TIMEOUT)
+    return user
+
+
+def _usuario(request):
+    if not hasattr(request, "_usuario_carregado"):
+        request._usuario_carregado = _carregar(request)
+    return request._usuario_carregado
+
+
+async def _ausuario(request):
+    # a sessão e o usuário podem vir do banco: fora do event loop
+    return await sync_to_async(_usuario)(request)
+
+
+class AuthenticationMiddleware(middleware.AuthenticationMiddleware):
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _usuario(request))
+        request.auser = partial(_ausuario, request)
+
+
+@receiver(post_save, sender=User)
+def _usuario_salvo(sender, instance, update_fields=None, **kwargs):
+    # o login só atualiza last_login, que não está no cache
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    transaction.on_commit(partial(_nova_versao, instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def _usuario_excluido(sender, instance, **kwargs):
+    transaction.on_commit(partial(_nova_versao, instance.pk))
@@ -0,0 +1,171 @@
+"""Cache de páginas por usuário com invalidação por contadores de geração.
+
+Cada valor em cache depende de um ou mais *escopos* (``"usuario:12"``,
+``"orientadores"``, ``"global"``). Cada escopo tem um número de geração
+guardado no próprio cache, e a chave do valor inclui as gerações vigentes.
+Invalidar um escopo é só trocar sua geração: as chaves antigas deixam de ser
+lidas e expiram sozinhas. Os escopos são invalidados em ``tcc.signals``.
+
+As gerações precisam ser vistas por todos os processos: com vários workers o
+backend tem de ser compartilhado (``file`` numa máquina, Redis/Memcached em
+várias). Com o ``LocMemCache``, de cada processo, uma invalidação feita num
+worker não chegaria aos outros, então o cache de páginas fica desligado.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = getattr(settings, "TCC_CACHE_ALIAS", "default")
+CACHE_TIMEOUT = getattr(settings, "TCC_CACHE_TIMEOUT", 300)
+
+_AUSENTE = object()
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def compartilhado():
+    """Se o backend de cache é o mesmo para todos os processos (não ``locmem``)."""
+    return not isinstance(_cache(), LocMemCache)
+
+
+def _chave_geracao(escopo):
+    return f"tcc:gen:{escopo}"
+
+
+def _nova_geracao():
+    # valor inédito mesmo se a chave da geração tiver sido descartada pelo cache
+    return time.time_ns()
+
+
+def _completar_geracoes(chaves, atuais):
+    faltando = {c: _nova_geracao() for c in chaves if c not in atuais}
+    atuais.update(faltando)
+    return faltando, [atuais[c] for c in chaves]
+
+
+def geracoes(escopos):
+    cache = _cache()
+    chaves = [_chave_geracao(e) for e in escopos]
+    faltando, valores = _completar_geracoes(chaves, cache.get_many(chaves))
+    if faltando:
+        cache.set_many(faltando, None)
+    return valores
+
+
+async def ageracoes(escopos):
+    cache = _cache()
+    chaves = [_chave_geracao(e) for e in escopos]
+    faltando, valores = _completar_geracoes(chaves, await cache.aget_many(chaves))
+    if faltando:
+        await cache.aset_many(faltando, None)
+    return valores
+
+
+def invalidar(*escopos):
+    """Troca a geração dos escopos, após o commit da transação corrente."""
+    escopos = {e for e in escopos if e}
+    if not escopos:
+        return
+
+    def _trocar():
+        _cache().set_many({_chave_geracao(e): _nova_geracao() for e in escopos}, None)
+
+    transaction.on_commit(_trocar)
+
+
+def escopo_usuario(user_id):
+    return f"usuario:{user_id}" if user_id else None
+
+
+def _chave_metrica(nome, resultado):
+    return f"tcc:metricas:{nome}:{resultado}"
+
+
+def _registrar(nome, resultado):
+    cache = _cache()
+    chave = _chave_metrica(nome, resultado)
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.add(chave, 1, None)
+
+
+async def _aregistrar(nome, resultado):
+    cache = _cache()
+    chave = _chave_metrica(nome, resultado)
+    try:
+        await cache.aincr(chave)
+    except ValueError:
+        await cache.aadd(chave, 1, None)
+
+
+def _chave_pagina(nome, gens, user, extra):
+    partes = [nome]
+    if user is not None:
+        partes += [str(user.pk), getattr(user, "tipo", "")]
+    if extra:
+        partes.append(extra)
+    partes += [str(g) for g in gens]
+    return "tcc:pagina:" + ":".join(partes)
+
+
+def obter_ou_calcular(nome, escopos, calcular, user=None, extra=""):
+    """Devolve o valor em cache para ``nome`` ou chama ``calcular()`` e o guarda.
+
+    Com ``user`` a chave inclui o usuário e seu tipo, para valores que
+    dependem de quem está vendo a página. Sem um cache compartilhado, só calcula.
+    """
+    if not compartilhado():
+        return calcular()
+    chave = _chave_pagina(nome, geracoes(escopos), user, extra)
+    cache = _cache()
+    valor = cache.get(chave, _AUSENTE)
+    if valor is not _AUSENTE:
+        _registrar(nome, "hit")
+        return valor
+
+    _registrar(nome, "miss")
+    logger.debug("cache miss: %s", chave)
+    valor = calcular()
+    cache.set(chave, valor, CACHE_TIMEOUT)
+    return valor
+
+
+async def aobter_ou_calcular(nome, escopos, acalcular, user=None, extra=""):
+    """``obter_ou_calcular`` para views assíncronas: ``acalcular`` é uma corrotina."""
+    if not compartilhado():
+        return await acalcular()
+    chave = _chave_pagina(nome, await ageracoes(escopos), user, extra)
+    cache = _cache()
+    valor = await cache.aget(chave, _AUSENTE)
+    if valor is not _AUSENTE:
+        await _aregistrar(nome, "hit")
+        return valor
+
+    await _aregistrar(nome, "miss")
+    logger.debug("cache miss: %s", chave)
+    valor = await acalcular()
+    await cache.aset(chave, valor, CACHE_TIMEOUT)
+    return valor
+
+
+def metricas(nomes):
+    """Contagem de hits e misses por nome, ex.: ``{"dashboard": {"hit": 10, "miss": 2}}``."""
+    chaves = {
+        _chave_metrica(nome, resultado): (nome, resultado)
+        for nome in nomes
+        for resultado in ("hit", "miss")
+    }
+    valores = _cache().get_many(list(chaves))
+    resultado = {nome: {"hit": 0, "miss": 0} for nome in nomes}
+    for chave, (nome, tipo) in chaves.items():
+        resultado[nome][tipo] = valores.get(chave, 0)
+    return resultado
@@ -0,0 +1,93 @@
+"""GET condicional (ETag e Last-Modified) para as páginas de temas e entregas.
+
+``@condicional(versao)``: ``versao(request, *args, **kwargs)`` devolve um
+dicionário que muda sempre que a página mudaria. Em geral vem de uma única
+consulta, ``MAX(atualizado_em)`` e ``COUNT`` das linhas que o usuário vê (o
+``COUNT`` percebe exclusões, que não mudam o máximo); ver
+``TemaTCCQuerySet.versao()``. O ETag junta esse dicionário, o usuário e as
+gerações do seu escopo de cache (``core.cache``), que mudam quando o nome
+de alguém que aparece na página muda.
+
+Se o navegador já tem essa versão, a resposta é ``304`` antes de a view
+rodar: nenhuma consulta da página, nenhum template. A resposta vai com
+``Cache-Control: private, no-cache``, para o navegador sempre perguntar.
+Funciona com views síncronas e assíncronas; nas assíncronas, ``versao``
+(síncrona, com o ORM) roda numa thread.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+from .cache import escopo_usuario, geracoes
+from .models import User
+
+
+def _escopos(user):
+    return ["global"] if user.tipo == User.TipoUsuario.ADMIN else [escopo_usuario(user.pk)]
+
+
+def _validadores(request, versao, args, kwargs):
+    """``(etag, última modificação)`` da página, ou ``None`` se ela não é condicional."""
+    # mensagens pendentes só aparecem se a página for renderizada de novo
+    if (
+        request.method not in ("GET", "HEAD")
+        or not request.user.is_authenticated
+        or len(get_messages(request))
+    ):
+        return None
+
+    user = request.user
+    dados = versao(request, *args, **kwargs)
+    chave = repr(
+        [user.pk, user.tipo, user.nome_completo, sorted(dados.items()), geracoes(_escopos(user))]
+    )
+    etag = quote_etag(hashlib.md5(chave.encode(), usedforsecurity=False).hexdigest())
+    datas = [v for v in dados.values() if isinstance(v, datetime.datetime)]
+    return etag, int(max(datas).timestamp()) if datas else None
+
+
+def _marcar(resposta, etag, ultima):
+    if resposta.status_code == 200:
+        resposta.headers.setdefault("ETag", etag)
+        if ultima and not resposta.has_header("Last-Modified"):
+            resposta["Last-Modified"] = http_date(ultima)
+    patch_cache_control(resposta, private=True, no_cache=True)
+    return resposta
+
+
+def condicional(versao):
+    def decorar(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def interna(request, *args, **kwargs):
+                validadores = await sync_to_async(_validadores)(request, versao, args, kwargs)
+                if validadores is None:
+                    return await view(request, *args, **kwargs)
+                etag, ultima = validadores
+                resposta = get_conditional_response(request, etag=etag, last_modified=ultima)
+                if resposta is None:
+                    resposta = await view(request, *args, **kwargs)
+                return _marcar(resposta, etag, ultima)
+
+        else:
+
+            @wraps(view)
+            def interna(request, *args, **kwargs):
+                validadores = _validadores(request, versao, args, kwargs)
+                if validadores is None:
+                    return view(request, *args, **kwargs)
+                etag, ultima = validadores
+                resposta = get_conditional_response(request, etag=etag, last_modified=ultima)
+                if resposta is None:
+                    resposta = view(request, *args, **kwargs)
+                return _marcar(resposta, etag, ultima)
+
+        return interna
+
+    return decorar
@@ -0,0 +1,192 @@
+"""Arquivos estáticos: pacotes de CSS, nomes com hash, pré-compressão e serviço.
+
+No ``collectstatic``, ``ArmazenamentoEstatico``:
+
+1. junta e minifica os CSS de cada pacote de ``PACOTES_CSS``
+   (``{"css/app.css": ["css/variables.css", "css/style.css"]}``);
+2. dá nome com hash do conteúdo a todos os arquivos (``ManifestStaticFilesStorage``);
+3. grava ao lado de cada arquivo de texto as versões ``.gz`` e, se o pacote
+   ``brotli`` estiver instalado, ``.br``.
+
+``EstaticosMiddleware`` serve o ``STATIC_ROOT`` pelo próprio processo
+(``SERVIR_ESTATICOS``): escolhe a versão comprimida conforme o
+``Accept-Encoding`` e marca os arquivos com hash como ``immutable``, para o
+navegador não voltar a pedi-los. Em desenvolvimento (``DEBUG``), o
+``runserver`` continua servindo os originais e ``{% css_pacote %}`` inclui os
+arquivos do pacote um a um.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .assincrono import adaptar_fluxo
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele, só gzip
+    brotli = None
+
+COMPRIMIVEIS = {".css", ".js", ".svg", ".txt", ".json", ".map", ".html", ".xml", ".ico"}
+TAMANHO_MINIMO = 256  # bytes; abaixo disso a compressão não compensa o cabeçalho
+IMUTAVEL = "public, max-age=31536000, immutable"
+
+
+def pacotes():
+    return getattr(settings, "PACOTES_CSS", {})
+
+
+# MINIFICAÇÃO
+
+_STRINGS = r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""
+# comentários só fora das strings: as strings são casadas antes
+_COMENTARIOS = re.compile(_STRINGS + r"|/\*.*?\*/", re.S)
+_ESPACOS = re.compile(r"\s+")
+_EM_VOLTA = re.compile(r"\s*([{};,>])\s*")
+
+
+def _minificar_trecho(trecho):
+    trecho = _ESPACOS.sub(" ", trecho)
+    trecho = _EM_VOLTA.sub(r"\1", trecho)
+    return trecho.replace(";}", "}")
+
+
+def minificar_css(css):
+    css = _COMENTARIOS.sub(lambda m: m.group(1) or "", css)
+    # com o grupo de captura, as strings ficam nas posições ímpares e não são alteradas
+    partes = re.split(_STRINGS, css)
+    return "".join(
+        parte if i % 2 else _minificar_trecho(parte) for i, parte in enumerate(partes)
+    ).strip()
+
+
+# COLLECTSTATIC
+
+
+class ArmazenamentoEstatico(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for nome, fontes in pacotes().items():
+                self._montar_pacote(nome, fontes, paths)
+                paths[nome] = (self, nome)
+
+        yield from super().post_process(paths, dry_run, **options)
+
+        if not dry_run:
+            for nome in set(self.hashed_files.values()):
+                self._comprimir(nome)
+
+    def _montar_pacote(self, nome, fontes, paths):
+        conteudos = []
+        for fonte in fontes:
+            if fonte not in paths:
+                raise ValueError(f"Arquivo do pacote {nome} não encontrado: {fonte}")
+            storage, caminho = paths[fonte]
+            with storage.open(caminho) as arquivo:
+                conteudos.append(arquivo.read().decode("utf-8"))
+        self._gravar(nome, minificar_css("\n".join(conteudos)).encode("utf-8"))
+
+    def _comprimir(self, nome):
+        if os.path.splitext(nome)[1] not in COMPRIMIVEIS:
+            return
+        with self.open(nome) as arquivo:
+            dados = arquivo.read()
+        if len(dados) < TAMANHO_MINIMO:
+            return
+        versoes = {".gz": gzip.compress(dados, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            versoes[".br"] = brotli.compress(dados)
+        for extensao, comprimido in versoes.items():
+            if len(comprimido) < len(dados) * 0.95:
+                self._gravar(nome + extensao, comprimido)
+
+    def _gravar(self, nome, dados):
+        if self.exists(nome):
+            self.delete(nome)
+        self._save(nome, ContentFile(dados))
+
+
+# SERVIÇO
+
+
+def _aceita(cabecalho, codificacao):
+    for item in cabecalho.split(","):
+        valor, _, parametros = item.partition(";")
+        if valor.strip().lower() == codificacao:
+            return parametros.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class EstaticosMiddleware:
+    """Deve ser o primeiro: estáticos não precisam de sessão, usuário nem medição."""
+
+    CODIFICACOES = (("br", ".br"), ("gzip", ".gz"))
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.ativo = getattr(settings, "SERVIR_ESTATICOS", False) and settings.STATIC_ROOT
+        self.prefixo = "/" + settings.STATIC_URL.lstrip("/")
+        # nomes com hash (do manifesto): o conteúdo de um nome nunca muda
+        self.imutaveis = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        resposta = self._estatico(request)
+        if resposta is not None:
+            return resposta
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        resposta = self._estatico(request)
+        if resposta is not None:
+            return adaptar_fluxo(request, resposta)
+        return await self.get_response(request)
+
+    def _estatico(self, request):
+        if self.ativo and request.method in ("GET", "HEAD") and request.path.startswith(self.prefixo):
+            return self.servir(request, request.path[len(self.prefixo):])
+        return None
+
+    def servir(self, request, nome):
+        try:
+            caminho = safe_join(settings.STATIC_ROOT, nome)
+        except SuspiciousFileOperation:
+            return None
+        if not nome or not os.path.isfile(caminho):
+            return None
+
+        estado = os.stat(caminho)
+        if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), estado.st_mtime):
+            resposta = HttpResponseNotModified()
+        else:
+            tipo, _ = mimetypes.guess_type(nome)
+            aceitas = request.headers.get("Accept-Encoding", "")
+            codificacao = None
+            for candidata, extensao in self.CODIFICACOES:
+                if _aceita(aceitas, candidata) and os.path.isfile(caminho + extensao):
+                    caminho += extensao
+                    codificacao = candidata
+                    break
+            resposta = FileResponse(open(caminho, "rb"), content_type=tipo or "application/octet-stream")
+            if codificacao:
+                resposta["Content-Encoding"] = codificacao
+            resposta["Last-Modified"] = http_date(estado.st_mtime)
+
+        resposta["Vary"] = "Accept-Encoding"
+        resposta["Cache-Control"] = IMUTAVEL if nome in self.imutaveis else "public, max-age=60"
+        return resposta
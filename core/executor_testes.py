@@ -0,0 +1,39 @@
+"""Executor dos testes (``TEST_RUNNER``), com os ajustes que valem para a suíte toda.
+
+* ``PERF_ORCAMENTO_ESTRITO``: uma view acima do seu orçamento de consultas
+  (``core.profiling``) levanta ``OrcamentoExcedido`` e o teste falha;
+* a linha JSON de cada requisição (``core.profiling``, INFO) fica fora da
+  saída dos testes; avisos e consultas lentas continuam aparecendo;
+* ``LocMemCache``: nada é lido nem gravado no cache de arquivos do
+  desenvolvimento, e o cache de páginas e o do usuário ficam desligados
+  (``core.cache.compartilhado``), então cada requisição faz todas as suas
+  consultas;
+* estáticos sem manifesto: os testes rodam sem ``collectstatic``.
+"""
+import logging
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class ExecutorTestes(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._ajustes = override_settings(
+            PERF_ORCAMENTO_ESTRITO=True,
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        )
+        self._ajustes.enable()
+        logger = logging.getLogger("core.profiling")
+        self._nivel_log = logger.level
+        logger.setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        logging.getLogger("core.profiling").setLevel(self._nivel_log)
+        self._ajustes.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,9 +1,35 @@
 from django import forms
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import BaseUserCreationForm
+from django.db import IntegrityError
 from .models import User
 
+# campo do cadastro -> (trechos que identificam a restrição no erro do banco,
+# mensagem). O SQLite cita a coluna ("core_user.matricula") ou o índice
+# ("core_user_email_unico"); o PostgreSQL, o nome da restrição.
+UNICOS_CADASTRO = {
+    "username": (("core_user.username", "core_user_username_"), "Já existe um usuário com este nome de usuário."),
+    "email": (("core_user.email", "core_user_email_"), "Já existe um usuário com este e-mail."),
+    "matricula": (("core_user.matricula", "core_user_matricula_"), "Já existe um aluno com esta matrícula."),
+}
+
+
+def campo_repetido(erro):
+    """Campo de ``UNICOS_CADASTRO`` cuja restrição causou o ``IntegrityError``, ou None."""
+    mensagem = str(erro).splitlines()[0] if str(erro) else ""
+    for campo, (trechos, _) in UNICOS_CADASTRO.items():
+        if any(trecho in mensagem for trecho in trechos):
+            return campo
+    return None
+
+
+class AlunoRegisterForm(BaseUserCreationForm):
+    """Cadastro de aluno com um único INSERT.
+
+    Nome de usuário, e-mail e matrícula não são consultados antes de gravar:
+    as restrições únicas de ``User`` decidem (sem corrida entre dois cadastros
+    simultâneos) e o ``IntegrityError`` vira o erro do campo em ``save()``.
+    """
 
-class AlunoRegisterForm(UserCreationForm):
     class Meta:
         model = User
         fields = [
@@ -15,22 +41,29 @@ class AlunoRegisterForm(UserCreationForm):
             "password2",
         ]
 
+    def clean_username(self):
+        username = self.cleaned_data.get("username")
+        # fora do full_clean() do modelo (ver _get_validation_exclusions)
+        User._meta.get_field("username").run_validators(username)
+        return username
+
     def clean_email(self):
         email = self.cleaned_data.get("email")
         if not email:
             raise forms.ValidationError("E-mail é obrigatório.")
-        if User.objects.filter(email__iexact=email).exists():
-            raise forms.ValidationError("Já existe um usuário com este e-mail.")
         return email
 
     def clean_matricula(self):
         matricula = self.cleaned_data.get("matricula")
         if not matricula:
             raise forms.ValidationError("Matrícula é obrigatória para alunos.")
-        if User.objects.filter(matricula=matricula).exists():
-            raise forms.ValidationError("Já existe um aluno com esta matrícula.")
         return matricula
 
+    def _get_validation_exclusions(self):
+        # sem as consultas de unicidade de validate_unique() e validate_constraints():
+        # o banco confere ao gravar (ver save)
+        return super()._get_validation_exclusions() | set(UNICOS_CADASTRO)
+
     def clean(self):
         cleaned_data = super().clean()
         password1 = cleaned_data.get("password1")
@@ -43,13 +76,21 @@ class AlunoRegisterForm(UserCreationForm):
         return cleaned_data
 
     def save(self, commit=True):
+        """Grava o aluno; se outro cadastro já usa o username, o e-mail ou a
+        matrícula, marca o campo no formulário e relança o ``IntegrityError``."""
         user = super().save(commit=False)
         user.tipo = User.TipoUsuario.ALUNO
         if commit:
-            user.full_clean()  # Chamar full_clean antes de salvar
-            user.save()
+            try:
+                user.save()  # User.save() usa um savepoint: a transação externa segue válida
+            except IntegrityError as e:
+                campo = campo_repetido(e)
+                if campo is None:
+                    raise
+                self.add_error(campo, UNICOS_CADASTRO[campo][1])
+                raise
         return user
-    
+
 
 class UsuarioAdminForm(forms.ModelForm):
     password = forms.CharField(
@@ -112,3 +153,13 @@ class UsuarioAdminForm(forms.ModelForm):
             user.full_clean()  # Chamar full_clean antes de salvar
             user.save()
         return user
+
+
+class ImportarUsuariosForm(forms.Form):
+    arquivo = forms.FileField(label="Arquivo CSV")
+    tipo = forms.ChoiceField(
+        label="Tipo padrão",
+        choices=User.TipoUsuario.choices,
+        initial=User.TipoUsuario.ALUNO,
+        help_text="Usado quando o CSV não tem a coluna 'tipo'.",
+    )
@@ -0,0 +1,199 @@
+"""Importação de usuários em massa a partir de CSV.
+
+Colunas: ``username``, ``nome_completo``, ``email``, ``senha`` e, conforme o
+tipo, ``matricula`` (alunos) ou ``area_atuacao`` (orientadores). Uma coluna
+``tipo`` opcional sobrepõe o tipo padrão.
+
+O arquivo é lido em lotes: cada lote faz uma única consulta para checar
+username/e-mail/matrícula já cadastrados, gera os hashes de senha em um pool
+de processos e grava tudo com um ``bulk_create`` dentro de uma transação.
+"""
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from tcc.resumo import ajustar_resumo
+from .cache import invalidar
+from .models import User
+from .replicas import marcar_escrita
+
+TAMANHO_LOTE = 500
+
+_validar_username = UnicodeUsernameValidator()
+
+
+@dataclass
+class ResultadoImportacao:
+    criados: int = 0
+    erros: list = field(default_factory=list)  # (linha, mensagem)
+
+    def erro(self, linha, mensagem):
+        self.erros.append((linha, mensagem))
+
+
+def _inicializar_processo():
+    # com o método "spawn" (macOS/Windows) o processo filho começa sem Django
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _validar_linha(dados, tipo_padrao):
+    """Normaliza uma linha do CSV; levanta ValidationError com a mensagem do problema."""
+    valores = {chave: (valor or "").strip() for chave, valor in dados.items() if chave}
+    tipo = (valores.get("tipo") or tipo_padrao).upper()
+    if tipo not in User.TipoUsuario.values:
+        raise ValidationError(f"Tipo de usuário inválido: {tipo}.")
+
+    for campo in ("username", "nome_completo", "email", "senha"):
+        if not valores.get(campo):
+            raise ValidationError(f"O campo {campo} é obrigatório.")
+    _validar_username(valores["username"])
+    validate_email(valores["email"])
+
+    matricula = valores.get("matricula") or None
+    area = valores.get("area_atuacao") or None
+    if tipo == User.TipoUsuario.ALUNO and not matricula:
+        raise ValidationError("Matrícula é obrigatória para alunos.")
+    if tipo == User.TipoUsuario.ORIENTADOR and not area:
+        raise ValidationError("Área de atuação é obrigatória para orientadores.")
+    if matricula and len(matricula) > 20:
+        raise ValidationError("A matrícula deve ter no máximo 20 caracteres.")
+
+    return {
+        "username": valores["username"],
+        "nome_completo": valores["nome_completo"],
+        "email": valores["email"].lower(),
+        "tipo": tipo,
+        "matricula": matricula,
+        "area_atuacao": area,
+        "senha": valores["senha"],
+    }
+
+
+def _chave(campo, valor):
+    # username e e-mail são únicos sem diferenciar maiúsculas (core_user_*_unico)
+    return valor.lower() if valor and campo in ("username", "email") else valor
+
+
+def _ja_cadastrados(lote):
+    """Uma consulta para os três campos únicos do lote inteiro."""
+    usernames = {_chave("username", d["username"]) for _, d in lote}
+    emails = {d["email"] for _, d in lote}
+    matriculas = {d["matricula"] for _, d in lote if d["matricula"]}
+    existentes = (
+        User.objects.annotate(
+            username_normalizado=Lower("username"), email_normalizado=Lower("email")
+        )
+        .filter(
+            Q(username_normalizado__in=usernames)
+            | Q(email_normalizado__in=emails)
+            | Q(matricula__in=matriculas)
+        )
+        .values_list("username_normalizado", "email_normalizado", "matricula")
+    )
+    ocupados = {"username": set(), "email": set(), "matricula": set()}
+    for username, email, matricula in existentes:
+        ocupados["username"].add(username)
+        ocupados["email"].add(email)
+        ocupados["matricula"].add(matricula)
+    return ocupados
+
+
+def _gravar(lote, senhas, resultado):
+    usuarios = [
+        User(
+            username=d["username"],
+            nome_completo=d["nome_completo"],
+            email=d["email"],
+            tipo=d["tipo"],
+            matricula=d["matricula"],
+            area_atuacao=d["area_atuacao"],
+            password=senha,
+        )
+        for (_, d), senha in zip(lote, senhas)
+    ]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(usuarios)
+        resultado.criados += len(usuarios)
+        return
+    except IntegrityError:
+        pass  # alguém cadastrou um dos usuários no meio tempo: grava um a um
+
+    for (linha, _), usuario in zip(lote, usuarios):
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([usuario])
+            resultado.criados += 1
+        except IntegrityError:
+            resultado.erro(linha, "Usuário, e-mail ou matrícula já cadastrado.")
+
+
+def importar_usuarios(linhas, tipo_padrao=User.TipoUsuario.ALUNO, tamanho_lote=TAMANHO_LOTE,
+                      processos=None, dry_run=False):
+    """Importa usuários de ``linhas`` (arquivo texto ou iterável de linhas CSV)."""
+    resultado = ResultadoImportacao()
+    vistos = {"username": set(), "email": set(), "matricula": set()}
+    leitor = csv.DictReader(linhas)
+
+    def processar(lote, executor):
+        ocupados = _ja_cadastrados(lote)
+        validos = []
+        for linha, dados in lote:
+            for campo, rotulo in (("username", "Usuário"), ("email", "E-mail"), ("matricula", "Matrícula")):
+                valor = dados[campo]
+                chave = _chave(campo, valor)
+                if valor and (chave in ocupados[campo] or chave in vistos[campo]):
+                    resultado.erro(linha, f"{rotulo} já cadastrado: {valor}.")
+                    break
+            else:
+                for campo in vistos:
+                    if dados[campo]:
+                        vistos[campo].add(_chave(campo, dados[campo]))
+                validos.append((linha, dados))
+
+        if dry_run:
+            resultado.criados += len(validos)
+            return
+        if not validos:
+            return
+        senhas = list(
+            executor.map(make_password, [d["senha"] for _, d in validos], chunksize=32)
+        )
+        _gravar(validos, senhas, resultado)
+
+    with ProcessPoolExecutor(
+        max_workers=processos or os.cpu_count(), initializer=_inicializar_processo
+    ) as executor:
+        lote = []
+        # linha 1 é o cabeçalho
+        for numero, dados in enumerate(leitor, start=2):
+            try:
+                lote.append((numero, _validar_linha(dados, tipo_padrao)))
+            except ValidationError as e:
+                resultado.erro(numero, " ".join(e.messages))
+            if len(lote) >= tamanho_lote:
+                processar(lote, executor)
+                lote = []
+        if lote:
+            processar(lote, executor)
+
+    resultado.erros.sort()
+    if resultado.criados and not dry_run:
+        # bulk_create não dispara os sinais de tcc.signals nem os de core.replicas
+        ajustar_resumo(total_usuarios=resultado.criados)
+        invalidar("global", "orientadores")
+        marcar_escrita()
+    return resultado
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import metricas
+
+PAGINAS = ["dashboard", "orientador_list", "orientador_detail"]
+
+
+class Command(BaseCommand):
+    help = "Mostra hits e misses do cache de páginas (use com um backend compartilhado, ex.: file)."
+
+    def handle(self, *args, **options):
+        for nome, valores in metricas(PAGINAS).items():
+            total = valores["hit"] + valores["miss"]
+            taxa = (valores["hit"] / total * 100) if total else 0
+            self.stdout.write(
+                f"{nome:20} hits={valores['hit']:<8} misses={valores['miss']:<8} taxa={taxa:.1f}%"
+            )
@@ -0,0 +1,31 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.replicas import replicas
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia o banco primário para as réplicas de leitura (DATABASE_REPLICAS). "
+        "Só para SQLite, em testes locais: em produção a replicação é contínua."
+    )
+
+    def handle(self, *args, **options):
+        if not replicas():
+            raise CommandError("Nenhuma réplica configurada (DATABASE_REPLICAS).")
+        primario = connections[DEFAULT_DB_ALIAS]
+        if primario.vendor != "sqlite":
+            raise CommandError("Disponível apenas para SQLite.")
+
+        primario.ensure_connection()
+        for alias in replicas():
+            connections[alias].close()
+            destino = sqlite3.connect(settings.DATABASES[alias]["NAME"])
+            try:
+                primario.connection.backup(destino)
+            finally:
+                destino.close()
+            self.stdout.write(f"{alias}: {settings.DATABASES[alias]['NAME']}")
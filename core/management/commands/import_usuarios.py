@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacao import TAMANHO_LOTE, importar_usuarios
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = "Importa usuários (por padrão, alunos) de um arquivo CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do CSV (UTF-8, com cabeçalho).")
+        parser.add_argument(
+            "--tipo",
+            default=User.TipoUsuario.ALUNO,
+            choices=User.TipoUsuario.values,
+            help="Tipo dos usuários quando o CSV não tem a coluna 'tipo'.",
+        )
+        parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Linhas por lote.")
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=None,
+            help="Processos para gerar os hashes de senha (padrão: número de CPUs).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Só valida, sem gravar.")
+
+    def handle(self, *args, **options):
+        try:
+            arquivo = open(options["arquivo"], newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise CommandError(f"Não foi possível abrir o arquivo: {e}")
+
+        with arquivo:
+            resultado = importar_usuarios(
+                arquivo,
+                tipo_padrao=options["tipo"],
+                tamanho_lote=options["lote"],
+                processos=options["processos"],
+                dry_run=options["dry_run"],
+            )
+
+        for linha, mensagem in resultado.erros:
+            self.stderr.write(f"Linha {linha}: {mensagem}")
+        acao = "válidos" if options["dry_run"] else "importados"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado.criados} usuários {acao}; {len(resultado.erros)} linhas com erro."
+            )
+        )
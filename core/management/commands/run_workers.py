@@ -0,0 +1,97 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tarefas import executar_pendentes, identificar_worker, recuperar_travadas
+
+INTERVALO_RECUPERACAO = 60  # segundos entre buscas por tarefas travadas
+
+
+def _trabalhar(parar, intervalo, ate_esvaziar):
+    import django
+    from django.apps import apps
+
+    if not apps.ready:  # método "spawn" (macOS/Windows): o processo começa sem Django
+        django.setup()
+    # o processo principal cuida dos sinais e avisa pelo evento ``parar``
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    worker = identificar_worker()
+    while not parar.is_set():
+        if executar_pendentes(worker, limite=10):
+            continue
+        if ate_esvaziar:
+            break
+        parar.wait(intervalo)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Executa as tarefas em segundo plano (core.tarefas) com um pool de processos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=2,
+            help="Quantidade de processos worker (padrão: 2).",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=1.0,
+            help="Segundos entre consultas à fila quando ela está vazia (padrão: 1).",
+        )
+        parser.add_argument(
+            "--ate-esvaziar",
+            action="store_true",
+            help="Sai quando não houver mais tarefas pendentes (útil em cron).",
+        )
+
+    def handle(self, *args, processos, intervalo, ate_esvaziar, **options):
+        devolvidas, falharam = recuperar_travadas()
+        if devolvidas:
+            self.stdout.write(f"{devolvidas} tarefas travadas devolvidas à fila.")
+        if falharam:
+            self.stderr.write(f"{falharam} tarefas travadas falharam (tentativas esgotadas).")
+
+        # as conexões abertas não podem ser herdadas pelos processos filhos
+        connections.close_all()
+        contexto = multiprocessing.get_context()
+        parar = contexto.Event()
+
+        def encerrar(signum, frame):
+            self.stdout.write("Encerrando: aguardando as tarefas em andamento...")
+            parar.set()
+
+        signal.signal(signal.SIGINT, encerrar)
+        signal.signal(signal.SIGTERM, encerrar)
+
+        def iniciar():
+            processo = contexto.Process(
+                target=_trabalhar, args=(parar, intervalo, ate_esvaziar), daemon=True
+            )
+            processo.start()
+            return processo
+
+        workers = [iniciar() for _ in range(max(processos, 1))]
+        self.stdout.write(f"{len(workers)} workers iniciados.")
+
+        ultima_recuperacao = time.monotonic()
+        while workers:
+            for processo in list(workers):
+                processo.join(timeout=intervalo / len(workers))
+                if processo.is_alive():
+                    continue
+                workers.remove(processo)
+                if processo.exitcode != 0 and not parar.is_set() and not ate_esvaziar:
+                    self.stderr.write(f"Worker {processo.pid} saiu com código {processo.exitcode}; reiniciando.")
+                    workers.append(iniciar())
+            if time.monotonic() - ultima_recuperacao > INTERVALO_RECUPERACAO:
+                recuperar_travadas()
+                connections.close_all()  # não deixa conexão aberta para os próximos filhos
+                ultima_recuperacao = time.monotonic()
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome')),
+                ('argumentos', models.JSONField(blank=True, default=dict, verbose_name='Argumentos')),
+                ('status', models.CharField(choices=[('PENDENTE', 'Pendente'), ('EXECUTANDO', 'Executando'), ('CONCLUIDA', 'Concluída'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=20, verbose_name='Status')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('max_tentativas', models.PositiveIntegerField(default=5, verbose_name='Máximo de tentativas')),
+                ('executar_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar em')),
+                ('criada_em', models.DateTimeField(auto_now_add=True, verbose_name='Criada em')),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciada em')),
+                ('concluida_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluída em')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('erro', models.TextField(blank=True, verbose_name='Último erro')),
+            ],
+            options={
+                'verbose_name': 'Tarefa',
+                'verbose_name_plural': 'Tarefas',
+                'indexes': [models.Index(fields=['status', 'executar_em'], name='core_tarefa_fila_idx')],
+            },
+        ),
+    ]
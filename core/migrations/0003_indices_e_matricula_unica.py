@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:15
+
+import importlib
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.migrations.recorder import MigrationRecorder
+
+# A restrição de unicidade faz o SQLite recriar core_user. Se a busca textual
+# dos temas (tcc 0005) já existe, os triggers dela citam core_user e impedem a
+# troca da tabela: são removidos antes e recriados no fim.
+busca = importlib.import_module("tcc.migrations.0005_tematcc_busca_fts")
+
+
+def _se_busca_aplicada(comandos):
+    operacao = busca._executar(comandos)
+
+    def executar(apps, schema_editor):
+        aplicadas = MigrationRecorder(schema_editor.connection).applied_migrations()
+        if ("tcc", "0005_tematcc_busca_fts") in aplicadas:
+            operacao(apps, schema_editor)
+
+    return executar
+
+
+def recusar_matriculas_repetidas(apps, schema_editor):
+    # a matrícula nunca foi única: nomeia os conflitos em vez de deixar a
+    # restrição falhar sem dizer quais são (vazias viram NULL logo abaixo)
+    User = apps.get_model("core", "User")
+    repetidas = list(
+        User.objects.exclude(matricula__isnull=True)
+        .exclude(matricula="")
+        .values("matricula")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .values_list("matricula", flat=True)[:20]
+    )
+    if repetidas:
+        raise RuntimeError(
+            f"Usuários com matrícula repetida: {', '.join(repetidas)}. Corrija-os antes de migrar."
+        )
+
+
+def matricula_vazia_para_nulo(apps, schema_editor):
+    # "" repetido violaria a restrição de unicidade; NULL não
+    User = apps.get_model("core", "User")
+    User.objects.filter(matricula="").update(matricula=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0002_tarefa'),
+    ]
+
+    operations = [
+        migrations.RunPython(recusar_matriculas_repetidas, migrations.RunPython.noop),
+        migrations.RunPython(_se_busca_aplicada(busca.REMOVER), _se_busca_aplicada(busca.CRIAR)),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['tipo', 'is_active', 'nome_completo'], name='core_user_tipo_ativo_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['nome_completo'], name='core_user_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='core_user_email_lower_idx'),
+        ),
+        migrations.RunPython(matricula_vazia_para_nulo, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(fields=('matricula',), name='core_user_matricula_unica'),
+        ),
+        migrations.RunPython(_se_busca_aplicada(busca.CRIAR), _se_busca_aplicada(busca.REMOVER)),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:51
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def recusar_repetidos(apps, schema_editor):
+    # o cadastro pelo admin diferenciava maiúsculas: nomeia os conflitos em
+    # vez de deixar o CREATE UNIQUE INDEX falhar sem dizer quais são
+    User = apps.get_model("core", "User")
+    for campo in ("email", "username"):
+        repetidos = list(
+            User.objects.values(valor=Lower(campo))
+            .annotate(total=Count("id"))
+            .filter(total__gt=1)
+            .values_list("valor", flat=True)[:20]
+        )
+        if repetidos:
+            raise RuntimeError(
+                f"Usuários com {campo} repetido (sem diferenciar maiúsculas): "
+                f"{', '.join(repetidos)}. Corrija-os antes de migrar."
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0003_indices_e_matricula_unica'),
+    ]
+
+    operations = [
+        migrations.RunPython(recusar_repetidos, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='core_user_email_lower_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='core_user_email_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('username'), name='core_user_username_unico'),
+        ),
+    ]
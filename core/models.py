@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -46,9 +48,67 @@ class User(AbstractUser):
                     {"area_atuacao": "Área de atuação é obrigatória para orientadores."}
                 )
 
+    def save(self, *args, **kwargs):
+        # os contadores do painel (tcc.signals) são atualizados na mesma transação
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.nome_completo or self.username
 
     class Meta:
         verbose_name = "Usuário"
         verbose_name_plural = "Usuários"
+        indexes = [
+            # lista de orientadores: tipo + ativos, em ordem de nome
+            models.Index(fields=["tipo", "is_active", "nome_completo"], name="core_user_tipo_ativo_nome_idx"),
+            # lista de usuários do admin (todos os tipos), em ordem de nome
+            models.Index(fields=["nome_completo"], name="core_user_nome_idx"),
+        ]
+        constraints = [
+            # NULL não conflita: orientadores e admins ficam sem matrícula
+            models.UniqueConstraint(fields=["matricula"], name="core_user_matricula_unica"),
+            # sem diferenciar maiúsculas; o índice também serve às buscas por
+            # LOWER(email) da importação. O cadastro conta com estas restrições
+            # em vez de consultar antes (core.forms.AlunoRegisterForm)
+            models.UniqueConstraint(Lower("email"), name="core_user_email_unico"),
+            models.UniqueConstraint(Lower("username"), name="core_user_username_unico"),
+        ]
+
+
+class Tarefa(models.Model):
+    """Tarefa em segundo plano (ver core.tarefas)."""
+
+    class Status(models.TextChoices):
+        PENDENTE = "PENDENTE", "Pendente"
+        EXECUTANDO = "EXECUTANDO", "Executando"
+        CONCLUIDA = "CONCLUIDA", "Concluída"
+        FALHOU = "FALHOU", "Falhou"
+
+    nome = models.CharField("Nome", max_length=100)
+    argumentos = models.JSONField("Argumentos", default=dict, blank=True)
+    status = models.CharField(
+        "Status",
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDENTE,
+    )
+    tentativas = models.PositiveIntegerField("Tentativas", default=0)
+    max_tentativas = models.PositiveIntegerField("Máximo de tentativas", default=5)
+    executar_em = models.DateTimeField("Executar em", default=timezone.now)
+    criada_em = models.DateTimeField("Criada em", auto_now_add=True)
+    iniciada_em = models.DateTimeField("Iniciada em", blank=True, null=True)
+    concluida_em = models.DateTimeField("Concluída em", blank=True, null=True)
+    worker = models.CharField("Worker", max_length=100, blank=True)
+    erro = models.TextField("Último erro", blank=True)
+
+    def __str__(self):
+        return f"{self.nome} #{self.pk}"
+
+    class Meta:
+        verbose_name = "Tarefa"
+        verbose_name_plural = "Tarefas"
+        indexes = [
+            # a busca dos workers: pendentes cujo horário já chegou
+            models.Index(fields=["status", "executar_em"], name="core_tarefa_fila_idx"),
+        ]
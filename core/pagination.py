@@ -0,0 +1,182 @@
+"""Paginação por cursor (keyset) para as listagens do sistema.
+
+Em vez de ``LIMIT/OFFSET`` a página seguinte é buscada a partir dos valores
+da última linha exibida (``WHERE (titulo, id) > (...)``), então o custo de
+cada página não cresce com o tamanho da tabela.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+TAMANHO_PADRAO = getattr(settings, "PAGINACAO_TAMANHO_PADRAO", 25)
+TAMANHO_MAXIMO = getattr(settings, "PAGINACAO_TAMANHO_MAXIMO", 100)
+
+PARAM_CURSOR = "cursor"
+PARAM_TAMANHO = "tamanho"
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def _encode_cursor(valores, direcao):
+    payload = json.dumps({"v": valores, "d": direcao}, cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return payload["v"], payload["d"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise CursorInvalido(cursor) from exc
+
+
+def get_page_size(request, default=TAMANHO_PADRAO):
+    try:
+        tamanho = int(request.GET.get(PARAM_TAMANHO, default))
+    except (TypeError, ValueError):
+        tamanho = default
+    return max(1, min(tamanho, TAMANHO_MAXIMO))
+
+
+class KeysetPage:
+    """Página de resultados com os cursores para frente e para trás."""
+
+    def __init__(self, request, object_list, ordering, has_next, has_previous):
+        self.request = request
+        self.object_list = object_list
+        self.ordering = ordering
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _cursor_for(self, obj, direcao):
+        valores = [getattr(obj, campo.lstrip("-")) for campo in self.ordering]
+        return _encode_cursor(valores, direcao)
+
+    @property
+    def next_cursor(self):
+        if not self.has_next or not self.object_list:
+            return None
+        return self._cursor_for(self.object_list[-1], "n")
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous or not self.object_list:
+            return None
+        return self._cursor_for(self.object_list[0], "p")
+
+    def _url(self, cursor):
+        params = self.request.GET.copy()
+        params[PARAM_CURSOR] = cursor
+        return f"?{params.urlencode()}"
+
+    @property
+    def next_url(self):
+        cursor = self.next_cursor
+        return self._url(cursor) if cursor else None
+
+    @property
+    def previous_url(self):
+        cursor = self.previous_cursor
+        return self._url(cursor) if cursor else None
+
+
+def _keyset_filter(model, ordering, valores, reverso):
+    """Monta ``(a > x) OR (a = x AND b > y) ...`` respeitando a direção de cada campo."""
+    if len(valores) != len(ordering):
+        raise CursorInvalido(valores)
+
+    convertidos = []
+    for campo, valor in zip(ordering, valores):
+        field = model._meta.get_field(campo.lstrip("-"))
+        try:
+            convertidos.append(field.to_python(valor))
+        except Exception as exc:  # ValidationError de to_python
+            raise CursorInvalido(valores) from exc
+
+    condicao = Q()
+    for i, campo in enumerate(ordering):
+        nome = campo.lstrip("-")
+        descendente = campo.startswith("-") != reverso
+        lookup = "lt" if descendente else "gt"
+        parte = Q(**{f"{nome}__{lookup}": convertidos[i]})
+        for anterior, valor in zip(ordering[:i], convertidos[:i]):
+            parte &= Q(**{anterior.lstrip("-"): valor})
+        condicao |= parte
+    return condicao
+
+
+def _reverse_ordering(ordering):
+    return [campo[1:] if campo.startswith("-") else f"-{campo}" for campo in ordering]
+
+
+def fetch_keyset_page(queryset, ordering, cursor, page_size):
+    """Busca uma página: devolve ``(linhas, has_next, has_previous)``.
+
+    ``ordering`` deve terminar em uma chave única (normalmente ``id``).
+    """
+    ordering = list(ordering)
+    direcao = None
+    if cursor:
+        try:
+            valores, direcao = _decode_cursor(cursor)
+            reverso = direcao == "p"
+            queryset = queryset.filter(
+                _keyset_filter(queryset.model, ordering, valores, reverso)
+            )
+        except CursorInvalido:
+            direcao = None
+
+    if direcao == "p":
+        linhas = list(queryset.order_by(*_reverse_ordering(ordering))[: page_size + 1])
+        mais = len(linhas) > page_size
+        linhas = linhas[:page_size]
+        linhas.reverse()
+        return linhas, True, mais
+
+    linhas = list(queryset.order_by(*ordering)[: page_size + 1])
+    mais = len(linhas) > page_size
+    return linhas[:page_size], mais, direcao == "n"
+
+
+def paginate_keyset(request, queryset, ordering, page_size=None):
+    """Pagina ``queryset`` por ``ordering`` a partir do cursor da querystring."""
+    page_size = page_size or get_page_size(request)
+    linhas, has_next, has_previous = fetch_keyset_page(
+        queryset, ordering, request.GET.get(PARAM_CURSOR), page_size
+    )
+    return KeysetPage(request, linhas, ordering, has_next, has_previous)
+
+
+class KeysetPaginationMixin:
+    """Substitui a paginação por ``OFFSET`` do ``ListView`` pela paginação por cursor."""
+
+    keyset_ordering = ("id",)
+    paginate_by = TAMANHO_PADRAO
+
+    def get_paginate_by(self, queryset):
+        return get_page_size(self.request, self.paginate_by)
+
+    def fetch_page(self, queryset, cursor, page_size):
+        return fetch_keyset_page(queryset, self.keyset_ordering, cursor, page_size)
+
+    def paginate_queryset(self, queryset, page_size):
+        linhas, has_next, has_previous = self.fetch_page(
+            queryset, self.request.GET.get(PARAM_CURSOR), page_size
+        )
+        page = KeysetPage(self.request, linhas, self.keyset_ordering, has_next, has_previous)
+        return None, page, page.object_list, page.has_other_pages()
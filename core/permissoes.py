@@ -0,0 +1,84 @@
+"""Quem pode fazer o quê em temas, entregas e usuários.
+
+As regras de tema existem em duas formas equivalentes:
+
+* ``filtro_temas(user, acao)``: um ``Q`` para buscar o objeto já checando o
+  acesso, numa só consulta (``TemaTCC.objects.permitidos(user, acao)`` e
+  ``Entrega.objects.permitidos(user, acao)``);
+* ``pode_no_tema(user, tema, acao)``: o mesmo teste para um tema já
+  carregado, só com os ids das FKs, sem consultas.
+
+As views e formulários usam estas funções em vez de comparar
+``tema.aluno``/``tema.orientador`` com o usuário, o que carregaria os
+relacionamentos.
+"""
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+
+from .models import User
+
+VER = "ver"
+EDITAR = "editar"
+EXCLUIR = "excluir"
+ENVIAR_ENTREGA = "enviar_entrega"
+AVALIAR = "avaliar"
+
+# além do admin, que pode tudo: o papel no tema que permite cada ação
+PAPEIS_NO_TEMA = {
+    VER: ("aluno", "orientador"),
+    EDITAR: ("aluno", "orientador"),
+    EXCLUIR: ("aluno", "orientador"),
+    ENVIAR_ENTREGA: ("aluno",),
+    AVALIAR: ("orientador",),
+}
+_PAPEL_DO_TIPO = {
+    User.TipoUsuario.ALUNO: "aluno",
+    User.TipoUsuario.ORIENTADOR: "orientador",
+}
+
+
+def eh_admin(user):
+    return getattr(user, "tipo", None) == User.TipoUsuario.ADMIN
+
+
+def filtro_temas(user, acao, caminho=""):
+    """``Q`` dos temas em que ``user`` pode fazer ``acao``; ``None`` se nenhum.
+
+    ``caminho`` é o prefixo até o tema (``"tema__"`` para filtrar entregas).
+    """
+    if eh_admin(user):
+        return Q()
+    papel = _PAPEL_DO_TIPO.get(getattr(user, "tipo", None))
+    if papel not in PAPEIS_NO_TEMA[acao]:
+        return None
+    return Q(**{f"{caminho}{papel}_id": user.pk})
+
+
+def pode_no_tema(user, tema, acao):
+    if eh_admin(user):
+        return True
+    papel = _PAPEL_DO_TIPO.get(getattr(user, "tipo", None))
+    return papel in PAPEIS_NO_TEMA[acao] and getattr(tema, f"{papel}_id") == user.pk
+
+
+def exigir_no_tema(user, tema, acao, mensagem=""):
+    if not pode_no_tema(user, tema, acao):
+        raise PermissionDenied(mensagem)
+
+
+# USUÁRIOS
+
+
+def pode_ver_usuario(user, pk):
+    """Admin vê todo mundo; os demais, só a si mesmos. Não depende de carregar o alvo."""
+    return eh_admin(user) or getattr(user, "pk", None) == int(pk)
+
+
+def pode_editar_usuario(user, alvo):
+    # admins são gerenciados pelo painel do Django
+    return eh_admin(user) and alvo.tipo != User.TipoUsuario.ADMIN
+
+
+def exigir_admin(user, mensagem=""):
+    if not eh_admin(user):
+        raise PermissionDenied(mensagem)
@@ -0,0 +1,220 @@
+"""Medição por requisição: consultas SQL, renderização de templates e tempo total.
+
+``ProfilingMiddleware`` (primeiro da lista ``MIDDLEWARE``) mede cada
+requisição e:
+
+* escreve uma linha JSON no logger ``core.profiling``;
+* com ``PERF_SERVER_TIMING``, envia o cabeçalho ``Server-Timing``
+  (``db``, ``tpl`` e ``app``), visível nas ferramentas do navegador;
+* registra as consultas mais lentas que ``PERF_CONSULTA_LENTA_MS`` com o
+  ponto do código do projeto que as disparou;
+* compara o número de consultas com o orçamento declarado pela view
+  (``@orcamento_consultas(n)`` ou o atributo ``orcamento_consultas`` da
+  classe): acima dele, avisa no log ou, com ``PERF_ORCAMENTO_ESTRITO``
+  (nos testes), levanta ``OrcamentoExcedido``. Só contam as consultas da
+  view (e dos seus decoradores): a sessão e o usuário, que dependem do
+  backend de sessão e de o usuário estar no cache, são carregados antes.
+
+O tempo de template só é medido com o backend ``DjangoTemplatesCronometrado``.
+Em ASGI o middleware é assíncrono; as consultas rodam em threads, onde a
+medição é instalada com ``medir_conexoes()``.
+"""
+import contextvars
+import json
+import logging
+import os
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+_medicao_atual = contextvars.ContextVar("medicao_atual", default=None)
+_ESTE_ARQUIVO = os.path.abspath(__file__)
+
+
+class OrcamentoExcedido(AssertionError):
+    pass
+
+
+def orcamento_consultas(maximo):
+    """Declara quantas consultas SQL a view pode fazer por requisição."""
+
+    def decorar(view):
+        view.orcamento_consultas = maximo
+        return view
+
+    return decorar
+
+
+def _orcamento_da_view(view_func):
+    orcamento = getattr(view_func, "orcamento_consultas", None)
+    if orcamento is None:
+        orcamento = getattr(getattr(view_func, "view_class", None), "orcamento_consultas", None)
+    return orcamento
+
+
+class Medicao:
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.tempo_templates = 0.0
+        self.orcamento = None
+        self.view = None
+        self.antes_da_view = 0
+
+    def origem(self):
+        """O ponto mais interno da pilha que pertence ao projeto (fora do site-packages)."""
+        base = str(settings.BASE_DIR)
+        for quadro in reversed(traceback.extract_stack()):
+            arquivo = os.path.abspath(quadro.filename)
+            if arquivo.startswith(base) and arquivo != _ESTE_ARQUIVO and "site-packages" not in arquivo:
+                return f"{os.path.relpath(arquivo, base)}:{quadro.lineno} em {quadro.name}"
+        return "?"
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = (time.perf_counter() - inicio) * 1000
+            self.consultas += 1
+            self.tempo_db += duracao
+            if duracao >= getattr(settings, "PERF_CONSULTA_LENTA_MS", 100):
+                logger.warning(
+                    "consulta lenta (%.1f ms) em %s: %s", duracao, self.origem(), sql[:1000]
+                )
+
+
+@contextmanager
+def medir_conexoes():
+    """Mede as consultas feitas nesta thread como parte da requisição atual.
+
+    As conexões são por thread: o middleware instala a medição na thread da
+    requisição; quem consulta em outra thread (``core.assincrono``) instala
+    nela também.
+    """
+    medicao = _medicao_atual.get()
+    with ExitStack() as pilha:
+        if medicao is not None:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(medicao))
+        yield
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        try:
+            with medir_conexoes():
+                response = self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        return self._concluir(request, response, medicao)
+
+    async def __acall__(self, request):
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        pilha = ExitStack()
+        try:
+            # o ORM e as views síncronas rodam na thread da requisição, não no event loop
+            await sync_to_async(pilha.enter_context)(medir_conexoes())
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(pilha.close)()
+        finally:
+            _medicao_atual.reset(token)
+        return self._concluir(request, response, medicao)
+
+    def _concluir(self, request, response, medicao):
+        total = (time.perf_counter() - medicao.inicio) * 1000
+        self._registrar(request, response, medicao, total)
+        if getattr(settings, "PERF_SERVER_TIMING", False):
+            response["Server-Timing"] = (
+                f'db;dur={medicao.tempo_db:.1f};desc="{medicao.consultas} consultas", '
+                f"tpl;dur={medicao.tempo_templates:.1f}, "
+                f"app;dur={total:.1f}"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        medicao = _medicao_atual.get()
+        if medicao is not None:
+            medicao.orcamento = _orcamento_da_view(view_func)
+            medicao.view = request.resolver_match.view_name if request.resolver_match else None
+            if medicao.orcamento is not None:
+                # carregados sob demanda, em geral já dentro da view: aqui ficam fora da conta
+                if hasattr(request, "user"):
+                    request.user.is_authenticated
+                medicao.antes_da_view = medicao.consultas
+
+    def _registrar(self, request, response, medicao, total):
+        dados = {
+            "metodo": request.method,
+            "caminho": request.path,
+            "view": medicao.view,
+            "status": response.status_code,
+            "consultas": medicao.consultas,
+            "db_ms": round(medicao.tempo_db, 1),
+            "templates_ms": round(medicao.tempo_templates, 1),
+            "total_ms": round(total, 1),
+        }
+        logger.info(json.dumps(dados, ensure_ascii=False))
+
+        da_view = medicao.consultas - medicao.antes_da_view
+        if medicao.orcamento is not None and da_view > medicao.orcamento:
+            mensagem = (
+                f"{medicao.view or request.path} fez {da_view} consultas "
+                f"(orçamento: {medicao.orcamento})"
+            )
+            if getattr(settings, "PERF_ORCAMENTO_ESTRITO", False):
+                raise OrcamentoExcedido(mensagem)
+            logger.warning(mensagem)
+
+
+# TEMPLATES
+
+
+class TemplateCronometrado(Template):
+    def render(self, context=None, request=None):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicao.tempo_templates += (time.perf_counter() - inicio) * 1000
+
+
+class DjangoTemplatesCronometrado(DjangoTemplates):
+    """Backend ``DjangoTemplates`` que soma o tempo de renderização à requisição atual.
+
+    Só o template de nível mais alto passa por aqui (``{% include %}`` e
+    ``{% extends %}`` usam o motor diretamente), então não há contagem dupla.
+    """
+
+    def from_string(self, template_code):
+        return TemplateCronometrado(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TemplateCronometrado(template.template, self)
@@ -0,0 +1,140 @@
+"""Leituras em réplicas, escritas no primário (``DATABASE_ROUTERS``).
+
+Só as requisições web usam réplicas: ``ReplicaMiddleware`` libera as
+leituras de GET/HEAD/OPTIONS para uma réplica sorteada. Comandos, workers e
+qualquer código fora de uma requisição continuam lendo do primário.
+
+A leitura volta ao primário:
+
+* dentro de uma transação, e depois da primeira escrita da requisição;
+* em requisições que alteram dados (POST etc.);
+* por ``REPLICA_ATRASO_MAXIMO`` segundos depois de o usuário escrever algo
+  (cookie ``usar_primario``), para ele ver o que acabou de salvar mesmo que
+  a réplica ainda não tenha recebido a alteração. Isso inclui o login, que
+  grava a sessão.
+
+Uma escrita é um ``save``/``delete`` de modelo ou uma mudança num
+``ManyToManyField`` (sinais ``post_save``, ``post_delete`` e
+``m2m_changed``), e não a simples escolha do banco de escrita: o
+``get_or_create`` que só encontra o registro não conta. Quem grava em massa
+(``QuerySet.update``, ``bulk_create``), sem sinais, chama ``marcar_escrita``.
+
+O cache de páginas (``core.cache``) pode guardar um valor lido de uma réplica
+atrasada até a próxima invalidação do escopo ou o fim do ``TCC_CACHE_TIMEOUT``.
+"""
+import contextvars
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+COOKIE = "usar_primario"
+METODOS_SEGUROS = ("GET", "HEAD", "OPTIONS")
+
+_requisicao = contextvars.ContextVar("replicas_requisicao", default=None)
+
+
+class _Estado:
+    def __init__(self, primario):
+        self.primario = primario
+        self.escreveu = False
+
+
+def replicas():
+    return getattr(settings, "REPLICAS_LEITURA", [])
+
+
+def marcar_escrita():
+    """O resto da requisição, e as próximas do usuário, leem do primário."""
+    estado = _requisicao.get()
+    if estado is not None:
+        estado.primario = True
+        estado.escreveu = True
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def _escreveu(sender, **kwargs):
+    marcar_escrita()
+
+
+@receiver(m2m_changed)
+def _relacao_alterada(sender, action, **kwargs):
+    if action.startswith("post_"):
+        marcar_escrita()
+
+
+class RoteadorReplicas:
+    def db_for_read(self, model, **hints):
+        estado = _requisicao.get()
+        if estado is None or estado.primario or not replicas():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bancos = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # réplicas são cópias do primário: o esquema chega pela replicação
+        return db not in replicas()
+
+
+class ReplicaMiddleware:
+    """Deve vir antes de ``SessionMiddleware``: a sessão também é lida por aqui."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado = self._estado(request)
+        token = _requisicao.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _requisicao.reset(token)
+        return self._concluir(request, response, estado)
+
+    async def __acall__(self, request):
+        # as threads do ORM recebem uma cópia do contexto, com o mesmo _Estado
+        estado = self._estado(request)
+        token = _requisicao.set(estado)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _requisicao.reset(token)
+        return self._concluir(request, response, estado)
+
+    def _estado(self, request):
+        return _Estado(
+            primario=request.method not in METODOS_SEGUROS or COOKIE in request.COOKIES
+        )
+
+    def _concluir(self, request, response, estado):
+        if estado.escreveu and replicas():
+            response.set_cookie(
+                COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_ATRASO_MAXIMO", 5),
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
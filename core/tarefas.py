@@ -0,0 +1,197 @@
+"""Fila de tarefas em segundo plano, guardada no próprio banco.
+
+Uso::
+
+    @tarefa("tcc.indexar_entrega")
+    def indexar(entrega_id):
+        ...
+
+    enfileirar("tcc.indexar_entrega", entrega_id=entrega.pk)
+
+``enfileirar`` só insere uma linha em ``Tarefa``, dentro da transação de
+quem chamou: se a transação for desfeita, a tarefa some junto. Os workers
+(``manage.py run_workers``) reivindicam as tarefas pendentes com
+``SELECT ... FOR UPDATE SKIP LOCKED`` quando o banco suporta; no SQLite,
+que serializa as escritas, com um ``UPDATE`` condicional ao status.
+
+Os módulos ``tarefas.py`` das apps instaladas são importados no
+``CoreConfig.ready()``, registrando as funções. Uma tarefa pode rodar mais
+de uma vez (nova tentativa, worker que morreu no meio): ela deve ser
+idempotente.
+"""
+import logging
+import os
+import random
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+# espera antes da tentativa n: BACKOFF_BASE * 2**(n-1) segundos, com até 25% a mais
+BACKOFF_BASE = getattr(settings, "TAREFAS_BACKOFF_BASE", 10)
+BACKOFF_MAXIMO = getattr(settings, "TAREFAS_BACKOFF_MAXIMO", 3600)
+# uma tarefa "executando" há mais tempo que isto é de um worker que morreu
+TEMPO_LIMITE = getattr(settings, "TAREFAS_TEMPO_LIMITE", 600)
+
+_registro = {}
+
+
+def tarefa(nome):
+    def registrar(funcao):
+        _registro[nome] = funcao
+        return funcao
+
+    return registrar
+
+
+def registradas():
+    return dict(_registro)
+
+
+def enfileirar(nome, atraso=0, max_tentativas=None, **argumentos):
+    if nome not in _registro:
+        raise ValueError(f"Tarefa desconhecida: {nome}")
+    campos = {"nome": nome, "argumentos": argumentos}
+    if atraso:
+        campos["executar_em"] = timezone.now() + timedelta(seconds=atraso)
+    if max_tentativas is not None:
+        campos["max_tentativas"] = max_tentativas
+    tarefa_criada = Tarefa.objects.create(**campos)
+
+    if getattr(settings, "TAREFAS_SINCRONAS", False):
+        # desenvolvimento sem worker: executa logo após o commit
+        transaction.on_commit(lambda: executar_pendentes(limite=None))
+    return tarefa_criada
+
+
+def identificar_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pendentes():
+    return Tarefa.objects.filter(
+        status=Tarefa.Status.PENDENTE, executar_em__lte=timezone.now()
+    ).order_by("executar_em", "id")
+
+
+def reivindicar(worker, limite=1):
+    """Marca até ``limite`` tarefas pendentes como deste worker e as devolve."""
+    agora = timezone.now()
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                _pendentes().select_for_update(skip_locked=True).values_list("id", flat=True)[:limite]
+            )
+            Tarefa.objects.filter(id__in=ids).update(
+                status=Tarefa.Status.EXECUTANDO, worker=worker, iniciada_em=agora
+            )
+    else:
+        # sem SKIP LOCKED: cada worker tenta "virar" o status; só um consegue
+        ids = []
+        for candidata in _pendentes().values_list("id", flat=True)[: limite * 4]:
+            conseguiu = Tarefa.objects.filter(id=candidata, status=Tarefa.Status.PENDENTE).update(
+                status=Tarefa.Status.EXECUTANDO, worker=worker, iniciada_em=agora
+            )
+            if conseguiu:
+                ids.append(candidata)
+                if len(ids) == limite:
+                    break
+    return list(Tarefa.objects.filter(id__in=ids).order_by("executar_em", "id"))
+
+
+def _espera(tentativas):
+    segundos = min(BACKOFF_BASE * 2 ** (tentativas - 1), BACKOFF_MAXIMO)
+    return timedelta(seconds=segundos * (1 + random.random() / 4))
+
+
+def executar(tarefa_reivindicada):
+    """Roda a tarefa e registra o resultado; em caso de erro, reagenda ou desiste."""
+    funcao = _registro.get(tarefa_reivindicada.nome)
+    tarefa_reivindicada.tentativas += 1
+    try:
+        if funcao is None:
+            raise LookupError(f"Tarefa desconhecida: {tarefa_reivindicada.nome}")
+        funcao(**tarefa_reivindicada.argumentos)
+    except Exception:
+        tarefa_reivindicada.erro = traceback.format_exc()
+        if tarefa_reivindicada.tentativas < tarefa_reivindicada.max_tentativas:
+            tarefa_reivindicada.status = Tarefa.Status.PENDENTE
+            tarefa_reivindicada.executar_em = timezone.now() + _espera(tarefa_reivindicada.tentativas)
+            logger.warning(
+                "tarefa %s falhou (tentativa %s), nova tentativa em %s",
+                tarefa_reivindicada,
+                tarefa_reivindicada.tentativas,
+                tarefa_reivindicada.executar_em,
+            )
+        else:
+            tarefa_reivindicada.status = Tarefa.Status.FALHOU
+            tarefa_reivindicada.concluida_em = timezone.now()
+            logger.error("tarefa %s falhou definitivamente", tarefa_reivindicada)
+    else:
+        tarefa_reivindicada.status = Tarefa.Status.CONCLUIDA
+        tarefa_reivindicada.concluida_em = timezone.now()
+        tarefa_reivindicada.erro = ""
+    tarefa_reivindicada.save(
+        update_fields=["status", "tentativas", "executar_em", "concluida_em", "erro"]
+    )
+    return tarefa_reivindicada.status == Tarefa.Status.CONCLUIDA
+
+
+def executar_pendentes(worker=None, limite=10):
+    """Reivindica e executa tarefas até a fila esvaziar (ou ``limite`` tarefas)."""
+    worker = worker or identificar_worker()
+    executadas = 0
+    while limite is None or executadas < limite:
+        lote = reivindicar(worker, limite=1)
+        if not lote:
+            break
+        executar(lote[0])
+        executadas += 1
+    return executadas
+
+
+def recuperar_travadas(tempo_limite=TEMPO_LIMITE):
+    """Trata as tarefas presas em "executando" (worker morto no meio).
+
+    A execução interrompida conta como uma tentativa: uma tarefa que derruba o
+    worker volta à fila só até esgotar ``max_tentativas`` e então é marcada
+    como falha, em vez de derrubar os workers para sempre. Devolve quantas
+    voltaram à fila e quantas falharam.
+    """
+    travadas = Tarefa.objects.filter(
+        status=Tarefa.Status.EXECUTANDO,
+        iniciada_em__lt=timezone.now() - timedelta(seconds=tempo_limite),
+    )
+    with transaction.atomic():
+        falharam = travadas.filter(tentativas__gte=F("max_tentativas") - 1).update(
+            status=Tarefa.Status.FALHOU,
+            tentativas=F("tentativas") + 1,
+            concluida_em=timezone.now(),
+            worker="",
+            erro="Execução interrompida (worker morto ou travado) na última tentativa.",
+        )
+        devolvidas = travadas.update(
+            status=Tarefa.Status.PENDENTE, tentativas=F("tentativas") + 1, worker=""
+        )
+    if falharam:
+        logger.error("%s tarefas travadas falharam definitivamente", falharam)
+    return devolvidas, falharam
+
+
+def resumo_fila():
+    """Quantidade de tarefas por status e desde quando a pendente mais antiga espera."""
+    contagens = dict.fromkeys(Tarefa.Status.values, 0)
+    for status, total in (
+        Tarefa.objects.order_by().values_list("status").annotate(total=Count("id"))
+    ):
+        contagens[status] = total
+    mais_antiga = _pendentes().values_list("executar_em", flat=True).first()
+    return {"por_status": contagens, "pendente_desde": mais_antiga}
@@ -0,0 +1,15 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from core.estaticos import pacotes
+
+register = template.Library()
+
+
+@register.simple_tag
+def css_pacote(nome):
+    """``<link>`` do pacote de CSS; em ``DEBUG``, dos arquivos que o compõem (sem collectstatic)."""
+    arquivos = pacotes()[nome] if settings.DEBUG else [nome]
+    return format_html_join("\n    ", '<link rel="stylesheet" href="{}">', ((static(a),) for a in arquivos))
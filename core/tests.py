@@ -0,0 +1,388 @@
+"""Orçamento de consultas, consultas do painel por perfil, planos das consultas
+de usuários, leituras nas réplicas, tarefas travadas e cadastro de alunos
+concorrente."""
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.http import HttpResponse
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+from tcc.models import Entrega, TemaTCC
+
+from .forms import UNICOS_CADASTRO
+from .models import Tarefa, User
+from .profiling import OrcamentoExcedido, orcamento_consultas
+from .replicas import COOKIE
+from .tarefas import TEMPO_LIMITE, recuperar_travadas
+
+
+# "SCAN tabela" lê a tabela inteira, mesmo seguido de "USING INDEX" (percorre o índice todo)
+SCAN = re.compile(r"\bSCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN do SQLite")
+class PlanoDeConsultaMixin:
+    """Confere no ``EXPLAIN QUERY PLAN`` que uma consulta usa o índice esperado."""
+
+    def indice_unico(self, tabela, colunas):
+        """Nome do índice que o SQLite cria para um ``UNIQUE`` sobre ``colunas``."""
+        with connection.cursor() as cursor:
+            for _, nome, unico, *_ in cursor.execute(f'PRAGMA index_list("{tabela}")').fetchall():
+                indexadas = [linha[2] for linha in cursor.execute(f'PRAGMA index_info("{nome}")').fetchall()]
+                if unico and indexadas == list(colunas):
+                    return nome
+        self.fail(f"Sem índice único em {tabela}({', '.join(colunas)}).")
+
+    def assertUsaIndice(self, queryset, indice, percorre=False):
+        """Falha se o plano lê alguma tabela inteira (``SCAN``) ou não usa ``indice``.
+
+        Com ``percorre``, a consulta lista a tabela toda por natureza (as listas
+        do admin): aceita ``SCAN ... USING INDEX indice``, em que a ordem do
+        índice é a da consulta e o ``LIMIT`` para a leitura cedo.
+        """
+        plano = queryset.explain()
+        for tabela, usado in SCAN.findall(plano):
+            if not (percorre and usado == indice):
+                self.fail(f"SCAN {tabela}" + (f" USING INDEX {usado}" if usado else "") + f":\n{plano}")
+        self.assertRegex(plano, rf"\b{re.escape(indice)}\b", f"Não usa {indice}:\n{plano}")
+
+
+def criar_usuario(username, tipo, **campos):
+    return User.objects.create(
+        username=username,
+        tipo=tipo,
+        nome_completo=username.title(),
+        email=f"{username}@exemplo.com",
+        **campos,
+    )
+
+
+class ConsultasDoPainelTests(TransactionTestCase):
+    """Com o ``LocMemCache`` dos testes o painel não vem do cache: a conta é a de uma
+    requisição sem cache e não pode crescer com o número de temas e entregas.
+
+    O painel consulta em paralelo (``core.assincrono.em_paralelo``), cada
+    consulta na conexão da sua thread: os dados precisam estar confirmados
+    (``TransactionTestCase``) e ``assertNumQueries``, que só vê a conexão do
+    teste, não as contaria. A conta vem da medição de ``core.profiling``,
+    que soma as threads.
+    """
+
+    def setUp(self):
+        self.admin = criar_usuario("admin", User.TipoUsuario.ADMIN, is_staff=True)
+        self.orientador = criar_usuario("orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        self.aluno = criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="1")
+        for numero in range(3):
+            tema = TemaTCC.objects.create(
+                titulo=f"Tema {numero}",
+                descricao="Descrição",
+                aluno=self.aluno,
+                orientador=self.orientador,
+                status=TemaTCC.Status.EM_ANDAMENTO,
+            )
+            for versao in range(3):
+                Entrega.objects.create(tema=tema, titulo=f"Versão {versao}")
+
+    def consultas(self, usuario, url):
+        self.client.force_login(usuario)
+        with self.assertLogs("core.profiling", "INFO") as logs:
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        medicao = [json.loads(r.getMessage()) for r in logs.records if r.getMessage().startswith("{")]
+        return medicao[-1]["consultas"]
+
+    def test_painel(self):
+        for usuario, consultas in ((self.admin, 3), (self.orientador, 5), (self.aluno, 4)):
+            with self.subTest(usuario=usuario.username):
+                self.assertEqual(self.consultas(usuario, reverse("core:dashboard")), consultas)
+
+
+class PlanosDasConsultasDeUsuariosTests(PlanoDeConsultaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for numero in range(3):
+            criar_usuario(f"orientador{numero}", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+            criar_usuario(f"aluno{numero}", User.TipoUsuario.ALUNO, matricula=str(numero))
+
+    def test_lista_de_orientadores(self):
+        self.assertUsaIndice(
+            User.objects.filter(tipo=User.TipoUsuario.ORIENTADOR, is_active=True)
+            .annotate(total_temas=Count("temas_como_orientador"))
+            .order_by("nome_completo", "id")[:25],
+            "core_user_tipo_ativo_nome_idx",
+        )
+
+    def test_lista_de_usuarios_do_admin(self):
+        self.assertUsaIndice(
+            User.objects.exclude(tipo=User.TipoUsuario.ADMIN).order_by("nome_completo", "id")[:25],
+            "core_user_nome_idx",
+            percorre=True,
+        )
+
+    def test_importacao(self):
+        self.assertUsaIndice(
+            User.objects.annotate(email_normalizado=Lower("email")).filter(
+                email_normalizado="aluno0@exemplo.com"
+            ),
+            "core_user_email_unico",
+        )
+        self.assertUsaIndice(
+            User.objects.filter(matricula="0"), self.indice_unico(User._meta.db_table, ["matricula"])
+        )
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "a réplica é uma cópia do arquivo SQLite")
+class LeiturasNasReplicasTests(TransactionTestCase):
+    """O primário e uma réplica (cópia do banco de testes num arquivo à parte):
+    os GETs leem da réplica; depois de salvar um tema, o cookie leva as
+    leituras seguintes do usuário para o primário."""
+
+    REPLICA = "replica_teste"
+    # resolvido em setUpClass, quando a réplica já está em ``connections``; o
+    # executor não a conhece e não cria um banco de testes para ela
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        descritor, cls.arquivo = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(descritor)
+        connections.settings[cls.REPLICA] = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict, "NAME": cls.arquivo
+        }
+        super().setUpClass()
+        cls.enterClassContext(override_settings(REPLICAS_LEITURA=[cls.REPLICA]))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[cls.REPLICA].close()
+        del connections[cls.REPLICA]
+        del connections.settings[cls.REPLICA]
+        os.remove(cls.arquivo)
+
+    def setUp(self):
+        self.orientador = criar_usuario("orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        self.aluno = criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="1")
+        self.client.force_login(self.aluno)
+        self.replicar()
+
+    def replicar(self):
+        """Copia o primário para a réplica, como o ``copiar_replicas``."""
+        primario = connections[DEFAULT_DB_ALIAS]
+        primario.ensure_connection()
+        connections[self.REPLICA].close()
+        destino = sqlite3.connect(self.arquivo)
+        try:
+            primario.connection.backup(destino)
+        finally:
+            destino.close()
+
+    def consultas(self, metodo, url, dados=None):
+        """Faz a requisição e devolve quantas consultas foram ao primário e à réplica."""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as no_primario:
+            with CaptureQueriesContext(connections[self.REPLICA]) as na_replica:
+                resposta = getattr(self.client, metodo)(url, dados)
+        self.assertLess(resposta.status_code, 400)
+        return resposta, len(no_primario), len(na_replica)
+
+    def test_get_le_da_replica(self):
+        resposta, no_primario, na_replica = self.consultas("get", reverse("tcc:tema_list"))
+        self.assertEqual(no_primario, 0)
+        self.assertGreater(na_replica, 0)
+        self.assertNotIn(COOKIE, resposta.cookies)
+
+    def test_get_or_create_que_so_le_nao_marca_escrita(self):
+        # o painel do admin lê o resumo com ResumoSistema.obter()
+        self.client.force_login(criar_usuario("admin", User.TipoUsuario.ADMIN, is_staff=True))
+        self.replicar()
+        resposta, no_primario, na_replica = self.consultas("get", reverse("core:dashboard"))
+        self.assertEqual(no_primario, 0)
+        self.assertGreater(na_replica, 0)
+        self.assertNotIn(COOKIE, resposta.cookies)
+
+    def test_depois_de_salvar_le_do_primario(self):
+        resposta, _, na_replica = self.consultas(
+            "post",
+            reverse("tcc:tema_create"),
+            {
+                "titulo": "Tema novo",
+                "descricao": "Descrição",
+                "orientador": self.orientador.pk,
+                "status": TemaTCC.Status.PROPOSTO,
+            },
+        )
+        self.assertRedirects(resposta, reverse("tcc:tema_list"), fetch_redirect_response=False)
+        self.assertEqual(na_replica, 0)
+        self.assertIn(COOKIE, resposta.cookies)
+
+        resposta, no_primario, na_replica = self.consultas("get", reverse("tcc:tema_list"))
+        self.assertEqual(na_replica, 0)
+        self.assertGreater(no_primario, 0)
+        self.assertContains(resposta, "Tema novo")
+
+
+class TarefasTravadasTests(TestCase):
+    """Uma tarefa que derruba o worker fica em "executando": a recuperação conta
+    a tentativa e desiste dela ao chegar a ``max_tentativas``."""
+
+    def travar(self, tarefa):
+        tarefa.status = Tarefa.Status.EXECUTANDO
+        tarefa.worker = "host:1"
+        tarefa.iniciada_em = timezone.now() - timedelta(seconds=TEMPO_LIMITE + 1)
+        tarefa.save()
+
+    def test_conta_a_tentativa_e_falha_no_maximo(self):
+        tarefa = Tarefa.objects.create(nome="tcc.indexar_entrega", max_tentativas=2)
+
+        self.travar(tarefa)
+        self.assertEqual(recuperar_travadas(), (1, 0))
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas, tarefa.worker), (Tarefa.Status.PENDENTE, 1, ""))
+
+        self.travar(tarefa)
+        with self.assertLogs("core.tarefas", "ERROR"):
+            self.assertEqual(recuperar_travadas(), (0, 1))
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), (Tarefa.Status.FALHOU, 2))
+        self.assertIsNotNone(tarefa.concluida_em)
+        self.assertEqual(recuperar_travadas(), (0, 0))
+
+    def test_nao_mexe_nas_que_ainda_estao_no_prazo(self):
+        tarefa = Tarefa.objects.create(
+            nome="tcc.indexar_entrega", status=Tarefa.Status.EXECUTANDO, iniciada_em=timezone.now()
+        )
+        self.assertEqual(recuperar_travadas(), (0, 0))
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), (Tarefa.Status.EXECUTANDO, 0))
+
+
+@orcamento_consultas(1)
+def _duas_consultas(request):
+    User.objects.count()
+    User.objects.exists()
+    return HttpResponse()
+
+
+@orcamento_consultas(0)
+def _so_o_usuario(request):
+    return HttpResponse(request.user.username)
+
+
+urlpatterns = [
+    path("duas-consultas/", _duas_consultas),
+    path("so-o-usuario/", _so_o_usuario),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class OrcamentoDeConsultasTests(TestCase):
+    """Nos testes o orçamento é estrito (``core.executor_testes``)."""
+
+    def test_view_acima_do_orcamento_falha(self):
+        with self.assertRaisesMessage(OrcamentoExcedido, "fez 2 consultas (orçamento: 1)"):
+            self.client.get("/duas-consultas/")
+
+    def test_sessao_e_usuario_nao_contam(self):
+        self.client.force_login(criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="1"))
+        resposta = self.client.get("/so-o-usuario/")
+        self.assertContains(resposta, "aluno")
+
+
+def _cadastrar(dados, barreira, resultados):
+    """Um processo: espera os outros e posta o cadastro."""
+    try:
+        cliente = Client()
+        barreira.wait()
+        resposta = cliente.post(reverse("core:register"), dados)
+        resultados.put((resposta.status_code, resposta.content.decode()))
+    except Exception as exc:
+        resultados.put((None, repr(exc)))
+    finally:
+        connections.close_all()
+
+
+@unittest.skipIf(
+    connection.vendor == "sqlite" and not settings.SQLITE_OTIMIZADO,
+    "escritas concorrentes no SQLite pedem SQLITE_OTIMIZADO (BEGIN IMMEDIATE e busy_timeout)",
+)
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class CadastroConcorrenteTests(TransactionTestCase):
+    """Cadastros simultâneos com o mesmo e-mail ou matrícula: as restrições
+    únicas deixam passar um só, e os outros voltam ao formulário com o erro
+    do campo."""
+
+    TENTATIVAS = 4
+
+    def cadastrar_ao_mesmo_tempo(self, dados_por_tentativa):
+        """Um processo por cadastro, todos postando ao mesmo tempo; devolve o
+        status de cada resposta e o seu HTML."""
+        # os filhos herdam as configurações do teste (fork), mas não as conexões abertas
+        connections.close_all()
+        contexto = multiprocessing.get_context("fork")
+        barreira = contexto.Barrier(len(dados_por_tentativa))
+        resultados = contexto.Queue()
+        filhos = [
+            contexto.Process(target=_cadastrar, args=(dados, barreira, resultados))
+            for dados in dados_por_tentativa
+        ]
+        for filho in filhos:
+            filho.start()
+        respostas = [resultados.get(timeout=60) for _ in filhos]
+        for filho in filhos:
+            filho.join()
+        return respostas
+
+    def dados(self, indice, **campos):
+        return {
+            "username": f"aluno{indice}",
+            "nome_completo": f"Aluno {indice}",
+            "email": f"aluno{indice}@exemplo.com",
+            "matricula": f"2024{indice}",
+            "password1": "senha-forte-123",
+            "password2": "senha-forte-123",
+            **campos,
+        }
+
+    def assertUmCadastro(self, respostas, campo):
+        redirecionadas = [html for status, html in respostas if status == 302]
+        recusadas = [html for status, html in respostas if status == 200]
+        self.assertEqual(len(redirecionadas), 1)
+        self.assertEqual(len(recusadas), len(respostas) - 1)
+        for html in recusadas:
+            self.assertIn(escape(UNICOS_CADASTRO[campo][1]), html)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_mesmo_email(self):
+        respostas = self.cadastrar_ao_mesmo_tempo(
+            [self.dados(indice, email="Repetido@exemplo.com") for indice in range(self.TENTATIVAS)]
+        )
+        self.assertUmCadastro(respostas, "email")
+
+    def test_mesmo_email_com_outra_caixa(self):
+        respostas = self.cadastrar_ao_mesmo_tempo(
+            [
+                self.dados(indice, email=email)
+                for indice, email in enumerate(["repetido@exemplo.com", "REPETIDO@exemplo.com"])
+            ]
+        )
+        self.assertUmCadastro(respostas, "email")
+
+    def test_mesma_matricula(self):
+        respostas = self.cadastrar_ao_mesmo_tempo(
+            [self.dados(indice, matricula="20240001") for indice in range(self.TENTATIVAS)]
+        )
+        self.assertUmCadastro(respostas, "matricula")
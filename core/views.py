@@ -1,12 +1,20 @@
+from asgiref.sync import sync_to_async
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.db import IntegrityError
 from django.db.models import Q
 
-from tcc.models import TemaTCC, Entrega
+from tcc.models import Entrega, ResumoOrientador, ResumoSistema, TemaTCC
+from .assincrono import em_paralelo
+from .cache import aobter_ou_calcular, escopo_usuario
+from .condicional import condicional
+from .pagination import paginate_keyset
+from .permissoes import VER, exigir_admin, pode_editar_usuario, pode_ver_usuario
+from .profiling import orcamento_consultas
 from .forms import AlunoRegisterForm, UsuarioAdminForm
 from .models import User
 
@@ -18,10 +26,13 @@ def register_view(request):
         if form.is_valid():
             try:
                 form.save()
+            except IntegrityError:
+                if not form.errors:
+                    raise
+                # o campo repetido já está marcado no formulário (AlunoRegisterForm.save)
+            else:
                 messages.success(request, "Cadastro realizado com sucesso! Faça login.")
                 return redirect("core:login")
-            except ValidationError as e:
-                messages.error(request, f"Erro ao registrar: {e.message}")
     else:
         form = AlunoRegisterForm()
 
@@ -51,14 +62,37 @@ def logout_view(request):
     return redirect("core:login")
 
 
+def _versao_dashboard(request):
+    if request.user.tipo == User.TipoUsuario.ADMIN:
+        # o painel do admin é só a linha de contadores
+        return ResumoSistema.objects.filter(pk=ResumoSistema.PK).values().first() or {}
+    return TemaTCC.objects.permitidos(request.user, VER).versao()
+
+
+@orcamento_consultas(5)
 @login_required
-def dashboard_view(request):
-    user = request.user
+@condicional(_versao_dashboard)
+async def dashboard_view(request):
+    user = await request.auser()
+    if user.tipo == User.TipoUsuario.ADMIN:
+        escopos = ["global"]
+    else:
+        escopos = [escopo_usuario(user.pk)]
+    contexto = await aobter_ou_calcular(
+        "dashboard", escopos, lambda: _dashboard_contexto(user), user=user
+    )
+    return await sync_to_async(render)(request, "core/dashboard.html", contexto)
+
+
+async def _dashboard_contexto(user):
     contexto = {}
 
+    # consultas independentes: rodam ao mesmo tempo, cada uma na sua conexão
     if user.tipo == User.TipoUsuario.ALUNO:
-        temas = TemaTCC.objects.filter(aluno=user)
-        entregas = Entrega.objects.filter(tema__aluno=user).order_by("-data_entrega")[:5]
+        temas, entregas = await em_paralelo(
+            lambda: list(TemaTCC.objects.visible_to(user)),
+            lambda: list(Entrega.objects.visible_to(user).order_by("-data_entrega")[:5]),
+        )
 
         contexto.update(
             {
@@ -69,44 +103,49 @@ def dashboard_view(request):
         )
 
     elif user.tipo == User.TipoUsuario.ORIENTADOR:
-        temas = TemaTCC.objects.filter(orientador=user)
-        entregas_pendentes = Entrega.objects.filter(
-            tema__orientador=user,
-        ).order_by("-data_entrega")[:5]
+        temas, entregas_pendentes, resumo = await em_paralelo(
+            lambda: list(TemaTCC.objects.visible_to(user)),
+            lambda: list(Entrega.objects.visible_to(user).order_by("-data_entrega")[:5]),
+            lambda: ResumoOrientador.objects.filter(orientador=user).first(),
+        )
 
         contexto.update(
             {
                 "temas": temas,
                 "entregas_pendentes": entregas_pendentes,
+                "total_pendentes": resumo.entregas_pendentes if resumo else 0,
                 "tipo_dashboard": "orientador",
             }
         )
 
     else:  # ADMIN
+        # contadores mantidos por tcc.signals: uma leitura por chave primária
         contexto.update(
             {
-                "total_usuarios": User.objects.count(),
-                "total_temas": TemaTCC.objects.count(),
-                "total_entregas": Entrega.objects.count(),
+                "resumo": await sync_to_async(ResumoSistema.obter)(),
                 "tipo_dashboard": "admin",
             }
         )
 
-    return render(request, "core/dashboard.html", contexto)
+    return contexto
 
+@orcamento_consultas(3)
 @login_required
 def usuario_list_view(request):
-    if request.user.tipo != User.TipoUsuario.ADMIN:
-        raise PermissionDenied()
+    exigir_admin(request.user)
 
-    usuarios = User.objects.exclude(tipo=User.TipoUsuario.ADMIN).order_by("nome_completo")
-    return render(request, "core/usuario_list.html", {"usuarios": usuarios})
+    usuarios = User.objects.exclude(tipo=User.TipoUsuario.ADMIN)
+    page = paginate_keyset(request, usuarios, ("nome_completo", "id"))
+    return render(
+        request,
+        "core/usuario_list.html",
+        {"usuarios": page.object_list, "page_obj": page},
+    )
 
 
 @login_required
 def usuario_create_view(request):
-    if request.user.tipo != User.TipoUsuario.ADMIN:
-        raise PermissionDenied()
+    exigir_admin(request.user)
 
     if request.method == "POST":
         form = UsuarioAdminForm(request.POST)
@@ -125,11 +164,10 @@ def usuario_create_view(request):
 
 @login_required
 def usuario_update_view(request, pk):
-    if request.user.tipo != User.TipoUsuario.ADMIN:
-        raise PermissionDenied()
+    exigir_admin(request.user)
 
     usuario = get_object_or_404(User, pk=pk)
-    if usuario.tipo == User.TipoUsuario.ADMIN:
+    if not pode_editar_usuario(request.user, usuario):
         raise PermissionDenied()
 
     if request.method == "POST":
@@ -146,13 +184,13 @@ def usuario_update_view(request, pk):
 
     return render(request, "core/usuario_form.html", {"form": form, "titulo": "Editar usuário"})
 
+@orcamento_consultas(4)
 @login_required
 def usuario_detail_view(request, pk):
-    usuario = get_object_or_404(User, pk=pk)
-
     # admin pode ver todo mundo; o próprio usuário pode ver ele mesmo
-    if not (request.user.tipo == User.TipoUsuario.ADMIN or request.user.pk == usuario.pk):
+    if not pode_ver_usuario(request.user, pk):
         raise PermissionDenied()
+    usuario = get_object_or_404(User, pk=pk)
 
     temas = TemaTCC.objects.filter(
         Q(aluno=usuario) | Q(orientador=usuario)
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,11 +24,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.estaticos.EstaticosMiddleware",  # estáticos saem antes de qualquer outro
+    "core.profiling.ProfilingMiddleware",  # mede todo o resto
+    "core.replicas.ReplicaMiddleware",  # antes da sessão, que também é lida do banco
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.autenticacao.AuthenticationMiddleware",  # usuário vem do cache
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -36,7 +40,8 @@ ROOT_URLCONF = "gestao_tcc.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates que informa o tempo de renderização ao core.profiling
+        "BACKEND": "core.profiling.DjangoTemplatesCronometrado",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -56,9 +61,90 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # testes num arquivo, não na memória: os de concorrência e as consultas
+        # em paralelo do painel (core.assincrono) abrem conexões próprias. Fica
+        # no diretório temporário, com os -wal/-shm do modo WAL
+        "TEST": {"NAME": os.path.join(tempfile.gettempdir(), "gestao_tcc_testes.sqlite3")},
     }
 }
 
+# SQLite com vários processos (gunicorn com vários workers, run_workers). WAL
+# deixa ler durante uma escrita; busy_timeout espera o lock em vez de falhar
+# na hora; BEGIN IMMEDIATE pega o lock de escrita já no início da transação,
+# em vez de tentar promover uma leitura (o que dá "database is locked" sem
+# esperar quando duas transações tentam ao mesmo tempo).
+SQLITE_OTIMIZADO = os.environ.get("SQLITE_OTIMIZADO", "True") == "True"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # seguro com WAL; só o último commit pode se perder numa queda de energia
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),  # ms
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),  # bytes
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -64000)),  # negativo: em KiB
+    "temp_store": "MEMORY",
+}
+if SQLITE_OTIMIZADO:
+    DATABASES["default"]["OPTIONS"] = {
+        "init_command": ";".join(f"PRAGMA {nome}={valor}" for nome, valor in SQLITE_PRAGMAS.items()),
+        "transaction_mode": "IMMEDIATE",
+    }
+
+# Réplicas de leitura (core.replicas): DATABASE_REPLICAS é uma lista de
+# arquivos separados por vírgula, com o mesmo esquema do primário, que viram
+# os aliases "replica1", "replica2"... A replicação em si fica por conta da
+# infraestrutura (ex.: Litestream/LiteFS); localmente, copie o banco com
+# ``manage.py copiar_replicas``.
+REPLICAS_LEITURA = []
+for numero, caminho in enumerate(
+    (c.strip() for c in os.environ.get("DATABASE_REPLICAS", "").split(",") if c.strip()), start=1
+):
+    DATABASES[f"replica{numero}"] = {
+        **DATABASES["default"],
+        "NAME": caminho,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICAS_LEITURA.append(f"replica{numero}")
+DATABASE_ROUTERS = ["core.replicas.RoteadorReplicas"]
+# segundos em que o usuário que acabou de escrever continua lendo do primário
+REPLICA_ATRASO_MAXIMO = int(os.environ.get("REPLICA_ATRASO_MAXIMO", 5))
+
+# Cache das páginas por usuário (core.cache). CACHE_BACKEND aceita "locmem",
+# "file" ou o caminho completo de um backend do Django (ex.: Redis/Memcached).
+# Precisa ser compartilhado pelos workers: "file" serve a uma máquina, Redis ou
+# Memcached a várias. "locmem" é de cada processo, então desliga o cache de
+# páginas e o do usuário autenticado (as invalidações não chegariam aos outros
+# workers).
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "file")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "gestao_tcc_cache")
+            if CACHE_BACKEND == "file"
+            else "gestao-tcc",
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+TCC_CACHE_TIMEOUT = int(os.environ.get("TCC_CACHE_TIMEOUT", "300"))
+
+# Sessões: "cached_db" lê do cache e só vai ao banco numa falha; "signed_cookies"
+# guarda a sessão (assinada, não criptografada) no próprio cookie, sem banco.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cached_db")
+SESSION_ENGINE = SESSION_ENGINES.get(SESSION_BACKEND, SESSION_BACKEND)
+# usuário autenticado em cache (core.autenticacao)
+USUARIO_CACHE_TIMEOUT = int(os.environ.get("USUARIO_CACHE_TIMEOUT", "300"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -76,10 +162,58 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# nomes com hash, pacotes de CSS minificados e versões .gz/.br (core.estaticos);
+# em produção exige rodar ``collectstatic`` a cada deploy
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.estaticos.ArmazenamentoEstatico"},
+}
+PACOTES_CSS = {
+    "css/app.css": ["css/variables.css", "css/style.css"],
+}
+# serve o STATIC_ROOT pelo próprio processo, com cache "immutable" (sem DEBUG)
+SERVIR_ESTATICOS = os.environ.get("SERVIR_ESTATICOS", str(not DEBUG)) == "True"
 
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Download de entregas (tcc.downloads): "django", "xsendfile" ou "xaccel".
+# Os arquivos de MEDIA_ROOT não são servidos diretamente: todo download passa
+# pela checagem de acesso de tcc:entrega_download.
+ENTREGA_DOWNLOAD_BACKEND = os.environ.get("ENTREGA_DOWNLOAD_BACKEND", "django")
+ENTREGA_XACCEL_PREFIX = os.environ.get("ENTREGA_XACCEL_PREFIX", "/protected-media/")
+
+# Tarefas em segundo plano (core.tarefas). Sem um worker rodando
+# (python manage.py run_workers), TAREFAS_SINCRONAS=True as executa logo
+# após o commit da requisição que as criou.
+TAREFAS_SINCRONAS = os.environ.get("TAREFAS_SINCRONAS", "False") == "True"
+
+# Medição por requisição (core.profiling). O cabeçalho Server-Timing expõe os
+# tempos internos: por padrão só com DEBUG. PERF_ORCAMENTO_ESTRITO faz o
+# orçamento de consultas das views virar erro; nos testes fica sempre ligado
+# (core.executor_testes).
+PERF_SERVER_TIMING = os.environ.get("PERF_SERVER_TIMING", str(DEBUG)) == "True"
+PERF_CONSULTA_LENTA_MS = float(os.environ.get("PERF_CONSULTA_LENTA_MS", "100"))
+PERF_ORCAMENTO_ESTRITO = os.environ.get("PERF_ORCAMENTO_ESTRITO", "False") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # uma linha JSON por requisição (INFO) e consultas lentas/orçamentos (WARNING)
+        "core.profiling": {
+            "handlers": ["console"],
+            "level": os.environ.get("PERF_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+TEST_RUNNER = "core.executor_testes.ExecutorTestes"
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
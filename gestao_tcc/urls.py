@@ -1,5 +1,3 @@
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -8,6 +6,3 @@ urlpatterns = [
     path("", include(("core.urls", "core"), namespace="core")),
     path("tcc/", include(("tcc.urls", "tcc"), namespace="tcc")),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
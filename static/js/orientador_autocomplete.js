@@ -0,0 +1,55 @@
+// Autocomplete do orientador (tcc.forms.OrientadorAutocomplete): o <select>
+// vem só com a opção escolhida; as demais são buscadas conforme se digita.
+(function () {
+    "use strict";
+
+    var ESPERA_MS = 200;
+
+    function preencher(select, resultados) {
+        var atual = select.value;
+        // mantém a opção vazia e a escolhida; troca o resto pelos resultados
+        Array.prototype.slice.call(select.options).forEach(function (opcao) {
+            if (opcao.value && opcao.value !== atual) {
+                opcao.remove();
+            }
+        });
+        resultados.forEach(function (resultado) {
+            if (String(resultado.id) !== atual) {
+                select.add(new Option(resultado.texto, resultado.id));
+            }
+        });
+    }
+
+    document.querySelectorAll("[data-orientador-busca]").forEach(function (busca) {
+        var select = document.getElementById(busca.dataset.orientadorBusca);
+        var espera = null;
+        var pendente = null;
+
+        function buscar() {
+            if (pendente) {
+                pendente.abort();
+            }
+            pendente = new AbortController();
+            var url = busca.dataset.url + "?q=" + encodeURIComponent(busca.value.trim());
+            fetch(url, { signal: pendente.signal, headers: { Accept: "application/json" } })
+                .then(function (resposta) {
+                    return resposta.ok ? resposta.json() : { resultados: [] };
+                })
+                .then(function (dados) {
+                    preencher(select, dados.resultados);
+                })
+                .catch(function () {});  // cancelada por uma busca mais recente, ou sem rede: mantém as opções
+        }
+
+        busca.addEventListener("input", function () {
+            clearTimeout(espera);
+            espera = setTimeout(buscar, ESPERA_MS);
+        });
+        // abrir o campo sem digitar mostra os primeiros orientadores
+        busca.addEventListener("focus", function () {
+            if (select.options.length <= 2) {
+                buscar();
+            }
+        }, { once: true });
+    });
+})();
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from .busca import buscar_temas
 from .models import TemaTCC, Entrega
 
 
@@ -6,13 +7,21 @@ from .models import TemaTCC, Entrega
 class TemaTCCAdmin(admin.ModelAdmin):
     list_display = ("titulo", "aluno", "orientador", "status", "data_inicio")
     list_filter = ("status", "data_inicio")
+    list_select_related = ("aluno", "orientador")
     search_fields = ("titulo", "aluno__nome_completo", "orientador__nome_completo")
     readonly_fields = ("criado_em",) if hasattr(TemaTCC, "criado_em") else ()
 
+    def get_search_results(self, request, queryset, search_term):
+        # índice FTS em vez de LIKE '%...%' nos campos e nos joins
+        if not search_term.strip():
+            return queryset, False
+        return buscar_temas(queryset, search_term), False
+
 
 @admin.register(Entrega)
 class EntregaAdmin(admin.ModelAdmin):
     list_display = ("titulo", "tema", "data_entrega", "nota")
     list_filter = ("data_entrega", "nota")
+    list_select_related = ("tema",)
     search_fields = ("titulo", "tema__titulo")
     readonly_fields = ("data_entrega",) if not Entrega._meta.get_field("data_entrega").blank else ()
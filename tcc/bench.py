@@ -0,0 +1,485 @@
+"""Massa de dados sintética e benchmarks HTTP (comandos seed_bench, bench_http e bench_asgi).
+
+Todos os usuários gerados têm username começando com ``PREFIXO`` e a senha
+``SENHA``; ``seed_bench --limpar`` remove só eles (e, em cascata, os temas e
+entregas deles).
+"""
+import asyncio
+import datetime
+import io
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from core.cache import invalidar
+from core.models import User
+from .models import Entrega, TemaTCC
+from .resumo import reconstruir_resumo
+
+PREFIXO = "bench_"
+SENHA = "bench"
+DATA_BASE = datetime.date(2024, 2, 1)  # fixa: o mesmo --seed gera os mesmos dados
+
+NOMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor",
+    "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+    "Sofia", "Thiago", "Vitória", "William",
+]
+SOBRENOMES = [
+    "Almeida", "Barbosa", "Cardoso", "Dias", "Esteves", "Ferreira", "Gomes", "Lima",
+    "Martins", "Nogueira", "Oliveira", "Pereira", "Ribeiro", "Santos", "Teixeira", "Vieira",
+]
+AREAS = ["Engenharia de Software", "Banco de Dados", "Redes", "Inteligência Artificial", "Segurança"]
+PALAVRAS = (
+    "sistema análise dados aprendizado modelo rede desempenho avaliação proposta "
+    "arquitetura aplicação gestão processo algoritmo otimização segurança web móvel "
+    "estudo caso ferramenta integração serviço banco consulta índice escalabilidade"
+).split()
+STATUS_PESOS = {
+    TemaTCC.Status.PROPOSTO: 2,
+    TemaTCC.Status.EM_ANDAMENTO: 5,
+    TemaTCC.Status.CONCLUIDO: 2,
+    TemaTCC.Status.CANCELADO: 1,
+}
+LOTE = 1000
+
+
+# GERAÇÃO
+
+
+def _frase(rng, minimo, maximo):
+    return " ".join(rng.choice(PALAVRAS) for _ in range(rng.randint(minimo, maximo)))
+
+
+def _pdf_ficticio(rng, tamanho):
+    texto = _frase(rng, 200, 400)
+    conteudo = f"%PDF-1.4\n1 0 obj\nstream\nBT ({texto}) Tj ET\nendstream\nendobj\n".encode()
+    return conteudo + b"%" + b"0" * max(tamanho - len(conteudo) - 7, 0) + b"\n%%EOF\n"
+
+
+def limpar():
+    with transaction.atomic():
+        apagados, _ = User.objects.filter(username__startswith=PREFIXO).delete()
+    reconstruir_resumo()
+    invalidar("global", "orientadores")
+    return apagados
+
+
+def gerar(alunos, orientadores, admins=1, temas_por_aluno=1, entregas_por_tema=5,
+          arquivos=50, tamanho_arquivo=64 * 1024, seed=42, saida=None):
+    """Gera a massa de dados com ``bulk_create``; devolve as quantidades criadas."""
+    rng = random.Random(seed)
+    escrever = saida or (lambda mensagem: None)
+    senha = make_password(SENHA)  # mesmo hash para todos: não é o que se quer medir
+
+    def nome():
+        return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+    usuarios = []
+    for i in range(alunos):
+        usuarios.append(User(
+            username=f"{PREFIXO}aluno{i:06d}", email=f"{PREFIXO}aluno{i:06d}@bench.local",
+            nome_completo=nome(), tipo=User.TipoUsuario.ALUNO, matricula=f"B{seed}-{i:06d}",
+            password=senha,
+        ))
+    for i in range(orientadores):
+        usuarios.append(User(
+            username=f"{PREFIXO}orientador{i:05d}", email=f"{PREFIXO}orientador{i:05d}@bench.local",
+            nome_completo=nome(), tipo=User.TipoUsuario.ORIENTADOR, area_atuacao=rng.choice(AREAS),
+            password=senha,
+        ))
+    for i in range(admins):
+        usuarios.append(User(
+            username=f"{PREFIXO}admin{i:03d}", email=f"{PREFIXO}admin{i:03d}@bench.local",
+            nome_completo=nome(), tipo=User.TipoUsuario.ADMIN, is_staff=True, password=senha,
+        ))
+    User.objects.bulk_create(usuarios, batch_size=LOTE)
+    escrever(f"{len(usuarios)} usuários")
+
+    bench = User.objects.filter(username__startswith=PREFIXO)
+    ids_alunos = list(
+        bench.filter(tipo=User.TipoUsuario.ALUNO).order_by("username").values_list("id", flat=True)
+    )
+    ids_orientadores = list(
+        bench.filter(tipo=User.TipoUsuario.ORIENTADOR).order_by("username").values_list("id", flat=True)
+    )
+
+    status_possiveis = list(STATUS_PESOS)
+    pesos = list(STATUS_PESOS.values())
+    temas = []
+    for aluno_id in ids_alunos:
+        for n in range(temas_por_aluno):
+            status = rng.choices(status_possiveis, pesos)[0]
+            sem_orientador = status == TemaTCC.Status.PROPOSTO and rng.random() < 0.5
+            inicio = DATA_BASE - datetime.timedelta(days=rng.randint(30, 400))
+            temas.append(TemaTCC(
+                titulo=f"{_frase(rng, 3, 7).capitalize()} ({n + 1})",
+                descricao=_frase(rng, 20, 60),
+                aluno_id=aluno_id,
+                orientador_id=(
+                    None if sem_orientador or not ids_orientadores else rng.choice(ids_orientadores)
+                ),
+                status=status,
+                data_inicio=None if status == TemaTCC.Status.PROPOSTO else inicio,
+                data_fim_prevista=(
+                    None if status == TemaTCC.Status.PROPOSTO else inicio + datetime.timedelta(days=180)
+                ),
+            ))
+    TemaTCC.objects.bulk_create(temas, batch_size=LOTE)
+    escrever(f"{len(temas)} temas")
+
+    # poucos arquivos distintos, compartilhados (o armazenamento é por conteúdo)
+    storage = Entrega._meta.get_field("arquivo").storage
+    nomes_arquivos = [
+        storage.save("entregas/bench.pdf", ContentFile(_pdf_ficticio(rng, tamanho_arquivo)))
+        for _ in range(max(arquivos, 1))
+    ]
+    escrever(f"{len(nomes_arquivos)} arquivos")
+
+    total_entregas = 0
+    lote = []
+    # lista, e não iterator(): no SQLite não convém ler e inserir ao mesmo tempo
+    temas_com_entregas = list(
+        TemaTCC.objects.filter(aluno_id__in=ids_alunos)
+        .exclude(status=TemaTCC.Status.PROPOSTO)
+        .order_by("id")
+        .values_list("id", "status", "data_inicio")
+    )
+    for tema_id, status, inicio in temas_com_entregas:
+        quantidade = rng.randint(max(entregas_por_tema // 2, 1), max(entregas_por_tema * 3 // 2, 1))
+        for n in range(quantidade):
+            avaliada = status == TemaTCC.Status.CONCLUIDO or rng.random() < 0.6
+            lote.append(Entrega(
+                tema_id=tema_id,
+                titulo=f"Entrega {n + 1}: {_frase(rng, 2, 4)}",
+                arquivo=rng.choice(nomes_arquivos),
+                data_entrega=min((inicio or DATA_BASE) + datetime.timedelta(days=15 * (n + 1)), DATA_BASE),
+                nota=Decimal(rng.randint(40, 100)) / 10 if avaliada else None,
+                comentario_orientador=_frase(rng, 5, 15) if avaliada else None,
+            ))
+        if len(lote) >= LOTE:
+            Entrega.objects.bulk_create(lote)
+            total_entregas += len(lote)
+            lote = []
+    if lote:
+        Entrega.objects.bulk_create(lote)
+        total_entregas += len(lote)
+    escrever(f"{total_entregas} entregas")
+
+    # bulk_create não dispara os sinais: contadores e cache de uma vez
+    reconstruir_resumo()
+    invalidar("global", "orientadores")
+    return {
+        "usuários": len(usuarios),
+        "temas": len(temas),
+        "entregas": total_entregas,
+        "arquivos": len(nomes_arquivos),
+    }
+
+
+# BENCHMARK
+
+
+def percentil(ordenados, p):
+    """Percentil ``p`` (0-100) de uma lista já ordenada, com interpolação linear."""
+    if len(ordenados) == 1:
+        return ordenados[0]
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def usuarios_de_referencia():
+    """Um usuário de cada papel, com dados para todas as telas."""
+    bench = User.objects.filter(username__startswith=PREFIXO)
+    aluno = (
+        bench.filter(tipo=User.TipoUsuario.ALUNO, temas_como_aluno__entregas__isnull=False)
+        .order_by("username").first()
+    )
+    orientador = (
+        bench.filter(tipo=User.TipoUsuario.ORIENTADOR, temas_como_orientador__entregas__isnull=False)
+        .order_by("username").first()
+    )
+    admin = bench.filter(tipo=User.TipoUsuario.ADMIN).order_by("username").first()
+    return {"aluno": aluno, "orientador": orientador, "admin": admin}
+
+
+def _parametros(usuario, referencia):
+    """Valores para os parâmetros das URLs, conforme o que o usuário pode ver."""
+    tema = TemaTCC.objects.visible_to(usuario).filter(entregas__isnull=False).order_by("id").first()
+    entrega = Entrega.objects.filter(tema=tema).order_by("id").first()
+    admin = usuario.tipo == User.TipoUsuario.ADMIN
+    orientador = usuario if usuario.tipo == User.TipoUsuario.ORIENTADOR else referencia["orientador"]
+    return {
+        "temas/": tema.pk if tema else None,
+        "entregas/": entrega.pk if entrega else None,
+        "orientadores/": orientador.pk,
+        # o admin edita/vê outros usuários; os demais, só a si mesmos
+        "usuarios/": referencia["aluno"].pk if admin else usuario.pk,
+    }
+
+
+def rotas(modulos, ignorar=("logout",)):
+    """``(nome com namespace, rota, parâmetros)`` de cada URL dos módulos."""
+    for modulo in modulos:
+        for padrao in modulo.urlpatterns:
+            if isinstance(padrao, URLPattern) and padrao.name and padrao.name not in ignorar:
+                rota = str(padrao.pattern)
+                yield f"{modulo.app_name}:{padrao.name}", rota, list(padrao.pattern.converters)
+
+
+def medir(cliente, url, repeticoes, aquecimento=1):
+    for _ in range(aquecimento):
+        resposta = cliente.get(url)
+        _consumir(resposta)
+
+    tempos = []
+    consultas = []
+    status = None
+    inicio_total = time.perf_counter()
+    for _ in range(repeticoes):
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            resposta = cliente.get(url)
+            _consumir(resposta)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(len(capturadas))
+        status = resposta.status_code
+    duracao = time.perf_counter() - inicio_total
+
+    tempos.sort()
+    return {
+        "status": status,
+        "repeticoes": repeticoes,
+        "p50_ms": round(percentil(tempos, 50), 2),
+        "p95_ms": round(percentil(tempos, 95), 2),
+        "p99_ms": round(percentil(tempos, 99), 2),
+        "media_ms": round(statistics.fmean(tempos), 2),
+        "req_por_s": round(repeticoes / duracao, 1) if duracao else None,
+        "consultas": max(consultas),
+    }
+
+
+def _consumir(resposta):
+    if resposta.streaming:
+        for _ in resposta.streaming_content:
+            pass
+    resposta.close()
+
+
+def executar_benchmark(cliente_para, modulos, repeticoes, aquecimento=1, filtro="", saida=None):
+    """Mede cada URL de ``modulos`` como cada papel; devolve a lista de resultados."""
+    escrever = saida or (lambda mensagem: None)
+    referencia = usuarios_de_referencia()
+    faltando = [papel for papel, usuario in referencia.items() if usuario is None]
+    if faltando:
+        raise LookupError(f"Sem usuários de benchmark para: {', '.join(faltando)} (rode seed_bench).")
+
+    resultados = []
+    for papel, usuario in referencia.items():
+        cliente = cliente_para(usuario)
+        valores = _parametros(usuario, referencia)
+        for nome, rota, parametros in rotas(modulos):
+            if filtro and filtro not in nome:
+                continue
+            kwargs = {}
+            for parametro in parametros:
+                prefixo = next((p for p in valores if rota.startswith(p)), None)
+                kwargs[parametro] = valores.get(prefixo)
+            if None in kwargs.values():
+                continue
+            url = reverse(nome, kwargs=kwargs)
+            resultado = {"papel": papel, "nome": nome, "url": url, **medir(cliente, url, repeticoes, aquecimento)}
+            resultados.append(resultado)
+            escrever(resultado)
+    return resultados
+
+
+# CONCORRÊNCIA (WSGI x ASGI)
+#
+# Os dois handlers do Django são chamados no próprio processo, sem servidor:
+# o WSGI por um pool com uma thread por cliente (como um servidor com threads),
+# o ASGI por uma tarefa asyncio por cliente. Cada cliente faz suas requisições
+# em sequência; a vazão é o total de requisições pelo tempo do lote.
+
+HOST = "localhost"
+
+
+def _cabecalho_cookie(usuario):
+    cliente = Client()
+    cliente.force_login(usuario)
+    return f"{settings.SESSION_COOKIE_NAME}={cliente.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def _requisicao_wsgi(app, caminho, cookie):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": caminho,
+        "QUERY_STRING": "",
+        "SERVER_NAME": HOST,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": HOST,
+        "HTTP_COOKIE": cookie,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    status = []
+
+    def start_response(linha, cabecalhos, exc_info=None):
+        status.append(int(linha.split()[0]))
+
+    corpo = app(environ, start_response)
+    try:
+        for _ in corpo:
+            pass
+    finally:
+        if hasattr(corpo, "close"):
+            corpo.close()
+    return status[0]
+
+
+async def _requisicao_asgi(app, caminho, cookie):
+    escopo = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": caminho,
+        "raw_path": caminho.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", HOST.encode()), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (HOST, 80),
+    }
+    comunicador = ApplicationCommunicator(app, escopo)
+    await comunicador.send_input({"type": "http.request", "body": b"", "more_body": False})
+    inicio = await comunicador.receive_output(timeout=60)
+    while True:
+        mensagem = await comunicador.receive_output(timeout=60)
+        if not mensagem.get("more_body"):
+            break
+    await comunicador.wait()
+    return inicio["status"]
+
+
+def _resumo(tempos, status, duracao):
+    tempos.sort()
+    return {
+        "requisicoes": len(tempos),
+        "req_por_s": round(len(tempos) / duracao, 1) if duracao else None,
+        "p50_ms": round(percentil(tempos, 50), 2),
+        "p95_ms": round(percentil(tempos, 95), 2),
+        "p99_ms": round(percentil(tempos, 99), 2),
+        "erros": sum(1 for s in status if s >= 400),
+    }
+
+
+def carga_wsgi(caminho, cookie, clientes, requisicoes):
+    app = WSGIHandler()
+    _requisicao_wsgi(app, caminho, cookie)  # aquecimento
+
+    def cliente():
+        resultados = []
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            status = _requisicao_wsgi(app, caminho, cookie)
+            resultados.append(((time.perf_counter() - inicio) * 1000, status))
+        return resultados
+
+    inicio_total = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        futuros = [pool.submit(cliente) for _ in range(clientes)]
+        medidas = [m for futuro in futuros for m in futuro.result()]
+    duracao = time.perf_counter() - inicio_total
+    return _resumo([t for t, _ in medidas], [s for _, s in medidas], duracao)
+
+
+def carga_asgi(caminho, cookie, clientes, requisicoes):
+    app = ASGIHandler()
+
+    async def cliente():
+        resultados = []
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            status = await _requisicao_asgi(app, caminho, cookie)
+            resultados.append(((time.perf_counter() - inicio) * 1000, status))
+        return resultados
+
+    async def lote():
+        await _requisicao_asgi(app, caminho, cookie)  # aquecimento
+        inicio_total = time.perf_counter()
+        grupos = await asyncio.gather(*(cliente() for _ in range(clientes)))
+        return [m for grupo in grupos for m in grupo], time.perf_counter() - inicio_total
+
+    medidas, duracao = asyncio.run(lote())
+    return _resumo([t for t, _ in medidas], [s for _, s in medidas], duracao)
+
+
+def executar_concorrencia(nomes, clientes, requisicoes, filtro="", saida=None):
+    """Mede cada URL de ``nomes`` como cada papel, primeiro por WSGI e depois por ASGI."""
+    escrever = saida or (lambda mensagem: None)
+    referencia = usuarios_de_referencia()
+    faltando = [papel for papel, usuario in referencia.items() if usuario is None]
+    if faltando:
+        raise LookupError(f"Sem usuários de benchmark para: {', '.join(faltando)} (rode seed_bench).")
+
+    resultados = []
+    for papel, usuario in referencia.items():
+        cookie = _cabecalho_cookie(usuario)
+        valores = _parametros(usuario, referencia)
+        for nome, parametro in nomes:
+            if filtro and filtro not in nome:
+                continue
+            kwargs = {}
+            if parametro:
+                prefixo, argumento = parametro
+                if valores[prefixo] is None:
+                    continue
+                kwargs[argumento] = valores[prefixo]
+            url = reverse(nome, kwargs=kwargs)
+            for modo, carga in (("wsgi", carga_wsgi), ("asgi", carga_asgi)):
+                resultado = {
+                    "papel": papel,
+                    "nome": nome,
+                    "modo": modo,
+                    "clientes": clientes,
+                    **carga(url, cookie, clientes, requisicoes),
+                }
+                resultados.append(resultado)
+                escrever(resultado)
+    return resultados
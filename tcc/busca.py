@@ -0,0 +1,79 @@
+"""Busca textual de temas e de orientadores.
+
+No SQLite usa os índices FTS5 ``tcc_tematcc_busca`` (migração 0005), ordenando
+pela relevância (bm25), e ``tcc_orientador_busca`` (0009), para o
+autocomplete. Em outros bancos cai para ``icontains``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABELA_BUSCA = "tcc_tematcc_busca"
+TABELA_ORIENTADORES = "tcc_orientador_busca"
+PALAVRA_RE = re.compile(r"\w+", re.UNICODE)
+LIMITE_RESULTADOS = 50
+
+
+def montar_consulta_fts(termo):
+    """Transforma o texto digitado em uma consulta FTS5 segura.
+
+    Cada palavra vira um prefixo entre aspas (``"anal"*``), combinadas com AND,
+    então operadores e aspas digitados pelo usuário não quebram a consulta.
+    """
+    palavras = PALAVRA_RE.findall(termo or "")
+    return " ".join(f'"{p}"*' for p in palavras)
+
+
+def buscar_temas(queryset, termo):
+    """Filtra ``queryset`` pelos temas que correspondem a ``termo``, mais relevantes primeiro."""
+    consulta = montar_consulta_fts(termo)
+    if not consulta:
+        return queryset.none()
+
+    if connection.vendor != "sqlite":
+        filtro = Q()
+        for palavra in PALAVRA_RE.findall(termo):
+            filtro &= (
+                Q(titulo__icontains=palavra)
+                | Q(descricao__icontains=palavra)
+                | Q(aluno__nome_completo__icontains=palavra)
+                | Q(orientador__nome_completo__icontains=palavra)
+            )
+        return queryset.filter(filtro)
+
+    # junta o índice FTS uma vez só: o MATCH filtra e a mesma linha dá o rank
+    tabela_tema = queryset.model._meta.db_table
+    return queryset.extra(
+        select={"relevancia": f"{TABELA_BUSCA}.rank"},
+        tables=[TABELA_BUSCA],
+        where=[f"{TABELA_BUSCA} MATCH %s", f"{TABELA_BUSCA}.rowid = {tabela_tema}.id"],
+        params=[consulta],
+    ).order_by("relevancia", "titulo", "id")
+
+
+def buscar_orientadores(queryset, termo):
+    """Filtra ``queryset`` pelos orientadores com palavras do nome ou da área
+    começando pelas palavras de ``termo`` ("ana sil" encontra "Ana Silva")."""
+    consulta = montar_consulta_fts(termo)
+    if not consulta:
+        return queryset.none()
+
+    if connection.vendor != "sqlite":
+        filtro = Q()
+        for palavra in PALAVRA_RE.findall(termo):
+            filtro &= (
+                Q(nome_completo__istartswith=palavra)
+                | Q(nome_completo__icontains=f" {palavra}")
+                | Q(area_atuacao__istartswith=palavra)
+                | Q(area_atuacao__icontains=f" {palavra}")
+            )
+        return queryset.filter(filtro)
+
+    return queryset.filter(
+        id__in=RawSQL(
+            f"SELECT rowid FROM {TABELA_ORIENTADORES} WHERE {TABELA_ORIENTADORES} MATCH %s",
+            [consulta],
+        )
+    )
@@ -0,0 +1,203 @@
+"""Entrega de arquivos já autorizados pela view.
+
+``ENTREGA_DOWNLOAD_BACKEND`` define quem envia os bytes:
+
+* ``"django"`` (padrão): o próprio Django, com suporte a ``Range``,
+  ``ETag`` e ``If-None-Match``;
+* ``"xsendfile"``: cabeçalho ``X-Sendfile`` (Apache mod_xsendfile, lighttpd);
+* ``"xaccel"``: cabeçalho ``X-Accel-Redirect`` para uma ``location internal``
+  do nginx em ``ENTREGA_XACCEL_PREFIX``.
+
+``zip_de_entregas`` monta um ZIP com vários arquivos em fluxo: os bytes saem
+à medida que cada arquivo é lido, sem arquivo temporário.
+"""
+import logging
+import mimetypes
+import os
+import re
+import zipfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+
+from .storage import NOME_CONTEUDO
+from .streaming import zip_em_fluxo
+from .validators import extensao
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_BLOCO = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# formatos que já são compactados: recomprimir só gasta CPU
+EXTENSOES_SEM_COMPRESSAO = {".docx", ".zip", ".pdf"}
+
+
+def _backend():
+    return getattr(settings, "ENTREGA_DOWNLOAD_BACKEND", "django")
+
+
+def calcular_etag(fieldfile):
+    """O hash do nome (armazenamento por conteúdo) ou tamanho + mtime."""
+    correspondencia = NOME_CONTEUDO.match(fieldfile.name)
+    if correspondencia:
+        return quote_etag(correspondencia.group("hash"))
+    storage = fieldfile.storage
+    modificado = int(storage.get_modified_time(fieldfile.name).timestamp())
+    return quote_etag(f"{storage.size(fieldfile.name):x}-{modificado:x}")
+
+
+def _etag_confere(request, etag):
+    cabecalho = request.headers.get("If-None-Match")
+    if not cabecalho:
+        return False
+    etags = parse_etags(cabecalho)
+    return "*" in etags or etag in etags
+
+
+def _intervalo(request, tamanho, etag):
+    """``(inicio, fim)`` do cabeçalho Range, ``None`` para o arquivo inteiro, ou ``False`` se inválido."""
+    cabecalho = request.headers.get("Range")
+    if not cabecalho:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        return None
+    correspondencia = RANGE_RE.match(cabecalho.strip())
+    if not correspondencia:
+        return None  # múltiplos intervalos ou unidade desconhecida: envia tudo
+    inicio, fim = correspondencia.groups()
+    if not inicio:
+        if not fim:
+            return False
+        inicio, fim = max(tamanho - int(fim), 0), tamanho - 1
+    else:
+        inicio = int(inicio)
+        fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio > fim or inicio >= tamanho:
+        return False
+    return inicio, fim
+
+
+def _ler_intervalo(arquivo, inicio, tamanho):
+    try:
+        arquivo.seek(inicio)
+        restante = tamanho
+        while restante > 0:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, restante))
+            if not bloco:
+                break
+            restante -= len(bloco)
+            yield bloco
+    finally:
+        arquivo.close()
+
+
+def servir_arquivo(request, fieldfile, nome_download):
+    etag = calcular_etag(fieldfile)
+    if _etag_confere(request, etag):
+        resposta = HttpResponseNotModified()
+        resposta["ETag"] = etag
+        return resposta
+
+    backend = _backend()
+    if backend in ("xsendfile", "xaccel"):
+        resposta = HttpResponse(content_type=mimetypes.guess_type(nome_download)[0] or "")
+        if backend == "xsendfile":
+            resposta["X-Sendfile"] = fieldfile.path
+        else:
+            prefixo = getattr(settings, "ENTREGA_XACCEL_PREFIX", "/protected-media/")
+            resposta["X-Accel-Redirect"] = prefixo.rstrip("/") + "/" + quote(fieldfile.name)
+        resposta["Content-Disposition"] = content_disposition_header(True, nome_download)
+        resposta["ETag"] = etag
+        return resposta
+
+    tamanho = fieldfile.size
+    intervalo = _intervalo(request, tamanho, etag)
+    if intervalo is False:
+        resposta = HttpResponse(status=416)
+        resposta["Content-Range"] = f"bytes */{tamanho}"
+        return resposta
+
+    arquivo = fieldfile.storage.open(fieldfile.name, "rb")
+    if intervalo is None:
+        resposta = FileResponse(arquivo, as_attachment=True, filename=nome_download)
+        # o padrão é 4 KiB; em ASGI cada bloco é lido numa thread (core.assincrono)
+        resposta.block_size = TAMANHO_BLOCO
+    else:
+        inicio, fim = intervalo
+        comprimento = fim - inicio + 1
+        resposta = StreamingHttpResponse(
+            _ler_intervalo(arquivo, inicio, comprimento),
+            status=206,
+            content_type=mimetypes.guess_type(nome_download)[0] or "application/octet-stream",
+        )
+        resposta["Content-Length"] = str(comprimento)
+        resposta["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+        resposta["Content-Disposition"] = content_disposition_header(True, nome_download)
+    resposta["Accept-Ranges"] = "bytes"
+    resposta["ETag"] = etag
+    return resposta
+
+
+def _nome_seguro(texto, padrao):
+    return re.sub(r"[^\w\- ]+", "", texto or "").strip() or padrao
+
+
+def nome_para_download(entrega):
+    base = _nome_seguro(entrega.titulo, f"entrega-{entrega.pk}")
+    return base + os.path.splitext(entrega.arquivo.name)[1]
+
+
+def _ler_arquivo(storage, nome):
+    with storage.open(nome, "rb") as arquivo:
+        while bloco := arquivo.read(TAMANHO_BLOCO):
+            yield bloco
+
+
+def zip_de_entregas(entregas, storage):
+    """Gera um ZIP com os arquivos de ``entregas``.
+
+    ``entregas`` é um iterável de ``(id, titulo, arquivo, aluno, tema)``
+    (como sai de ``values_list``); cada arquivo fica em ``<aluno>/<tema>/``.
+    """
+
+    def entradas():
+        usados = set()
+        for pk, titulo, nome, aluno, tema in entregas:
+            try:
+                tamanho = storage.size(nome)
+            except OSError:
+                logger.warning("arquivo da entrega %s não encontrado: %s", pk, nome)
+                continue
+            pasta = f"{_nome_seguro(aluno, 'aluno')}/{_nome_seguro(tema, 'tema')}"
+            base = f"{pasta}/{_nome_seguro(titulo, f'entrega-{pk}')}"
+            ext = os.path.splitext(nome)[1]
+            caminho = base + ext
+            if caminho in usados:
+                caminho = f"{base} ({pk}){ext}"
+            usados.add(caminho)
+            compressao = (
+                zipfile.ZIP_STORED if extensao(nome) in EXTENSOES_SEM_COMPRESSAO else zipfile.ZIP_DEFLATED
+            )
+            yield caminho, _ler_arquivo(storage, nome), compressao, tamanho
+
+    return zip_em_fluxo(entradas())
+
+
+def resposta_zip(entregas, nome):
+    """``StreamingHttpResponse`` com o ZIP dos arquivos do QuerySet ``entregas``."""
+    linhas = (
+        entregas.exclude(arquivo="")
+        .select_related(None)
+        .order_by("tema__aluno__nome_completo", "tema__titulo", "data_entrega", "id")
+        .values_list("id", "titulo", "arquivo", "tema__aluno__nome_completo", "tema__titulo")
+        .iterator(chunk_size=500)
+    )
+    storage = entregas.model._meta.get_field("arquivo").storage
+    resposta = StreamingHttpResponse(zip_de_entregas(linhas, storage), content_type="application/zip")
+    resposta["Content-Disposition"] = content_disposition_header(
+        True, _nome_seguro(nome, "entregas") + ".zip"
+    )
+    return resposta
@@ -0,0 +1,191 @@
+"""Exportação das entregas (notas) em CSV ou XLSX, em fluxo.
+
+As linhas saem de ``values_list(...).iterator(chunk_size=...)``: nenhum
+objeto de modelo é criado e o Django não guarda o resultado em cache, então
+a memória usada não depende do número de entregas.
+"""
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from .models import TemaTCC
+from .streaming import csv_em_fluxo, zip_em_fluxo
+
+TAMANHO_LOTE = 2000
+
+COLUNAS = [
+    ("tema__titulo", "Tema"),
+    ("tema__status", "Status do tema"),
+    ("tema__aluno__nome_completo", "Aluno"),
+    ("tema__aluno__matricula", "Matrícula"),
+    ("tema__orientador__nome_completo", "Orientador"),
+    ("titulo", "Entrega"),
+    ("data_entrega", "Data da entrega"),
+    ("nota", "Nota"),
+]
+CABECALHO = [rotulo for _, rotulo in COLUNAS]
+_STATUS = dict(TemaTCC.Status.choices)
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", ".csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+
+
+def filtrar_entregas(queryset, status=None, orientador=None, data_inicio=None, data_fim=None):
+    if status:
+        queryset = queryset.filter(tema__status=status)
+    if orientador:
+        queryset = queryset.filter(tema__orientador=orientador)
+    if data_inicio:
+        queryset = queryset.filter(data_entrega__gte=data_inicio)
+    if data_fim:
+        queryset = queryset.filter(data_entrega__lte=data_fim)
+    return queryset
+
+
+def linhas_entregas(queryset, tamanho_lote=TAMANHO_LOTE):
+    linhas = (
+        queryset.select_related(None)
+        .order_by("tema__aluno__nome_completo", "tema__titulo", "data_entrega", "id")
+        .values_list(*(campo for campo, _ in COLUNAS))
+        .iterator(chunk_size=tamanho_lote)
+    )
+    for tema, status, aluno, matricula, orientador, titulo, data, nota in linhas:
+        yield [
+            tema,
+            _STATUS.get(status, status),
+            aluno,
+            matricula or "",
+            orientador or "",
+            titulo,
+            data,
+            nota,
+        ]
+
+
+# CSV
+
+
+# tabulação e retorno de carro também: a planilha os descarta e lê o que vem depois
+INICIO_DE_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _sem_formulas(linhas):
+    # títulos são digitados pelos alunos: "=..." viraria fórmula na planilha
+    for linha in linhas:
+        yield [
+            "'" + valor if isinstance(valor, str) and valor[:1] in INICIO_DE_FORMULA else valor
+            for valor in linha
+        ]
+
+
+def exportar_csv(queryset):
+    """Gera o CSV das entregas de ``queryset``, em UTF-8."""
+    for linha in csv_em_fluxo(CABECALHO, _sem_formulas(linhas_entregas(queryset))):
+        yield linha.encode("utf-8")
+
+
+# XLSX
+#
+# Uma planilha XLSX é um ZIP com alguns XMLs. Para não precisar de tudo em
+# memória (como o sharedStrings.xml exigiria), os textos vão inline em cada
+# célula e a planilha é escrita linha a linha dentro do ZIP em fluxo.
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Entregas" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# estilo 0: padrão; estilo 1: data (formato 14, dd/mm/aaaa no Excel em português)
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>
+</styleSheet>"""
+
+_INICIO_PLANILHA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_FIM_PLANILHA = "</sheetData></worksheet>"
+_EPOCA_EXCEL = datetime.date(1899, 12, 30)
+_CONTROLE_INVALIDO = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")  # proibidos no XML
+
+
+def _celula(valor):
+    if valor is None or valor == "":
+        return "<c/>"
+    if isinstance(valor, datetime.date):
+        return f'<c s="1"><v>{(valor - _EPOCA_EXCEL).days}</v></c>'
+    if isinstance(valor, (int, float)) or hasattr(valor, "as_tuple"):  # Decimal
+        return f"<c><v>{valor}</v></c>"
+    return f'<c t="inlineStr"><is><t>{escape(_CONTROLE_INVALIDO.sub("", str(valor)))}</t></is></c>'
+
+
+def _planilha(cabecalho, linhas, linhas_por_bloco=200):
+    partes = [_INICIO_PLANILHA, "<row>", *map(_celula, cabecalho), "</row>"]
+    for numero, linha in enumerate(linhas, start=1):
+        partes.append("<row>")
+        partes.extend(map(_celula, linha))
+        partes.append("</row>")
+        if numero % linhas_por_bloco == 0:
+            yield "".join(partes).encode("utf-8")
+            partes.clear()
+    partes.append(_FIM_PLANILHA)
+    yield "".join(partes).encode("utf-8")
+
+
+def _fixo(nome, conteudo):
+    return nome, [conteudo.encode("utf-8")], zipfile.ZIP_DEFLATED, None
+
+
+def xlsx_em_fluxo(cabecalho, linhas):
+    return zip_em_fluxo([
+        _fixo("[Content_Types].xml", _CONTENT_TYPES),
+        _fixo("_rels/.rels", _RELS),
+        _fixo("xl/workbook.xml", _WORKBOOK),
+        _fixo("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS),
+        _fixo("xl/styles.xml", _STYLES),
+        ("xl/worksheets/sheet1.xml", _planilha(cabecalho, linhas), zipfile.ZIP_DEFLATED, None),
+    ])
+
+
+def exportar_xlsx(queryset):
+    return xlsx_em_fluxo(CABECALHO, linhas_entregas(queryset))
+
+
+EXPORTADORES = {"csv": exportar_csv, "xlsx": exportar_xlsx}
+
+
+def exportar(queryset, formato):
+    """Gera os ``bytes`` do arquivo de entregas no ``formato`` pedido."""
+    return EXPORTADORES[formato](queryset)
+
+
+def nome_do_arquivo(formato):
+    return f"entregas-{datetime.date.today():%Y-%m-%d}{FORMATOS[formato][1]}"
@@ -1,7 +1,10 @@
 from django import forms
 from django.forms import DateInput
+from django.urls import reverse
 
 from core.models import User
+from core.permissoes import ENVIAR_ENTREGA, pode_no_tema
+from .exportacao import FORMATOS
 from .models import TemaTCC, Entrega
 from .validators import validate_max_file_size, validate_file_extension
 
@@ -10,6 +13,39 @@ class DatePickerInput(DateInput):
     input_type = "date"  # HTML5 datepicker do próprio browser
 
 
+class OrientadorAutocomplete(forms.Select):
+    """``<select>`` só com o orientador escolhido, mais um campo de busca.
+
+    As demais opções vêm de ``tcc:orientador_autocomplete`` conforme se
+    digita, em vez de uma ``<option>`` por orientador ativo em toda página.
+    """
+
+    template_name = "tcc/widgets/orientador_autocomplete.html"
+
+    class Media:
+        js = ["js/orientador_autocomplete.js"]
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["url"] = reverse("tcc:orientador_autocomplete")
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        todas = self.choices  # ModelChoiceIterator do campo
+        campo = todas.field
+        self.choices = [("", campo.empty_label)] if campo.empty_label is not None else []
+        escolhidos = [v for v in value if str(v).isdigit()]
+        if escolhidos:
+            self.choices += [
+                (obj.pk, campo.label_from_instance(obj))
+                for obj in todas.queryset.filter(pk__in=escolhidos)
+            ]
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = todas
+
+
 class TemaTCCForm(forms.ModelForm):
     class Meta:
         model = TemaTCC
@@ -22,6 +58,7 @@ class TemaTCCForm(forms.ModelForm):
             "data_fim_prevista",
         ]
         widgets = {
+            "orientador": OrientadorAutocomplete(),
             "data_inicio": DatePickerInput(),
             "data_fim_prevista": DatePickerInput(),
         }
@@ -30,11 +67,11 @@ class TemaTCCForm(forms.ModelForm):
         self.user = kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
 
-        # Orientadores ativos
+        # Orientadores ativos (a validação busca só o escolhido, pela chave primária)
         self.fields["orientador"].queryset = User.objects.filter(
             tipo=User.TipoUsuario.ORIENTADOR,
             is_active=True,
-        ).order_by("nome_completo")
+        )
 
         # Se for aluno, restringe as opções de status
         if self.user and self.user.tipo == User.TipoUsuario.ALUNO:
@@ -57,7 +94,9 @@ class TemaTCCForm(forms.ModelForm):
 class EntregaForm(forms.ModelForm):
     class Meta:
         model = Entrega
-        fields = ["titulo", "arquivo", "data_entrega"]
+        # o arquivo vai por último no corpo do multipart: se o upload for
+        # interrompido (ver EntregaUploadHandler) os demais campos já chegaram
+        fields = ["titulo", "data_entrega", "arquivo"]
         widgets = {
             "data_entrega": DatePickerInput(),
         }
@@ -66,14 +105,23 @@ class EntregaForm(forms.ModelForm):
         # se quiser usar o user aqui no futuro:
         self.user = kwargs.pop("user", None)
         self.tema = kwargs.pop("tema", None)
+        self.erro_upload = kwargs.pop("erro_upload", None)
         super().__init__(*args, **kwargs)
+        if self.erro_upload:
+            # o arquivo foi descartado durante o upload; mostra o motivo em vez de "obrigatório"
+            self.fields["arquivo"].required = False
+
+    def clean_arquivo(self):
+        if self.erro_upload:
+            raise forms.ValidationError(self.erro_upload)
+        return self.cleaned_data.get("arquivo")
 
     def clean(self):
         cleaned_data = super().clean()
 
         # regra: só o aluno dono do tema pode criar entrega (validação extra de segurança)
         if self.user and self.tema:
-            if self.user != self.tema.aluno and self.user.tipo != User.TipoUsuario.ADMIN:
+            if not pode_no_tema(self.user, self.tema, ENVIAR_ENTREGA):
                 raise forms.ValidationError(
                     "Você não tem permissão para enviar entregas para este tema."
                 )
@@ -101,3 +149,39 @@ class EntregaFeedbackForm(forms.ModelForm):
                 )
 
         return cleaned_data
+
+
+class ExportarEntregasForm(forms.Form):
+    status = forms.ChoiceField(
+        label="Status do tema",
+        choices=[("", "Todos")] + TemaTCC.Status.choices,
+        required=False,
+    )
+    orientador = forms.ModelChoiceField(
+        label="Orientador",
+        queryset=User.objects.filter(tipo=User.TipoUsuario.ORIENTADOR).order_by("nome_completo"),
+        required=False,
+        empty_label="Todos",
+    )
+    data_inicio = forms.DateField(label="Entregas a partir de", required=False, widget=DatePickerInput())
+    data_fim = forms.DateField(label="Entregas até", required=False, widget=DatePickerInput())
+    formato = forms.ChoiceField(
+        label="Formato",
+        choices=[(formato, formato.upper()) for formato in FORMATOS],
+        initial="xlsx",
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop("user", None)
+        super().__init__(*args, **kwargs)
+        if self.user and self.user.tipo == User.TipoUsuario.ORIENTADOR:
+            # o orientador só exporta as próprias entregas
+            del self.fields["orientador"]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        inicio = cleaned_data.get("data_inicio")
+        fim = cleaned_data.get("data_fim")
+        if inicio and fim and inicio > fim:
+            raise forms.ValidationError("A data inicial deve ser anterior à data final.")
+        return cleaned_data
@@ -0,0 +1,75 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tcc.bench import commit_atual, executar_concorrencia
+
+# as views assíncronas, e a lista de temas (síncrona) para comparação
+URLS = (
+    ("core:dashboard", None),
+    ("tcc:tema_list", None),
+    ("tcc:entrega_list", ("temas/", "tema_id")),
+    ("tcc:entrega_download", ("entregas/", "entrega_id")),
+)
+COLUNAS = ("papel", "nome", "modo", "req_por_s", "p50_ms", "p95_ms", "p99_ms", "erros")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara vazão e latência das mesmas URLs servidas por WSGI (uma thread por cliente) "
+        "e por ASGI, com muitos clientes simultâneos (use depois de seed_bench)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clientes", type=int, default=200, help="Clientes simultâneos.")
+        parser.add_argument("--requisicoes", type=int, default=5, help="Requisições em sequência por cliente.")
+        parser.add_argument("--filtro", default="", help="Só URLs cujo nome contenha este texto.")
+        parser.add_argument("--saida", help="Grava os resultados em JSON neste arquivo.")
+
+    def handle(self, *args, clientes, requisicoes, filtro, saida, **options):
+        if clientes < 1 or requisicoes < 1:
+            raise CommandError("--clientes e --requisicoes devem ser ao menos 1.")
+
+        self.stdout.write("  ".join(f"{c:>10}" if c != "nome" else f"{c:<22}" for c in COLUNAS) + "  asgi/wsgi")
+        anterior = {}
+
+        def mostrar(resultado):
+            linha = "  ".join(
+                f"{resultado[c]!s:>10}" if c != "nome" else f"{resultado[c]:<22}" for c in COLUNAS
+            )
+            chave = (resultado["papel"], resultado["nome"])
+            if resultado["modo"] == "wsgi":
+                anterior[chave] = resultado
+            elif anterior.get(chave, {}).get("req_por_s"):
+                linha += f"  {resultado['req_por_s'] / anterior[chave]['req_por_s']:.2f}x"
+            self.stdout.write(linha)
+
+        # milhares de requisições: sem a linha JSON do profiling nem os avisos de orçamento
+        niveis = {}
+        for nome, nivel in (("core.profiling", logging.ERROR), ("django.request", logging.ERROR)):
+            logger = logging.getLogger(nome)
+            niveis[logger] = logger.level
+            logger.setLevel(nivel)
+        try:
+            resultados = executar_concorrencia(URLS, clientes, requisicoes, filtro=filtro, saida=mostrar)
+        except LookupError as e:
+            raise CommandError(str(e))
+        finally:
+            for logger, nivel in niveis.items():
+                logger.setLevel(nivel)
+
+        if saida:
+            relatorio = {
+                "gerado_em": timezone.now().isoformat(),
+                "commit": commit_atual(),
+                "banco": settings.DATABASES["default"]["ENGINE"],
+                "clientes": clientes,
+                "requisicoes": requisicoes,
+                "resultados": resultados,
+            }
+            with open(saida, "w", encoding="utf-8") as arquivo:
+                json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {saida}."))
@@ -0,0 +1,84 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.utils import timezone
+
+import core.urls
+import tcc.urls
+from tcc.bench import commit_atual, executar_benchmark
+
+COLUNAS = ("papel", "nome", "status", "p50_ms", "p95_ms", "p99_ms", "req_por_s", "consultas")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede latência (p50/p95/p99), vazão e número de consultas de cada URL de core e tcc, "
+        "como aluno, orientador e admin (use depois de seed_bench)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticoes", type=int, default=20, help="Requisições medidas por URL e papel.")
+        parser.add_argument("--aquecimento", type=int, default=2, help="Requisições descartadas antes de medir.")
+        parser.add_argument("--filtro", default="", help="Só URLs cujo nome contenha este texto.")
+        parser.add_argument("--saida", help="Grava os resultados em JSON neste arquivo.")
+        parser.add_argument("--comparar", help="JSON de uma execução anterior, para mostrar a variação do p50.")
+
+    def handle(self, *args, repeticoes, aquecimento, filtro, saida, comparar, **options):
+        if repeticoes < 1:
+            raise CommandError("--repeticoes deve ser ao menos 1.")
+        anteriores = {}
+        if comparar:
+            with open(comparar, encoding="utf-8") as arquivo:
+                anteriores = {(r["papel"], r["nome"]): r for r in json.load(arquivo)["resultados"]}
+
+        def cliente_para(usuario):
+            cliente = Client()
+            cliente.force_login(usuario)
+            return cliente
+
+        self.stdout.write("  ".join(f"{c:>10}" if c != "nome" else f"{c:<28}" for c in COLUNAS) + "  Δp50")
+
+        def mostrar(resultado):
+            linha = "  ".join(
+                f"{resultado[c]!s:>10}" if c != "nome" else f"{resultado[c]:<28}" for c in COLUNAS
+            )
+            anterior = anteriores.get((resultado["papel"], resultado["nome"]))
+            if anterior and anterior["p50_ms"]:
+                variacao = (resultado["p50_ms"] - anterior["p50_ms"]) / anterior["p50_ms"] * 100
+                linha += f"  {variacao:+.1f}%"
+            self.stdout.write(linha)
+
+        # respostas 403/404 esperadas (ex.: aluno na lista de usuários) não vão para o log
+        logger = logging.getLogger("django.request")
+        nivel = logger.level
+        logger.setLevel(logging.ERROR)
+        # o Client usa o host "testserver"
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            try:
+                resultados = executar_benchmark(
+                    cliente_para,
+                    [core.urls, tcc.urls],
+                    repeticoes=repeticoes,
+                    aquecimento=aquecimento,
+                    filtro=filtro,
+                    saida=mostrar,
+                )
+            except LookupError as e:
+                raise CommandError(str(e))
+            finally:
+                logger.setLevel(nivel)
+
+        if saida:
+            relatorio = {
+                "gerado_em": timezone.now().isoformat(),
+                "commit": commit_atual(),
+                "banco": settings.DATABASES["default"]["ENGINE"],
+                "repeticoes": repeticoes,
+                "resultados": resultados,
+            }
+            with open(saida, "w", encoding="utf-8") as arquivo:
+                json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {saida}."))
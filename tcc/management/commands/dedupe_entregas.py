@@ -0,0 +1,71 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from tcc.models import Entrega
+from tcc.storage import NOME_CONTEUDO, hash_arquivo, nome_por_conteudo
+from tcc.validators import extensao
+
+
+class Command(BaseCommand):
+    help = (
+        "Move os arquivos de entregas gravados antes do armazenamento por conteúdo "
+        "para entregas/<hash>, apontando entregas com o mesmo conteúdo para um único arquivo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Só mostra quanto espaço seria liberado, sem alterar nada.",
+        )
+
+    def handle(self, *args, dry_run=False, **options):
+        storage = Entrega._meta.get_field("arquivo").storage
+        novos_nomes = {}  # nome antigo -> nome por conteúdo
+        gravados = set()
+        migradas = liberados = 0
+
+        pendentes = (
+            Entrega.objects.exclude(arquivo="")
+            .order_by("pk")
+            .values_list("pk", "arquivo")
+            .iterator(chunk_size=500)
+        )
+        for pk, nome in pendentes:
+            if NOME_CONTEUDO.match(nome):
+                continue
+
+            if nome not in novos_nomes:
+                if not storage.exists(nome):
+                    self.stderr.write(f"Entrega {pk}: arquivo {nome} não encontrado, ignorada.")
+                    continue
+                with storage.open(nome, "rb") as arquivo:
+                    digest = hash_arquivo(arquivo)
+                pasta = os.path.dirname(nome) or "entregas"
+                novo = nome_por_conteudo(pasta, digest, extensao(nome))
+
+                if novo in gravados or storage.exists(novo):
+                    liberados += storage.size(nome)
+                elif not dry_run:
+                    os.makedirs(os.path.dirname(storage.path(novo)), exist_ok=True)
+                    os.replace(storage.path(nome), storage.path(novo))
+                gravados.add(novo)
+                novos_nomes[nome] = novo
+
+            if not dry_run:
+                # update() direto: só o caminho do arquivo muda
+                Entrega.objects.filter(pk=pk).update(arquivo=novos_nomes[nome])
+            migradas += 1
+
+        if not dry_run:
+            for nome in novos_nomes:
+                if storage.exists(nome) and not Entrega.objects.filter(arquivo=nome).exists():
+                    storage.delete(nome)
+
+        acao = "seriam migradas" if dry_run else "migradas"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{migradas} entregas {acao}; {liberados / (1024 * 1024):.1f} MB em duplicatas."
+            )
+        )
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tcc.exportacao import FORMATOS, exportar, filtrar_entregas
+from tcc.forms import ExportarEntregasForm
+from tcc.models import Entrega
+
+
+class Command(BaseCommand):
+    help = "Exporta as entregas (aluno, matrícula, orientador, status do tema e nota) em CSV ou XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "saida",
+            nargs="?",
+            default="-",
+            help="Arquivo de saída (padrão: saída padrão).",
+        )
+        parser.add_argument("--formato", choices=list(FORMATOS), default="csv")
+        parser.add_argument("--status", help="Só temas com este status (ex.: CONCLUIDO).")
+        parser.add_argument("--orientador", help="ID do orientador.")
+        parser.add_argument("--de", dest="data_inicio", help="Entregas a partir desta data (AAAA-MM-DD).")
+        parser.add_argument("--ate", dest="data_fim", help="Entregas até esta data (AAAA-MM-DD).")
+
+    def handle(self, *args, saida, **options):
+        # mesmas validações da tela de exportação
+        form = ExportarEntregasForm(
+            {
+                campo: options[campo] or ""
+                for campo in ("status", "orientador", "data_inicio", "data_fim", "formato")
+            }
+        )
+        if not form.is_valid():
+            erros = "; ".join(
+                f"{campo}: {' '.join(mensagens)}" for campo, mensagens in form.errors.items()
+            )
+            raise CommandError(erros)
+
+        dados = form.cleaned_data
+        entregas = filtrar_entregas(
+            Entrega.objects.all(),
+            status=dados["status"],
+            orientador=dados["orientador"],
+            data_inicio=dados["data_inicio"],
+            data_fim=dados["data_fim"],
+        )
+        destino = sys.stdout.buffer if saida == "-" else open(saida, "wb")
+        try:
+            for bloco in exportar(entregas, dados["formato"]):
+                destino.write(bloco)
+        finally:
+            if destino is not sys.stdout.buffer:
+                destino.close()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from tcc.models import Entrega
+from tcc.similaridade import indexar_entrega
+
+
+class Command(BaseCommand):
+    help = "Calcula as assinaturas MinHash/LSH das entregas que ainda não foram indexadas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--todas",
+            action="store_true",
+            help="Reindexa todas as entregas, não só as que estão sem assinatura.",
+        )
+
+    def handle(self, *args, todas=False, **options):
+        entregas = Entrega.objects.exclude(arquivo="").only("id", "arquivo").order_by("pk")
+        if not todas:
+            entregas = entregas.filter(assinatura__isnull=True)
+
+        total = 0
+        for entrega in entregas.iterator(chunk_size=200):
+            indexar_entrega(entrega)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f"{total} entregas indexadas."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from tcc.models import ResumoSistema
+from tcc.resumo import reconstruir_resumo
+
+
+class Command(BaseCommand):
+    help = "Recalcula os contadores do painel (totais, temas por status e entregas pendentes por orientador)."
+
+    def handle(self, *args, **options):
+        reconstruir_resumo()
+        resumo = ResumoSistema.obter()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Resumo reconstruído: {resumo.total_usuarios} usuários, "
+                f"{resumo.total_temas} temas, {resumo.total_entregas} entregas."
+            )
+        )
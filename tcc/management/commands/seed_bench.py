@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import User
+from tcc.bench import PREFIXO, SENHA, gerar, limpar
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma massa de dados sintética e reproduzível para benchmarks "
+        f"(usuários '{PREFIXO}*', senha '{SENHA}')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alunos", type=int, default=2000)
+        parser.add_argument("--orientadores", type=int, default=200)
+        parser.add_argument("--admins", type=int, default=1)
+        parser.add_argument("--temas-por-aluno", type=int, default=1)
+        parser.add_argument(
+            "--entregas-por-tema",
+            type=int,
+            default=8,
+            help="Média de entregas por tema (temas propostos não têm entregas).",
+        )
+        parser.add_argument(
+            "--arquivos",
+            type=int,
+            default=50,
+            help="Quantidade de PDFs fictícios distintos, compartilhados entre as entregas.",
+        )
+        parser.add_argument("--tamanho-arquivo", type=int, default=64, help="Tamanho dos PDFs, em KB.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--limpar",
+            action="store_true",
+            help="Remove os dados de benchmark existentes antes de gerar (ou só remove, com --alunos 0).",
+        )
+
+    def handle(self, *args, **options):
+        existentes = User.objects.filter(username__startswith=PREFIXO).exists()
+        if options["limpar"]:
+            if existentes:
+                self.stdout.write(f"{limpar()} registros removidos.")
+        elif existentes:
+            raise CommandError("Já existem dados de benchmark. Use --limpar para gerar de novo.")
+
+        if not (options["alunos"] or options["orientadores"] or options["admins"]):
+            return
+        totais = gerar(
+            alunos=options["alunos"],
+            orientadores=options["orientadores"],
+            admins=options["admins"],
+            temas_por_aluno=options["temas_por_aluno"],
+            entregas_por_tema=options["entregas_por_tema"],
+            arquivos=options["arquivos"],
+            tamanho_arquivo=options["tamanho_arquivo"] * 1024,
+            seed=options["seed"],
+            saida=lambda mensagem: self.stdout.write(f"  {mensagem}"),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            "Gerados: " + ", ".join(f"{total} {nome}" for nome, total in totais.items())
+        ))
@@ -0,0 +1,132 @@
+import multiprocessing
+import random
+import time
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+
+from core.models import User
+from tcc.bench import percentil
+from tcc.models import Entrega, TemaTCC
+from tcc.resumo import reconstruir_resumo
+
+PREFIXO = "stress_"
+PDF = b"%PDF-1.4\nstream\nBT (teste de concorrencia) Tj ET\nendstream\n"
+
+
+def _escrever(tema_id, arquivo, escritas, seed, resultados):
+    """Um processo: cria entregas e dá notas, como uploads e feedbacks simultâneos."""
+    rng = random.Random(seed)
+    tempos, erros, criadas = [], [], []
+    for n in range(escritas):
+        inicio = time.perf_counter()
+        try:
+            with transaction.atomic():
+                if criadas and rng.random() < 0.3:
+                    entrega = Entrega.objects.get(pk=rng.choice(criadas))
+                    entrega.nota = Decimal(rng.randint(0, 100)) / 10
+                    entrega.comentario_orientador = "Avaliada no teste de concorrência."
+                    entrega.save()
+                else:
+                    entrega = Entrega.objects.create(
+                        tema_id=tema_id, titulo=f"Entrega {seed}-{n}", arquivo=arquivo
+                    )
+        except OperationalError as exc:
+            erros.append(str(exc))
+        else:
+            if entrega.pk not in criadas:
+                criadas.append(entrega.pk)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    connections.close_all()
+    resultados.put({"tempos": tempos, "erros": erros, "criadas": len(criadas)})
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de concorrência do SQLite: vários processos criando e avaliando entregas ao "
+        "mesmo tempo. Falha se alguma escrita der erro (ex.: 'database is locked'). "
+        "Compare com SQLITE_OTIMIZADO=False."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processos", type=int, default=8)
+        parser.add_argument("--escritas", type=int, default=200, help="Escritas por processo.")
+        parser.add_argument(
+            "--manter",
+            action="store_true",
+            help=f"Não remove os dados criados (usuários '{PREFIXO}*') ao final.",
+        )
+
+    def handle(self, *args, processos, escritas, manter, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Disponível apenas para SQLite.")
+        if User.objects.filter(username__startswith=PREFIXO).exists():
+            raise CommandError(f"Já existem usuários '{PREFIXO}*': remova-os antes.")
+
+        with connection.cursor() as cursor:
+            pragmas = []
+            for nome in ("journal_mode", "synchronous", "busy_timeout"):
+                cursor.execute(f"PRAGMA {nome}")
+                pragmas.append(f"{nome}={cursor.fetchone()[0]}")
+        self.stdout.write(
+            f"{', '.join(pragmas)}, transaction_mode="
+            f"{connection.settings_dict['OPTIONS'].get('transaction_mode') or 'DEFERRED'}"
+        )
+
+        aluno = User.objects.create_user(
+            f"{PREFIXO}aluno", f"{PREFIXO}aluno@stress.local",
+            nome_completo="Aluno Concorrência",
+            tipo=User.TipoUsuario.ALUNO,
+        )
+        orientador = User.objects.create_user(
+            f"{PREFIXO}orientador", f"{PREFIXO}orientador@stress.local",
+            nome_completo="Orientador Concorrência",
+            tipo=User.TipoUsuario.ORIENTADOR,
+        )
+        tema = TemaTCC.objects.create(
+            titulo="Teste de concorrência", descricao="-", aluno=aluno, orientador=orientador,
+            status=TemaTCC.Status.EM_ANDAMENTO,
+        )
+        storage = Entrega._meta.get_field("arquivo").storage
+        arquivo = storage.save("entregas/stress.pdf", ContentFile(PDF))
+
+        # as conexões abertas não podem ser herdadas pelos processos filhos
+        connections.close_all()
+        contexto = multiprocessing.get_context()
+        resultados = contexto.Queue()
+        filhos = [
+            contexto.Process(target=_escrever, args=(tema.pk, arquivo, escritas, seed, resultados))
+            for seed in range(processos)
+        ]
+        inicio = time.perf_counter()
+        for filho in filhos:
+            filho.start()
+        coletados = [resultados.get() for _ in filhos]
+        for filho in filhos:
+            filho.join()
+        duracao = time.perf_counter() - inicio
+
+        tempos = sorted(t for r in coletados for t in r["tempos"])
+        erros = [e for r in coletados for e in r["erros"]]
+        criadas = sum(r["criadas"] for r in coletados)
+        no_banco = Entrega.objects.filter(tema=tema).count()
+
+        self.stdout.write(
+            f"{len(tempos)} escritas em {duracao:.1f}s ({len(tempos) / duracao:.0f}/s) | "
+            f"p50 {percentil(tempos, 50):.1f}ms  p95 {percentil(tempos, 95):.1f}ms  "
+            f"p99 {percentil(tempos, 99):.1f}ms  máx {tempos[-1]:.1f}ms"
+        )
+        for mensagem in sorted(set(erros)):
+            self.stderr.write(f"  {erros.count(mensagem)}x {mensagem}")
+
+        if not manter:
+            User.objects.filter(username__startswith=PREFIXO).delete()
+            reconstruir_resumo()
+
+        if erros:
+            raise CommandError(f"{len(erros)} escritas falharam.")
+        if no_banco != criadas:
+            raise CommandError(f"{criadas} entregas confirmadas, mas {no_banco} no banco.")
+        self.stdout.write(self.style.SUCCESS(f"Nenhum erro; {criadas} entregas criadas."))
@@ -0,0 +1,70 @@
+from django.db import models
+from django.db.models import Avg, Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.permissoes import VER, filtro_temas
+
+
+class TemaTCCQuerySet(models.QuerySet):
+    def permitidos(self, user, acao):
+        """Temas em que o usuário pode fazer ``acao`` (ver ``core.permissoes``)."""
+        filtro = filtro_temas(user, acao)
+        return self.none() if filtro is None else self.filter(filtro)
+
+    def visible_to(self, user):
+        """Temas que o usuário pode ver, conforme o tipo (aluno, orientador ou admin)."""
+        return self.permitidos(user, VER).select_related("aluno", "orientador")
+
+    def versao(self):
+        """Última alteração e quantidade dos temas e de suas entregas, numa consulta
+        (para o ETag das páginas, ver ``core.condicional``)."""
+        return self.order_by().aggregate(
+            total_temas=Count("id", distinct=True),
+            temas_em=Max("atualizado_em"),
+            total_entregas=Count("entregas"),
+            entregas_em=Max("entregas__atualizado_em"),
+        )
+
+    def with_resumo(self):
+        """Quantidade, última data e média das notas das entregas de cada tema.
+
+        Subconsultas correlacionadas (pelo índice de entregas do tema), e não
+        JOIN + GROUP BY: só são calculadas para as linhas da página, depois do
+        LIMIT, em vez de agrupar todos os temas e entregas visíveis.
+        """
+        Entrega = self.model.entregas.rel.related_model
+        entregas = Entrega.objects.filter(tema=OuterRef("pk")).order_by().values("tema")
+
+        def resumo(agregado):
+            return Subquery(entregas.annotate(valor=agregado).values("valor"))
+
+        return self.annotate(
+            total_entregas=Coalesce(resumo(Count("id")), 0),
+            ultima_entrega=resumo(Max("data_entrega")),
+            media_nota=resumo(Avg("nota")),
+        )
+
+    def for_list(self):
+        """Apenas as colunas usadas nas listagens, já com o resumo das entregas."""
+        return self.only(
+            "id",
+            "titulo",
+            "status",
+            "aluno__id",
+            "aluno__username",
+            "aluno__nome_completo",
+            "orientador__id",
+            "orientador__username",
+            "orientador__nome_completo",
+        ).with_resumo()
+
+
+class EntregaQuerySet(models.QuerySet):
+    def permitidos(self, user, acao):
+        """Entregas dos temas em que o usuário pode fazer ``acao``."""
+        filtro = filtro_temas(user, acao, caminho="tema__")
+        return self.none() if filtro is None else self.filter(filtro)
+
+    def visible_to(self, user):
+        """Entregas dos temas que o usuário pode ver."""
+        return self.permitidos(user, VER).select_related("tema", "tema__aluno")
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def preencher_resumo(apps, schema_editor):
+    User = apps.get_model("core", "User")
+    TemaTCC = apps.get_model("tcc", "TemaTCC")
+    Entrega = apps.get_model("tcc", "Entrega")
+    ResumoSistema = apps.get_model("tcc", "ResumoSistema")
+    ResumoOrientador = apps.get_model("tcc", "ResumoOrientador")
+
+    por_status = dict(
+        TemaTCC.objects.order_by().values_list("status").annotate(total=Count("id"))
+    )
+    ResumoSistema.objects.create(
+        pk=1,
+        total_usuarios=User.objects.count(),
+        total_temas=sum(por_status.values()),
+        total_entregas=Entrega.objects.count(),
+        temas_propostos=por_status.get("PROPOSTO", 0),
+        temas_em_andamento=por_status.get("EM_ANDAMENTO", 0),
+        temas_concluidos=por_status.get("CONCLUIDO", 0),
+        temas_cancelados=por_status.get("CANCELADO", 0),
+    )
+    pendentes = (
+        User.objects.filter(tipo="ORIENTADOR")
+        .annotate(
+            pendentes=Count(
+                "temas_como_orientador__entregas",
+                filter=Q(temas_como_orientador__entregas__nota__isnull=True),
+            )
+        )
+        .values_list("pk", "pendentes")
+    )
+    ResumoOrientador.objects.bulk_create(
+        ResumoOrientador(orientador_id=pk, entregas_pendentes=total)
+        for pk, total in pendentes
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('tcc', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoOrientador',
+            fields=[
+                ('orientador', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumo_orientador', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Orientador')),
+                ('entregas_pendentes', models.IntegerField(default=0, verbose_name='Entregas pendentes de feedback')),
+            ],
+            options={
+                'verbose_name': 'Resumo do orientador',
+                'verbose_name_plural': 'Resumos dos orientadores',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumoSistema',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_usuarios', models.IntegerField(default=0)),
+                ('total_temas', models.IntegerField(default=0)),
+                ('total_entregas', models.IntegerField(default=0)),
+                ('temas_propostos', models.IntegerField(default=0)),
+                ('temas_em_andamento', models.IntegerField(default=0)),
+                ('temas_concluidos', models.IntegerField(default=0)),
+                ('temas_cancelados', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumo do sistema',
+                'verbose_name_plural': 'Resumo do sistema',
+            },
+        ),
+        migrations.RunPython(preencher_resumo, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:04
+
+import tcc.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcc', '0002_resumosistema_resumoorientador'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entrega',
+            name='arquivo',
+            field=models.FileField(upload_to='entregas/', validators=[tcc.validators.validate_max_file_size, tcc.validators.validate_file_extension, tcc.validators.validate_file_signature], verbose_name='Arquivo'),
+        ),
+    ]
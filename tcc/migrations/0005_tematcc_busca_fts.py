@@ -0,0 +1,92 @@
+from django.db import migrations
+
+# Índice de busca textual dos temas (SQLite FTS5). Mantido por triggers, para
+# cobrir também QuerySet.update(), bulk_create() e o SET_NULL do orientador.
+# O tokenizer unicode61 com remove_diacritics 2 ignora acentos: "acao"
+# encontra "ação". Os pesos do bm25 favorecem o título, depois os nomes.
+
+CRIAR = [
+    """
+    CREATE VIRTUAL TABLE tcc_tematcc_busca USING fts5(
+        titulo, descricao, aluno, orientador,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO tcc_tematcc_busca(tcc_tematcc_busca, rank)
+    VALUES ('rank', 'bm25(10.0, 1.0, 4.0, 4.0)')
+    """,
+    """
+    CREATE TRIGGER tcc_tematcc_busca_ai AFTER INSERT ON tcc_tematcc BEGIN
+        INSERT INTO tcc_tematcc_busca(rowid, titulo, descricao, aluno, orientador)
+        VALUES (
+            new.id, new.titulo, new.descricao,
+            (SELECT nome_completo FROM core_user WHERE id = new.aluno_id),
+            (SELECT nome_completo FROM core_user WHERE id = new.orientador_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER tcc_tematcc_busca_au
+    AFTER UPDATE OF titulo, descricao, aluno_id, orientador_id ON tcc_tematcc BEGIN
+        DELETE FROM tcc_tematcc_busca WHERE rowid = old.id;
+        INSERT INTO tcc_tematcc_busca(rowid, titulo, descricao, aluno, orientador)
+        VALUES (
+            new.id, new.titulo, new.descricao,
+            (SELECT nome_completo FROM core_user WHERE id = new.aluno_id),
+            (SELECT nome_completo FROM core_user WHERE id = new.orientador_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER tcc_tematcc_busca_ad AFTER DELETE ON tcc_tematcc BEGIN
+        DELETE FROM tcc_tematcc_busca WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tcc_tematcc_busca_usuario_au
+    AFTER UPDATE OF nome_completo ON core_user BEGIN
+        UPDATE tcc_tematcc_busca SET aluno = new.nome_completo
+        WHERE rowid IN (SELECT id FROM tcc_tematcc WHERE aluno_id = new.id);
+        UPDATE tcc_tematcc_busca SET orientador = new.nome_completo
+        WHERE rowid IN (SELECT id FROM tcc_tematcc WHERE orientador_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO tcc_tematcc_busca(rowid, titulo, descricao, aluno, orientador)
+    SELECT t.id, t.titulo, t.descricao, a.nome_completo, o.nome_completo
+    FROM tcc_tematcc t
+    JOIN core_user a ON a.id = t.aluno_id
+    LEFT JOIN core_user o ON o.id = t.orientador_id
+    """,
+]
+
+REMOVER = [
+    "DROP TRIGGER IF EXISTS tcc_tematcc_busca_usuario_au",
+    "DROP TRIGGER IF EXISTS tcc_tematcc_busca_ad",
+    "DROP TRIGGER IF EXISTS tcc_tematcc_busca_au",
+    "DROP TRIGGER IF EXISTS tcc_tematcc_busca_ai",
+    "DROP TABLE IF EXISTS tcc_tematcc_busca",
+]
+
+
+def _executar(comandos):
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return  # outros bancos usam a busca por icontains (tcc.busca)
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("tcc", "0004_alter_entrega_arquivo"),
+    ]
+
+    operations = [
+        migrations.RunPython(_executar(CRIAR), _executar(REMOVER)),
+    ]
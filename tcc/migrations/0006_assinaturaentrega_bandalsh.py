@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcc', '0005_tematcc_busca_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssinaturaEntrega',
+            fields=[
+                ('entrega', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='assinatura', serialize=False, to='tcc.entrega')),
+                ('minhash', models.BinaryField()),
+                ('total_shingles', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Assinatura de entrega',
+                'verbose_name_plural': 'Assinaturas de entregas',
+            },
+        ),
+        migrations.CreateModel(
+            name='BandaLSH',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('banda', models.PositiveSmallIntegerField()),
+                ('valor', models.BigIntegerField()),
+                ('entrega', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bandas_lsh', to='tcc.entrega')),
+            ],
+            options={
+                'verbose_name': 'Banda LSH',
+                'verbose_name_plural': 'Bandas LSH',
+                'indexes': [models.Index(fields=['banda', 'valor'], name='tcc_bandalsh_busca_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcc', '0006_assinaturaentrega_bandalsh'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entrega',
+            name='tema',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='tcc.tematcc', verbose_name='Tema'),
+        ),
+        migrations.AddIndex(
+            model_name='entrega',
+            index=models.Index(fields=['tema', '-data_entrega', '-id'], name='tcc_entrega_tema_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tematcc',
+            index=models.Index(fields=['aluno', 'status', 'titulo'], name='tcc_tema_aluno_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tematcc',
+            index=models.Index(fields=['orientador', 'status', 'titulo'], name='tcc_tema_orient_status_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+import datetime
+import importlib
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Alterar tcc_tematcc no SQLite recria a tabela, o que quebra os triggers da
+# busca textual (0005): eles são removidos antes e recriados no fim, o que
+# também reconstrói o índice.
+busca = importlib.import_module("tcc.migrations.0005_tematcc_busca_fts")
+
+
+def _inicio_do_dia(data):
+    return timezone.make_aware(datetime.datetime.combine(data, datetime.time.min))
+
+
+def preencher(apps, schema_editor):
+    """Sem histórico: a criação vem da data de início/entrega e a última
+    alteração é o momento da migração."""
+    banco = schema_editor.connection.alias
+    agora = timezone.now()
+    TemaTCC = apps.get_model("tcc", "TemaTCC")
+    Entrega = apps.get_model("tcc", "Entrega")
+
+    temas = TemaTCC.objects.using(banco)
+    for data in temas.exclude(data_inicio=None).values_list("data_inicio", flat=True).distinct().order_by():
+        temas.filter(data_inicio=data).update(criado_em=min(_inicio_do_dia(data), agora))
+    temas.filter(criado_em=None).update(criado_em=agora)
+    temas.update(atualizado_em=agora)
+
+    entregas = Entrega.objects.using(banco)
+    for data in entregas.values_list("data_entrega", flat=True).distinct().order_by():
+        entregas.filter(data_entrega=data).update(criado_em=min(_inicio_do_dia(data), agora))
+    entregas.update(atualizado_em=agora)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tcc", "0007_indices_consultas"),
+    ]
+
+    operations = [
+        migrations.RunPython(busca._executar(busca.REMOVER), busca._executar(busca.CRIAR)),
+        migrations.AddField(
+            model_name="tematcc",
+            name="criado_em",
+            field=models.DateTimeField(null=True, verbose_name="Criado em"),
+        ),
+        migrations.AddField(
+            model_name="tematcc",
+            name="atualizado_em",
+            field=models.DateTimeField(null=True, verbose_name="Atualizado em"),
+        ),
+        migrations.AddField(
+            model_name="entrega",
+            name="criado_em",
+            field=models.DateTimeField(null=True, verbose_name="Criado em"),
+        ),
+        migrations.AddField(
+            model_name="entrega",
+            name="atualizado_em",
+            field=models.DateTimeField(null=True, verbose_name="Atualizado em"),
+        ),
+        migrations.RunPython(preencher, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="tematcc",
+            name="criado_em",
+            field=models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+        ),
+        migrations.AlterField(
+            model_name="tematcc",
+            name="atualizado_em",
+            field=models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+        ),
+        migrations.AlterField(
+            model_name="entrega",
+            name="criado_em",
+            field=models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+        ),
+        migrations.AlterField(
+            model_name="entrega",
+            name="atualizado_em",
+            field=models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+        ),
+        migrations.RunPython(busca._executar(busca.CRIAR), busca._executar(busca.REMOVER)),
+    ]
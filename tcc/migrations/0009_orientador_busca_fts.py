@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# Índice do autocomplete de orientadores (SQLite FTS5), só com os orientadores
+# ativos. Como em 0005, é mantido por triggers em core_user e ignora acentos;
+# o índice de prefixos deixa rápida a busca pelas primeiras letras digitadas.
+# Uma migração que recrie core_user deve remover e recriar estes triggers
+# (ver tcc 0008 e core 0003).
+
+CRIAR = [
+    """
+    CREATE VIRTUAL TABLE tcc_orientador_busca USING fts5(
+        nome, area,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '1 2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER tcc_orientador_busca_ai AFTER INSERT ON core_user
+    WHEN new.tipo = 'ORIENTADOR' AND new.is_active BEGIN
+        INSERT INTO tcc_orientador_busca(rowid, nome, area)
+        VALUES (new.id, new.nome_completo, new.area_atuacao);
+    END
+    """,
+    """
+    CREATE TRIGGER tcc_orientador_busca_au
+    AFTER UPDATE OF nome_completo, area_atuacao, tipo, is_active ON core_user BEGIN
+        DELETE FROM tcc_orientador_busca WHERE rowid = old.id;
+        INSERT INTO tcc_orientador_busca(rowid, nome, area)
+        SELECT new.id, new.nome_completo, new.area_atuacao
+        WHERE new.tipo = 'ORIENTADOR' AND new.is_active;
+    END
+    """,
+    """
+    CREATE TRIGGER tcc_orientador_busca_ad AFTER DELETE ON core_user BEGIN
+        DELETE FROM tcc_orientador_busca WHERE rowid = old.id;
+    END
+    """,
+    """
+    INSERT INTO tcc_orientador_busca(rowid, nome, area)
+    SELECT id, nome_completo, area_atuacao FROM core_user
+    WHERE tipo = 'ORIENTADOR' AND is_active
+    """,
+]
+
+REMOVER = [
+    "DROP TRIGGER IF EXISTS tcc_orientador_busca_ad",
+    "DROP TRIGGER IF EXISTS tcc_orientador_busca_au",
+    "DROP TRIGGER IF EXISTS tcc_orientador_busca_ai",
+    "DROP TABLE IF EXISTS tcc_orientador_busca",
+]
+
+
+def _executar(comandos):
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return  # outros bancos usam a busca por icontains (tcc.busca)
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_indices_e_matricula_unica"),
+        ("tcc", "0008_criado_em_atualizado_em"),
+    ]
+
+    operations = [
+        migrations.RunPython(_executar(CRIAR), _executar(REMOVER)),
+    ]
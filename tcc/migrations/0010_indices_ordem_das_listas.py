@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcc', '0009_orientador_busca_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tematcc',
+            name='tcc_tema_aluno_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tematcc',
+            name='tcc_tema_orient_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='entrega',
+            index=models.Index(fields=['-data_entrega', '-id'], name='tcc_entrega_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tematcc',
+            index=models.Index(fields=['orientador', 'titulo', 'id'], name='tcc_tema_orient_titulo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tematcc',
+            index=models.Index(fields=['titulo', 'id'], name='tcc_tema_titulo_idx'),
+        ),
+    ]
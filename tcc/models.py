@@ -1,9 +1,15 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
-from .validators import validate_max_file_size, validate_file_extension
+from .managers import EntregaQuerySet, TemaTCCQuerySet
+from .storage import entrega_storage
+from .validators import (
+    validate_file_extension,
+    validate_file_signature,
+    validate_max_file_size,
+)
 
 
 class TemaTCC(models.Model):
@@ -40,11 +46,23 @@ class TemaTCC(models.Model):
     data_inicio = models.DateField("Data de início", blank=True, null=True)
     data_fim_prevista = models.DateField("Data fim prevista", blank=True, null=True)
 
+    # atualizado_em alimenta o ETag/Last-Modified das páginas (core.condicional)
+    criado_em = models.DateTimeField("Criado em", auto_now_add=True)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+
+    objects = TemaTCCQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Tema de TCC"
         verbose_name_plural = "Temas de TCC"
         ordering = ["titulo"]
         unique_together = ("aluno", "titulo")
+        indexes = [
+            # listas de temas na ordem do keyset (titulo, id): do orientador e do
+            # admin. As do aluno usam o índice de unique_together (aluno, titulo)
+            models.Index(fields=["orientador", "titulo", "id"], name="tcc_tema_orient_titulo_idx"),
+            models.Index(fields=["titulo", "id"], name="tcc_tema_titulo_idx"),
+        ]
 
     def clean(self):
         super().clean()
@@ -52,17 +70,14 @@ class TemaTCC(models.Model):
         # Coerência de tipos
         from core.models import User  # import aqui para evitar import circular
 
-        if self.aluno_id:
-            aluno = getattr(self, "aluno", None)
-            if isinstance(aluno, User) and aluno.tipo != User.TipoUsuario.ALUNO:
-                raise ValidationError({"aluno": "O usuário selecionado não é um aluno."})
+        tipos = self._tipos_dos_participantes()
+        if self.aluno_id and tipos.get("aluno") != User.TipoUsuario.ALUNO:
+            raise ValidationError({"aluno": "O usuário selecionado não é um aluno."})
 
-        if self.orientador_id:
-            orientador = getattr(self, "orientador", None)
-            if isinstance(orientador, User) and orientador.tipo != User.TipoUsuario.ORIENTADOR:
-                raise ValidationError(
-                    {"orientador": "O usuário selecionado não é um orientador."}
-                )
+        if self.orientador_id and tipos.get("orientador") != User.TipoUsuario.ORIENTADOR:
+            raise ValidationError(
+                {"orientador": "O usuário selecionado não é um orientador."}
+            )
 
         # Datas coerentes
         if self.data_inicio and self.data_fim_prevista:
@@ -72,11 +87,38 @@ class TemaTCC(models.Model):
                 )
 
         # Regra de negócio de status
-        if self.status != self.Status.PROPOSTO and not self.orientador:
+        if self.status != self.Status.PROPOSTO and not self.orientador_id:
             raise ValidationError(
                 {"status": "Para avançar o status, escolha um orientador."}
             )
 
+    def _tipos_dos_participantes(self):
+        """Tipo do aluno e do orientador: dos objetos já carregados (o formulário e as
+        views atribuem o usuário) ou, para os que não estão, numa única consulta."""
+        from core.models import User
+
+        tipos, faltando = {}, {}
+        for campo in ("aluno", "orientador"):
+            user_id = getattr(self, f"{campo}_id")
+            if not user_id:
+                continue
+            if self._meta.get_field(campo).is_cached(self):
+                tipos[campo] = getattr(self, campo).tipo
+            else:
+                faltando[campo] = user_id
+        if faltando:
+            encontrados = dict(
+                User.objects.filter(pk__in=faltando.values()).values_list("pk", "tipo")
+            )
+            for campo, user_id in faltando.items():
+                tipos[campo] = encontrados.get(user_id)
+        return tipos
+
+    def save(self, *args, **kwargs):
+        # os contadores do painel (tcc.signals) são atualizados na mesma transação
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.titulo
 
@@ -87,12 +129,15 @@ class Entrega(models.Model):
         on_delete=models.CASCADE,
         related_name="entregas",
         verbose_name="Tema",
+        db_index=False,  # coberto por tcc_entrega_tema_data_idx
     )
     titulo = models.CharField("Título", max_length=200)
     arquivo = models.FileField(
         "Arquivo", 
         upload_to="entregas/",
-        validators=[validate_max_file_size, validate_file_extension],
+        storage=entrega_storage,
+        db_index=True,  # contagem de referências ao arquivo (ver tcc.signals)
+        validators=[validate_max_file_size, validate_file_extension, validate_file_signature],
     )
     data_entrega = models.DateField("Data da entrega", default=timezone.localdate)
 
@@ -110,10 +155,21 @@ class Entrega(models.Model):
         help_text="Valor entre 0 e 10.",
     )
 
+    criado_em = models.DateTimeField("Criado em", auto_now_add=True)
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+
+    objects = EntregaQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Entrega"
         verbose_name_plural = "Entregas"
         ordering = ["-data_entrega"]
+        indexes = [
+            # entregas de um tema (ou dos temas de um aluno/orientador), mais recentes primeiro
+            models.Index(fields=["tema", "-data_entrega", "-id"], name="tcc_entrega_tema_data_idx"),
+            # todas as entregas, mais recentes primeiro (admin do Django, exportação por período)
+            models.Index(fields=["-data_entrega", "-id"], name="tcc_entrega_data_idx"),
+        ]
 
     def clean(self):
         super().clean()
@@ -127,5 +183,88 @@ class Entrega(models.Model):
             if self.nota < 0 or self.nota > 10:
                 raise ValidationError({"nota": "A nota deve estar entre 0 e 10."})
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.titulo} - {self.tema.titulo}"
+
+
+class ResumoSistema(models.Model):
+    """Totais do painel do admin, mantidos incrementalmente (ver ``tcc.resumo``)."""
+
+    PK = 1
+
+    total_usuarios = models.IntegerField(default=0)
+    total_temas = models.IntegerField(default=0)
+    total_entregas = models.IntegerField(default=0)
+    temas_propostos = models.IntegerField(default=0)
+    temas_em_andamento = models.IntegerField(default=0)
+    temas_concluidos = models.IntegerField(default=0)
+    temas_cancelados = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Resumo do sistema"
+        verbose_name_plural = "Resumo do sistema"
+
+    @classmethod
+    def obter(cls):
+        # leitura simples (pode ir à réplica); só cria a linha se ainda não existir
+        resumo = cls.objects.filter(pk=cls.PK).first()
+        if resumo is None:
+            resumo, _ = cls.objects.get_or_create(pk=cls.PK)
+        return resumo
+
+    def __str__(self):
+        return "Resumo do sistema"
+
+
+class ResumoOrientador(models.Model):
+    orientador = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="resumo_orientador",
+        verbose_name="Orientador",
+    )
+    entregas_pendentes = models.IntegerField("Entregas pendentes de feedback", default=0)
+
+    class Meta:
+        verbose_name = "Resumo do orientador"
+        verbose_name_plural = "Resumos dos orientadores"
+
+    def __str__(self):
+        return f"Resumo de {self.orientador_id}"
+
+
+class AssinaturaEntrega(models.Model):
+    """Assinatura MinHash do texto de uma entrega (ver ``tcc.similaridade``)."""
+
+    entrega = models.OneToOneField(
+        Entrega,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="assinatura",
+    )
+    minhash = models.BinaryField()
+    total_shingles = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Assinatura de entrega"
+        verbose_name_plural = "Assinaturas de entregas"
+
+
+class BandaLSH(models.Model):
+    entrega = models.ForeignKey(
+        Entrega,
+        on_delete=models.CASCADE,
+        related_name="bandas_lsh",
+    )
+    banda = models.PositiveSmallIntegerField()
+    valor = models.BigIntegerField()
+
+    class Meta:
+        verbose_name = "Banda LSH"
+        verbose_name_plural = "Bandas LSH"
+        indexes = [models.Index(fields=["banda", "valor"], name="tcc_bandalsh_busca_idx")]
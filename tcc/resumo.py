@@ -0,0 +1,92 @@
+"""Manutenção incremental dos contadores do painel.
+
+Os ajustes são feitos com ``UPDATE ... SET campo = campo + n`` dentro da mesma
+transação do ``save``/``delete`` que os originou (ver ``tcc.signals``).
+Operações em massa (``QuerySet.update``, ``bulk_create``) não disparam sinais:
+depois delas, rode ``python manage.py rebuild_resumo``.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Entrega, ResumoOrientador, ResumoSistema, TemaTCC
+
+CAMPO_POR_STATUS = {
+    TemaTCC.Status.PROPOSTO: "temas_propostos",
+    TemaTCC.Status.EM_ANDAMENTO: "temas_em_andamento",
+    TemaTCC.Status.CONCLUIDO: "temas_concluidos",
+    TemaTCC.Status.CANCELADO: "temas_cancelados",
+}
+
+
+def ajustar_resumo(**deltas):
+    deltas = {campo: valor for campo, valor in deltas.items() if valor}
+    if not deltas:
+        return
+    atualizacao = {campo: F(campo) + valor for campo, valor in deltas.items()}
+    if not ResumoSistema.objects.filter(pk=ResumoSistema.PK).update(**atualizacao):
+        # primeira escrita: parte de uma contagem completa em vez de zero
+        reconstruir_resumo()
+
+
+def ajustar_status(status_anterior, status_novo):
+    if status_anterior == status_novo:
+        return
+    deltas = {}
+    if status_anterior in CAMPO_POR_STATUS:
+        deltas[CAMPO_POR_STATUS[status_anterior]] = -1
+    if status_novo in CAMPO_POR_STATUS:
+        deltas[CAMPO_POR_STATUS[status_novo]] = 1
+    ajustar_resumo(**deltas)
+
+
+def ajustar_pendentes(orientador_id, delta):
+    if not orientador_id or not delta:
+        return
+    atualizados = ResumoOrientador.objects.filter(orientador_id=orientador_id).update(
+        entregas_pendentes=F("entregas_pendentes") + delta
+    )
+    if not atualizados:
+        ResumoOrientador.objects.create(
+            orientador_id=orientador_id,
+            entregas_pendentes=_contar_pendentes(orientador_id),
+        )
+
+
+def _contar_pendentes(orientador_id):
+    return Entrega.objects.filter(
+        tema__orientador_id=orientador_id, nota__isnull=True
+    ).count()
+
+
+@transaction.atomic
+def reconstruir_resumo():
+    """Recalcula todos os contadores a partir das tabelas."""
+    User = get_user_model()
+    por_status = dict(
+        TemaTCC.objects.order_by().values_list("status").annotate(total=Count("id"))
+    )
+    valores = {
+        "total_usuarios": User.objects.count(),
+        "total_temas": sum(por_status.values()),
+        "total_entregas": Entrega.objects.count(),
+    }
+    for status, campo in CAMPO_POR_STATUS.items():
+        valores[campo] = por_status.get(status, 0)
+    ResumoSistema.objects.update_or_create(pk=ResumoSistema.PK, defaults=valores)
+
+    pendentes = (
+        User.objects.filter(tipo=User.TipoUsuario.ORIENTADOR)
+        .annotate(
+            pendentes=Count(
+                "temas_como_orientador__entregas",
+                filter=Q(temas_como_orientador__entregas__nota__isnull=True),
+            )
+        )
+        .values_list("pk", "pendentes")
+    )
+    ResumoOrientador.objects.all().delete()
+    ResumoOrientador.objects.bulk_create(
+        ResumoOrientador(orientador_id=pk, entregas_pendentes=total)
+        for pk, total in pendentes
+    )
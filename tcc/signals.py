@@ -0,0 +1,149 @@
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import escopo_usuario, invalidar
+from . import resumo
+from .models import Entrega, TemaTCC
+
+
+def _participantes_do_tema(tema_id):
+    """``(aluno_id, orientador_id)`` do tema, ou ``(None, None)`` se ele não existe mais."""
+    return (
+        TemaTCC.objects.filter(pk=tema_id).values_list("aluno_id", "orientador_id").first()
+        or (None, None)
+    )
+
+
+def _invalidar_participantes(*ids):
+    invalidar("global", *(escopo_usuario(pk) for pk in ids))
+
+
+def _guardar_estado_anterior(instance, campos):
+    """Guarda os valores no banco antes do save, para calcular os deltas no post_save."""
+    instance._estado_anterior = None
+    if instance._state.adding or instance.pk is None:
+        return
+    instance._estado_anterior = (
+        type(instance).objects.filter(pk=instance.pk).values(*campos).first()
+    )
+
+
+# TEMAS
+
+
+@receiver(pre_save, sender=TemaTCC)
+def tema_pre_save(sender, instance, **kwargs):
+    _guardar_estado_anterior(instance, ["status", "orientador_id"])
+
+
+@receiver(post_save, sender=TemaTCC)
+def tema_post_save(sender, instance, created, **kwargs):
+    anterior = getattr(instance, "_estado_anterior", None)
+    invalidar("orientadores")
+
+    if created or anterior is None:
+        _invalidar_participantes(instance.aluno_id, instance.orientador_id)
+        resumo.ajustar_resumo(total_temas=1)
+        resumo.ajustar_status(None, instance.status)
+        return
+
+    _invalidar_participantes(
+        instance.aluno_id, instance.orientador_id, anterior["orientador_id"]
+    )
+    resumo.ajustar_status(anterior["status"], instance.status)
+    if anterior["orientador_id"] != instance.orientador_id:
+        pendentes = instance.entregas.filter(nota__isnull=True).count()
+        resumo.ajustar_pendentes(anterior["orientador_id"], -pendentes)
+        resumo.ajustar_pendentes(instance.orientador_id, pendentes)
+
+
+@receiver(post_delete, sender=TemaTCC)
+def tema_post_delete(sender, instance, **kwargs):
+    invalidar("orientadores")
+    _invalidar_participantes(instance.aluno_id, instance.orientador_id)
+    resumo.ajustar_resumo(total_temas=-1)
+    resumo.ajustar_status(instance.status, None)
+
+
+# ENTREGAS
+
+
+@receiver(pre_save, sender=Entrega)
+def entrega_pre_save(sender, instance, **kwargs):
+    _guardar_estado_anterior(instance, ["tema_id", "nota"])
+
+
+@receiver(post_save, sender=Entrega)
+def entrega_post_save(sender, instance, created, **kwargs):
+    anterior = getattr(instance, "_estado_anterior", None)
+    pendente = instance.nota is None
+    aluno_id, orientador_id = _participantes_do_tema(instance.tema_id)
+    _invalidar_participantes(aluno_id, orientador_id)
+
+    if created or anterior is None:
+        resumo.ajustar_resumo(total_entregas=1)
+        if pendente:
+            resumo.ajustar_pendentes(orientador_id, 1)
+        return
+
+    estava_pendente = anterior["nota"] is None
+    if anterior["tema_id"] == instance.tema_id:
+        if estava_pendente != pendente:
+            resumo.ajustar_pendentes(orientador_id, 1 if pendente else -1)
+        return
+
+    aluno_anterior_id, orientador_anterior_id = _participantes_do_tema(anterior["tema_id"])
+    _invalidar_participantes(aluno_anterior_id, orientador_anterior_id)
+    if estava_pendente:
+        resumo.ajustar_pendentes(orientador_anterior_id, -1)
+    if pendente:
+        resumo.ajustar_pendentes(orientador_id, 1)
+
+
+@receiver(post_delete, sender=Entrega)
+def entrega_post_delete(sender, instance, **kwargs):
+    # o mesmo arquivo pode ser compartilhado por várias entregas (ver tcc.storage)
+    nome = instance.arquivo.name
+    instance.arquivo.storage.delete_if_unreferenced(
+        nome, lambda: Entrega.objects.filter(arquivo=nome).exists()
+    )
+
+    # no delete em cascata de um tema as entregas saem antes do tema
+    aluno_id, orientador_id = _participantes_do_tema(instance.tema_id)
+    _invalidar_participantes(aluno_id, orientador_id)
+    resumo.ajustar_resumo(total_entregas=-1)
+    if instance.nota is None:
+        resumo.ajustar_pendentes(orientador_id, -1)
+
+
+# USUÁRIOS
+
+
+def _invalidar_usuario(instance):
+    # nomes de alunos e orientadores aparecem nas páginas de quem divide temas com eles
+    relacionados = set()
+    for aluno_id, orientador_id in TemaTCC.objects.filter(
+        Q(aluno_id=instance.pk) | Q(orientador_id=instance.pk)
+    ).values_list("aluno_id", "orientador_id"):
+        relacionados.update((aluno_id, orientador_id))
+    relacionados.add(instance.pk)
+    invalidar("orientadores")
+    _invalidar_participantes(*relacionados)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def usuario_post_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        resumo.ajustar_resumo(total_usuarios=1)
+    # o login só atualiza last_login, que não aparece em nenhuma página
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    _invalidar_usuario(instance)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def usuario_post_delete(sender, instance, **kwargs):
+    invalidar("orientadores", "global", escopo_usuario(instance.pk))
+    resumo.ajustar_resumo(total_usuarios=-1)
@@ -0,0 +1,255 @@
+"""Detecção de entregas muito parecidas com MinHash + LSH.
+
+Cada entrega vira um conjunto de *shingles* (sequências de 5 palavras do
+texto extraído). A assinatura MinHash guarda, para cada uma de
+``NUM_PERMUTACOES`` funções de hash, o menor hash do conjunto; a fração de
+posições iguais entre duas assinaturas estima a similaridade de Jaccard.
+A assinatura é dividida em ``NUM_BANDAS`` bandas, e cada banda é gravada em
+``BandaLSH`` (indexada): só as entregas que coincidem em ao menos uma banda
+são comparadas, em vez de todas com todas.
+"""
+import hashlib
+import io
+import logging
+import re
+import struct
+import unicodedata
+import zipfile
+import zlib
+from collections import Counter
+from xml.etree import ElementTree
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import AssinaturaEntrega, BandaLSH, Entrega
+from .validators import extensao
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_SHINGLE = 5
+NUM_PERMUTACOES = 128
+NUM_BANDAS = 32
+LINHAS_POR_BANDA = NUM_PERMUTACOES // NUM_BANDAS
+SIMILARIDADE_MINIMA = 0.3
+LIMITE_TEXTO = 2_000_000  # caracteres; o suficiente para um TCC inteiro
+# bytes descomprimidos por documento (streams do PDF, membros do ZIP/DOCX):
+# um arquivo pequeno e malicioso não consome a memória do worker
+LIMITE_DESCOMPRIMIDO = 64 * 1024 * 1024
+
+# cada chamada ao blake2b com digest de 64 bytes rende 16 hashes de 32 bits
+_HASHES_POR_CHAMADA = 16
+_CHAVES = [
+    f"tcc-minhash-{i}".encode() for i in range(NUM_PERMUTACOES // _HASHES_POR_CHAMADA)
+]
+_FORMATO = f"<{_HASHES_POR_CHAMADA}I"
+_FORMATO_ASSINATURA = f"<{NUM_PERMUTACOES}I"
+
+
+# EXTRAÇÃO DE TEXTO
+
+
+def _texto_pdf(dados):
+    # extração simples, sem dependências: descomprime os streams e junta as
+    # strings dos operadores de texto. Não cobre fontes com codificação própria.
+    partes = []
+    restante = LIMITE_DESCOMPRIMIDO
+    for stream in re.finditer(rb"stream\r?\n(.*?)\r?\nendstream", dados, re.S):
+        if restante <= 0:
+            logger.warning("PDF descomprime mais de %d bytes; o resto foi ignorado", LIMITE_DESCOMPRIMIDO)
+            break
+        conteudo = stream.group(1)
+        try:
+            # o que passa do limite fica em unconsumed_tail, sem ser descomprimido
+            conteudo = zlib.decompressobj().decompress(conteudo, restante)
+        except zlib.error:
+            pass
+        restante -= len(conteudo)
+        for literal in re.findall(rb"\(((?:\\.|[^\\)])*)\)", conteudo):
+            partes.append(literal.decode("latin-1"))
+    return " ".join(partes)
+
+
+def _ler_membro(pacote, info, limite=LIMITE_DESCOMPRIMIDO):
+    """Conteúdo de um membro do ZIP; ``ValueError`` se descomprime mais que ``limite``."""
+    if info.file_size > limite:
+        raise ValueError(f"{info.filename} descomprime {info.file_size} bytes")
+    # o tamanho do cabeçalho pode mentir: a leitura também é limitada
+    with pacote.open(info) as membro:
+        conteudo = membro.read(limite + 1)
+    if len(conteudo) > limite:
+        raise ValueError(f"{info.filename} descomprime mais de {limite} bytes")
+    return conteudo
+
+
+def _texto_docx(dados):
+    with zipfile.ZipFile(io.BytesIO(dados)) as pacote:
+        xml = _ler_membro(pacote, pacote.getinfo("word/document.xml"))
+    return " ".join(ElementTree.fromstring(xml).itertext())
+
+
+def _texto_doc(dados):
+    # Word 97-2003 guarda o texto em UTF-16LE (ou cp1252) no meio do binário
+    trechos = re.findall(rb"(?:[\x20-\x7e\xc0-\xff]\x00){4,}", dados)
+    if trechos:
+        return " ".join(t.decode("utf-16le", "ignore") for t in trechos)
+    return " ".join(t.decode("cp1252") for t in re.findall(rb"[\x20-\x7e\xc0-\xff]{4,}", dados))
+
+
+def _texto_zip(dados):
+    partes = []
+    restante = LIMITE_DESCOMPRIMIDO  # para o pacote todo, não por membro
+    with zipfile.ZipFile(io.BytesIO(dados)) as pacote:
+        for info in pacote.infolist():
+            ext = extensao(info.filename)
+            if info.is_dir() or ext not in EXTRATORES or ext == ".zip":
+                continue
+            try:
+                conteudo = _ler_membro(pacote, info, restante)
+                restante -= len(conteudo)
+                partes.append(EXTRATORES[ext](conteudo))
+            except Exception:
+                logger.warning("não foi possível extrair texto de %s", info.filename)
+    return " ".join(partes)
+
+
+def _texto_puro(dados):
+    return dados.decode("utf-8", "ignore")
+
+
+EXTRATORES = {
+    ".pdf": _texto_pdf,
+    ".docx": _texto_docx,
+    ".doc": _texto_doc,
+    ".zip": _texto_zip,
+    ".txt": _texto_puro,
+}
+
+
+def extrair_texto(fieldfile):
+    extrator = EXTRATORES.get(extensao(fieldfile.name))
+    if extrator is None:
+        return ""
+    with fieldfile.storage.open(fieldfile.name, "rb") as arquivo:
+        dados = arquivo.read()
+    return extrator(dados)[:LIMITE_TEXTO]
+
+
+# MINHASH
+
+
+def _palavras(texto):
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.findall(r"\w+", texto)
+
+
+def shingles(texto):
+    palavras = _palavras(texto)
+    if len(palavras) < TAMANHO_SHINGLE:
+        return {" ".join(palavras)} if palavras else set()
+    return {
+        " ".join(palavras[i : i + TAMANHO_SHINGLE])
+        for i in range(len(palavras) - TAMANHO_SHINGLE + 1)
+    }
+
+
+def assinatura_minhash(conjunto):
+    """Lista com ``NUM_PERMUTACOES`` mínimos, um por função de hash."""
+    if not conjunto:
+        return None
+    colunas = []
+    for chave in _CHAVES:
+        linhas = [
+            struct.unpack(_FORMATO, hashlib.blake2b(s.encode(), key=chave).digest())
+            for s in conjunto
+        ]
+        # zip(*linhas) transpõe em C: um min() por função de hash
+        colunas.extend(min(coluna) for coluna in zip(*linhas))
+    return colunas
+
+
+def bandas(assinatura):
+    for banda in range(NUM_BANDAS):
+        linhas = assinatura[banda * LINHAS_POR_BANDA : (banda + 1) * LINHAS_POR_BANDA]
+        digest = hashlib.blake2b(struct.pack(f"<{LINHAS_POR_BANDA}I", *linhas), digest_size=8)
+        yield banda, int.from_bytes(digest.digest(), "little", signed=True)
+
+
+def similaridade(a, b):
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERMUTACOES
+
+
+def empacotar(assinatura):
+    return struct.pack(_FORMATO_ASSINATURA, *assinatura)
+
+
+def desempacotar(dados):
+    return list(struct.unpack(_FORMATO_ASSINATURA, bytes(dados)))
+
+
+# ÍNDICE
+
+
+def indexar_entrega(entrega):
+    """Calcula e grava a assinatura e as bandas LSH da entrega."""
+    try:
+        texto = extrair_texto(entrega.arquivo)
+    except Exception:
+        logger.exception("falha ao extrair texto da entrega %s", entrega.pk)
+        texto = ""
+    conjunto = shingles(texto)
+    assinatura = assinatura_minhash(conjunto)
+
+    with transaction.atomic():
+        BandaLSH.objects.filter(entrega=entrega).delete()
+        if assinatura is None:
+            AssinaturaEntrega.objects.filter(entrega=entrega).delete()
+            return None
+        AssinaturaEntrega.objects.update_or_create(
+            entrega=entrega,
+            defaults={"minhash": empacotar(assinatura), "total_shingles": len(conjunto)},
+        )
+        BandaLSH.objects.bulk_create(
+            BandaLSH(entrega=entrega, banda=banda, valor=valor)
+            for banda, valor in bandas(assinatura)
+        )
+    return assinatura
+
+
+def entregas_similares(entrega, user, limite=5):
+    """As entregas anteriores mais parecidas: lista de ``(entrega, similaridade)``.
+
+    A busca considera todas as entregas, mas só as que ``user`` pode ver são
+    carregadas: as outras vêm como ``(None, similaridade)``, sem título, tema
+    nem aluno.
+    """
+    registro = AssinaturaEntrega.objects.filter(entrega=entrega).first()
+    if registro is None:
+        return []
+    assinatura = desempacotar(registro.minhash)
+
+    filtro = Q()
+    for banda, valor in bandas(assinatura):
+        filtro |= Q(banda=banda, valor=valor)
+    candidatos = Counter(
+        BandaLSH.objects.filter(filtro, entrega_id__lt=entrega.pk)
+        .values_list("entrega_id", flat=True)
+    )
+    if not candidatos:
+        return []
+
+    pontuacoes = []
+    for entrega_id, minhash in AssinaturaEntrega.objects.filter(
+        entrega_id__in=candidatos
+    ).values_list("entrega_id", "minhash"):
+        valor = similaridade(assinatura, desempacotar(minhash))
+        if valor >= SIMILARIDADE_MINIMA:
+            pontuacoes.append((entrega_id, valor))
+    pontuacoes.sort(key=lambda item: item[1], reverse=True)
+    pontuacoes = pontuacoes[:limite]
+
+    entregas = Entrega.objects.visible_to(user).in_bulk(
+        [entrega_id for entrega_id, _ in pontuacoes]
+    )
+    return [(entregas.get(entrega_id), valor) for entrega_id, valor in pontuacoes]
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from .validators import extensao
+
+NOME_CONTEUDO = re.compile(r"^(?P<pasta>.+)/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})(?P<ext>\.\w+)?$")
+
+
+def hash_arquivo(content):
+    """SHA-256 do arquivo; usa o valor calculado no upload quando disponível."""
+    digest = getattr(content, "sha256", None)
+    if digest:
+        return digest
+    sha = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return sha.hexdigest()
+
+
+def nome_por_conteudo(pasta, digest, ext):
+    return f"{pasta}/{digest[:2]}/{digest}{ext}"
+
+
+class ConteudoEnderecadoStorage(FileSystemStorage):
+    """Guarda cada arquivo pelo hash do conteúdo: ``entregas/ab/abcd...ef.pdf``.
+
+    Uploads idênticos apontam para o mesmo arquivo em disco, que só é gravado
+    uma vez. Como o nome é derivado do conteúdo, nunca é preciso sufixo para
+    evitar colisões, e sobrescrever (numa corrida entre dois uploads iguais)
+    grava os mesmos bytes.
+
+    Um arquivo sem referências sai do lugar antes da última checagem
+    (``delete_if_unreferenced``), e um upload igual que o encontrou e só
+    confirma depois disso o grava de novo no seu commit: nenhuma entrega
+    fica apontando para um arquivo removido.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(*args, **kwargs)
+
+    def _save(self, name, content):
+        pasta = os.path.dirname(name) or "arquivos"
+        nome = nome_por_conteudo(pasta, hash_arquivo(content), extensao(name))
+        if self.exists(nome):
+            # a entrega que removeria o arquivo pode confirmar antes desta
+            transaction.on_commit(lambda: self._regravar_se_ausente(nome, content))
+            return nome
+        return super()._save(nome, content)
+
+    def _regravar_se_ausente(self, nome, content):
+        if not self.exists(nome):
+            super()._save(nome, content)
+
+    def delete_if_unreferenced(self, name, referenciado):
+        """Remove ``name`` depois do commit se ``referenciado()`` for falso."""
+        if not name:
+            return
+
+        def _remover():
+            if referenciado():
+                return
+            # tira o arquivo do lugar e checa de novo: uma entrega confirmada
+            # entre as duas checagens o devolve; uma confirmada depois não o
+            # encontra e o grava de novo (ver _save)
+            caminho = self.path(name)
+            removendo = f"{caminho}.removendo-{uuid.uuid4().hex}"
+            try:
+                os.replace(caminho, removendo)
+            except FileNotFoundError:
+                return
+            if referenciado():
+                os.replace(removendo, caminho)
+            else:
+                os.remove(removendo)
+
+        transaction.on_commit(_remover)
+
+
+entrega_storage_instance = ConteudoEnderecadoStorage()
+
+
+def entrega_storage():
+    return entrega_storage_instance
@@ -0,0 +1,72 @@
+"""Geração de arquivos em fluxo, para ``StreamingHttpResponse``.
+
+Os geradores daqui produzem ``bytes`` aos poucos, sem montar o arquivo
+inteiro em memória nem em disco.
+"""
+import csv
+import time
+import zipfile
+
+
+class _Eco:
+    """Pseudo-arquivo cujo ``write`` só devolve o que recebeu (para o csv.writer)."""
+
+    def write(self, valor):
+        return valor
+
+
+class _Saida:
+    """Pseudo-arquivo só de escrita, esvaziado a cada bloco gerado.
+
+    Sem ``seek``/``tell`` o ``zipfile`` grava os tamanhos e CRCs em
+    *data descriptors* depois de cada arquivo, como exige um fluxo.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def csv_em_fluxo(cabecalho, linhas):
+    """Gera o CSV linha a linha. Começa com BOM para o Excel reconhecer o UTF-8."""
+    escritor = csv.writer(_Eco())
+    yield "﻿" + escritor.writerow(cabecalho)
+    for linha in linhas:
+        yield escritor.writerow(linha)
+
+
+def zip_em_fluxo(entradas):
+    """Gera um ZIP a partir de ``entradas``.
+
+    Cada entrada é ``(nome, blocos, compressao, tamanho)``: ``blocos`` é um
+    iterável de ``bytes``, ``compressao`` uma constante do ``zipfile`` e
+    ``tamanho`` o tamanho final, se conhecido. Com o tamanho o ``zipfile``
+    decide sozinho se precisa de ZIP64; sem ele, o arquivo deve ter menos de 2 GiB.
+    """
+    saida = _Saida()
+    agora = time.localtime()[:6]
+    with zipfile.ZipFile(saida, "w") as pacote:
+        for nome, blocos, compressao, tamanho in entradas:
+            info = zipfile.ZipInfo(nome, date_time=agora)
+            info.compress_type = compressao
+            if tamanho is not None:
+                info.file_size = tamanho
+            with pacote.open(info, "w") as destino:
+                for bloco in blocos:
+                    destino.write(bloco)
+                    dados = saida.retirar()
+                    if dados:
+                        yield dados
+            yield saida.retirar()
+    yield saida.retirar()
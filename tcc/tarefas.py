@@ -0,0 +1,12 @@
+from core.tarefas import tarefa
+
+from .models import Entrega
+from .similaridade import indexar_entrega
+
+
+@tarefa("tcc.indexar_entrega")
+def indexar(entrega_id):
+    entrega = Entrega.objects.filter(pk=entrega_id).first()
+    if entrega is None:
+        return  # excluída antes de ser processada
+    indexar_entrega(entrega)
@@ -0,0 +1,286 @@
+"""Número de consultas das listas e do download, por perfil, planos das
+consultas das listas de temas e entregas, busca de temas, entregas similares,
+exportação e escritas concorrentes de entregas.
+
+Com o ``LocMemCache`` dos testes (``core.executor_testes``) o cache de
+páginas e o do usuário ficam desligados (``core.cache.compartilhado``): toda
+requisição vai ao banco, e a conta é a de uma requisição sem cache. A sessão
+(``cached_db``) vem do cache. As contagens não podem crescer com o número de
+temas e entregas.
+"""
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.models import User
+from core.tests import PlanoDeConsultaMixin
+
+from .busca import TABELA_BUSCA, buscar_temas
+from .exportacao import _sem_formulas
+from .management.commands.stress_sqlite import PDF, _escrever
+from .models import Entrega, TemaTCC
+from .similaridade import indexar_entrega
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def criar_usuario(username, tipo, **campos):
+    return User.objects.create(
+        username=username,
+        tipo=tipo,
+        nome_completo=username.title(),
+        email=f"{username}@exemplo.com",
+        **campos,
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ConsultasPorPaginaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = criar_usuario("admin", User.TipoUsuario.ADMIN, is_staff=True)
+        cls.orientador = criar_usuario("orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        cls.aluno = criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="1")
+        outro = criar_usuario("outro", User.TipoUsuario.ALUNO, matricula="2")
+        for aluno in (cls.aluno, outro):
+            for numero in range(3):
+                tema = TemaTCC.objects.create(
+                    titulo=f"Tema {numero} de {aluno.username}",
+                    descricao="Descrição",
+                    aluno=aluno,
+                    orientador=cls.orientador,
+                    status=TemaTCC.Status.EM_ANDAMENTO,
+                )
+                for versao in range(3):
+                    entrega = Entrega(tema=tema, titulo=f"Versão {versao}")
+                    conteudo = ContentFile(f"{tema.pk}:{versao}".encode())
+                    entrega.arquivo.save("entrega.txt", conteudo, save=False)
+                    entrega.save()
+        cls.tema = TemaTCC.objects.filter(aluno=cls.aluno).first()
+        cls.entrega = cls.tema.entregas.first()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, usuario, url, consultas):
+        self.client.force_login(usuario)
+        with self.assertNumQueries(consultas):
+            resposta = self.client.get(url)
+            if resposta.streaming:
+                b"".join(resposta.streaming_content)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta
+
+    def test_lista_de_temas(self):
+        url = reverse("tcc:tema_list")
+        for usuario in (self.admin, self.orientador, self.aluno):
+            with self.subTest(usuario=usuario.username):
+                self.get(usuario, url, 3)
+
+    def test_lista_de_entregas(self):
+        url = reverse("tcc:entrega_list", args=[self.tema.pk])
+        for usuario in (self.admin, self.orientador, self.aluno):
+            with self.subTest(usuario=usuario.username):
+                self.get(usuario, url, 4)
+
+    def test_download(self):
+        url = reverse("tcc:entrega_download", args=[self.entrega.pk])
+        for usuario in (self.admin, self.orientador, self.aluno):
+            with self.subTest(usuario=usuario.username):
+                self.get(usuario, url, 2)
+
+
+class PlanosDasConsultasTests(PlanoDeConsultaMixin, TestCase):
+    """As consultas das listas e do painel, como as views as montam: cada uma
+    filtra e ordena pelo índice, sem ler a tabela inteira."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = criar_usuario("admin", User.TipoUsuario.ADMIN, is_staff=True)
+        cls.orientador = criar_usuario("orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        cls.aluno = criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="1")
+        for numero in range(3):
+            tema = TemaTCC.objects.create(
+                titulo=f"Tema {numero}",
+                descricao="Descrição",
+                aluno=cls.aluno,
+                orientador=cls.orientador,
+                status=TemaTCC.Status.EM_ANDAMENTO,
+            )
+            for versao in range(3):
+                Entrega.objects.create(tema=tema, titulo=f"Versão {versao}")
+        cls.tema = tema
+
+    def temas(self, usuario, **filtros):
+        return TemaTCC.objects.visible_to(usuario).for_list().filter(**filtros).order_by("titulo", "id")[:25]
+
+    def test_temas_do_aluno(self):
+        indice = self.indice_unico(TemaTCC._meta.db_table, ["aluno_id", "titulo"])
+        self.assertUsaIndice(self.temas(self.aluno), indice)
+        self.assertUsaIndice(self.temas(self.aluno, status=TemaTCC.Status.EM_ANDAMENTO), indice)
+
+    def test_temas_do_orientador(self):
+        self.assertUsaIndice(self.temas(self.orientador), "tcc_tema_orient_titulo_idx")
+        self.assertUsaIndice(
+            self.temas(self.orientador, status=TemaTCC.Status.EM_ANDAMENTO), "tcc_tema_orient_titulo_idx"
+        )
+
+    def test_temas_do_admin(self):
+        self.assertUsaIndice(self.temas(self.admin), "tcc_tema_titulo_idx", percorre=True)
+
+    def test_ultimas_entregas(self):
+        for usuario in (self.aluno, self.orientador):
+            with self.subTest(usuario=usuario.username):
+                self.assertUsaIndice(
+                    Entrega.objects.visible_to(usuario).order_by("-data_entrega")[:5],
+                    "tcc_entrega_tema_data_idx",
+                )
+
+    def test_entregas_do_tema(self):
+        self.assertUsaIndice(
+            Entrega.objects.filter(tema=self.tema).order_by("-data_entrega", "-id"),
+            "tcc_entrega_tema_data_idx",
+        )
+
+    def test_entregas_no_admin_do_django(self):
+        # changelist do admin do Django: ordering do modelo mais "-pk"
+        self.assertUsaIndice(
+            Entrega.objects.select_related("tema").order_by("-data_entrega", "-pk")[:100],
+            "tcc_entrega_data_idx",
+            percorre=True,
+        )
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "índice FTS5 do SQLite")
+class BuscaDeTemasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.orientador = criar_usuario("orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        cls.aluno = criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="1")
+        cls.temas = {
+            titulo: TemaTCC.objects.create(
+                titulo=titulo, descricao=descricao, aluno=cls.aluno, orientador=cls.orientador
+            )
+            for titulo, descricao in (
+                ("Redes neurais", "Redes neurais para redes de sensores e redes móveis."),
+                ("Compiladores", "Otimização de código."),
+                ("Banco de dados", "Replicação em redes."),
+            )
+        }
+
+    def buscar(self, termo):
+        return buscar_temas(TemaTCC.objects.visible_to(self.aluno).for_list(), termo)
+
+    def test_mais_relevantes_primeiro(self):
+        self.assertEqual(
+            [tema.titulo for tema in self.buscar("rede")], ["Redes neurais", "Banco de dados"]
+        )
+        self.assertEqual([tema.titulo for tema in self.buscar("otimiz códi")], ["Compiladores"])
+        self.assertEqual(list(self.buscar("inexistente")), [])
+
+    def test_junta_o_indice_uma_vez(self):
+        # filtro e relevância da mesma linha do índice, sem subconsulta por tema
+        sql = str(self.buscar("rede").query)
+        self.assertEqual(sql.count("MATCH"), 1)
+        self.assertNotIn(f"FROM {TABELA_BUSCA}", sql)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class EntregasSimilaresTests(TestCase):
+    """O aviso de entregas semelhantes no feedback mostra título, tema e aluno
+    só das entregas que o orientador pode ver; das outras, só a porcentagem."""
+
+    TEXTO = " ".join(f"palavra{numero}" for numero in range(200))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.orientador = criar_usuario("orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        outro_orientador = criar_usuario("outro_orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        cls.entregas = {}
+        for orientador, aluno in (
+            (outro_orientador, criar_usuario("aluno_de_outro", User.TipoUsuario.ALUNO, matricula="1")),
+            (cls.orientador, criar_usuario("colega", User.TipoUsuario.ALUNO, matricula="2")),
+            (cls.orientador, criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="3")),
+        ):
+            tema = TemaTCC.objects.create(
+                titulo=f"Tema de {aluno.username}", descricao="Descrição", aluno=aluno, orientador=orientador
+            )
+            entrega = Entrega(tema=tema, titulo=f"Entrega de {aluno.username}")
+            entrega.arquivo.save("entrega.txt", ContentFile(cls.TEXTO.encode()), save=False)
+            entrega.save()
+            indexar_entrega(entrega)
+            cls.entregas[aluno.username] = entrega
+
+    def test_entregas_de_outros_orientadores_sem_detalhes(self):
+        self.client.force_login(self.orientador)
+        resposta = self.client.get(reverse("tcc:entrega_feedback", args=[self.entregas["aluno"].pk]))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertCountEqual(
+            [(outra, round(valor, 2)) for outra, valor in resposta.context["similares"]],
+            [(self.entregas["colega"], 1.0), (None, 1.0)],
+        )
+        self.assertContains(resposta, "Entrega de colega")
+        self.assertContains(resposta, "Entrega de um tema a que você não tem acesso")
+        self.assertNotContains(resposta, "aluno_de_outro")
+        self.assertNotContains(resposta, "Aluno_De_Outro")
+
+
+class ExportacaoTests(TestCase):
+    def test_textos_que_virariam_formula(self):
+        linha = ["=1+1", "+1", "-1", "@SOMA(A1)", "\t=1+1", "\r=1+1", "Título", "", 7.5, None]
+        self.assertEqual(
+            next(_sem_formulas([linha])),
+            ["'=1+1", "'+1", "'-1", "'@SOMA(A1)", "'\t=1+1", "'\r=1+1", "Título", "", 7.5, None],
+        )
+
+
+@unittest.skipIf(
+    connection.vendor == "sqlite" and not settings.SQLITE_OTIMIZADO,
+    "escritas concorrentes no SQLite pedem SQLITE_OTIMIZADO (WAL, BEGIN IMMEDIATE e busy_timeout)",
+)
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class EscritasConcorrentesTests(TransactionTestCase):
+    """Processos criando e avaliando entregas ao mesmo tempo no banco de testes
+    (um arquivo), como o ``stress_sqlite``: nenhuma escrita falha com
+    ``database is locked`` e todas as entregas confirmadas estão no banco."""
+
+    PROCESSOS = 4
+    ESCRITAS = 25
+
+    def test_entregas_em_varios_processos(self):
+        aluno = criar_usuario("aluno", User.TipoUsuario.ALUNO, matricula="1")
+        orientador = criar_usuario("orientador", User.TipoUsuario.ORIENTADOR, area_atuacao="IA")
+        tema = TemaTCC.objects.create(
+            titulo="Tema", descricao="Descrição", aluno=aluno, orientador=orientador,
+            status=TemaTCC.Status.EM_ANDAMENTO,
+        )
+        arquivo = Entrega._meta.get_field("arquivo").storage.save("entregas/stress.pdf", ContentFile(PDF))
+
+        # os filhos herdam as configurações do teste (fork), mas não as conexões abertas
+        connections.close_all()
+        contexto = multiprocessing.get_context("fork")
+        resultados = contexto.Queue()
+        filhos = [
+            contexto.Process(target=_escrever, args=(tema.pk, arquivo, self.ESCRITAS, seed, resultados))
+            for seed in range(self.PROCESSOS)
+        ]
+        for filho in filhos:
+            filho.start()
+        coletados = [resultados.get(timeout=120) for _ in filhos]
+        for filho in filhos:
+            filho.join()
+
+        self.assertEqual([erro for r in coletados for erro in r["erros"]], [])
+        self.assertEqual(
+            Entrega.objects.filter(tema=tema).count(), sum(r["criadas"] for r in coletados)
+        )
+        self.assertEqual(sum(len(r["tempos"]) for r in coletados), self.PROCESSOS * self.ESCRITAS)
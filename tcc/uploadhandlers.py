@@ -0,0 +1,76 @@
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from .validators import (
+    EXTENSOES_PERMITIDAS,
+    MENSAGEM_ASSINATURA,
+    MENSAGEM_EXTENSAO,
+    MENSAGEM_TAMANHO,
+    TAMANHO_ASSINATURA,
+    TAMANHO_MAXIMO,
+    assinatura_confere,
+    extensao,
+)
+
+# espaço para os demais campos e os cabeçalhos do multipart
+FOLGA_MULTIPART = 256 * 1024
+
+
+class EntregaUploadHandler(FileUploadHandler):
+    """Valida o arquivo de uma entrega enquanto o upload chega.
+
+    Deve ser o primeiro handler da lista: repassa os chunks para os handlers
+    padrão do Django e interrompe o upload (sem ler o resto do corpo) assim
+    que o tamanho, a extensão ou os primeiros bytes não conferem. Calcula o
+    SHA-256 do arquivo na mesma passada.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.erros = {}
+        self.hashes = {}
+        self._excede_tamanho = False
+        self._hash = None
+        self._cabecalho = b""
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self._excede_tamanho = content_length > TAMANHO_MAXIMO + FOLGA_MULTIPART
+        return None
+
+    def _abortar(self, mensagem):
+        self.erros[self.field_name] = mensagem
+        raise StopUpload(connection_reset=True)
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self._hash = hashlib.sha256()
+        self._cabecalho = b""
+        if extensao(file_name) not in EXTENSOES_PERMITIDAS:
+            self._abortar(MENSAGEM_EXTENSAO)
+        if self._excede_tamanho:
+            self._abortar(MENSAGEM_TAMANHO)
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > TAMANHO_MAXIMO:
+            self._abortar(MENSAGEM_TAMANHO)
+
+        if len(self._cabecalho) < TAMANHO_ASSINATURA:
+            self._cabecalho += raw_data[: TAMANHO_ASSINATURA - len(self._cabecalho)]
+            if len(self._cabecalho) >= TAMANHO_ASSINATURA and not assinatura_confere(
+                extensao(self.file_name), self._cabecalho
+            ):
+                self._abortar(MENSAGEM_ASSINATURA)
+
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        # arquivos menores que a maior assinatura só são checados aqui
+        if len(self._cabecalho) < TAMANHO_ASSINATURA and not assinatura_confere(
+            extensao(self.file_name), self._cabecalho
+        ):
+            self.erros[self.field_name] = MENSAGEM_ASSINATURA
+        else:
+            self.hashes[self.field_name] = self._hash.hexdigest()
+        return None  # o arquivo é montado pelo próximo handler
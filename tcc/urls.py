@@ -13,9 +13,14 @@ urlpatterns = [
     # Entregas
     path("temas/<int:tema_id>/entregas/", views.entrega_list_view, name="entrega_list"),
     path("temas/<int:tema_id>/entregas/nova/", views.entrega_create_view, name="entrega_create"),
+    path("temas/<int:tema_id>/entregas/zip/", views.entrega_zip_tema_view, name="entrega_zip_tema"),
     path("entregas/<int:entrega_id>/feedback/", views.entrega_feedback_view, name="entrega_feedback"),
+    path("entregas/<int:entrega_id>/download/", views.entrega_download_view, name="entrega_download"),
+    path("entregas/exportar/", views.entrega_export_view, name="entrega_export"),
 
     # Orientadores
     path("orientadores/", views.OrientadorListView.as_view(), name="orientador_list"),
+    path("orientadores/buscar/", views.orientador_autocomplete_view, name="orientador_autocomplete"),
     path("orientadores/<int:pk>/", views.orientador_detail_view, name="orientador_detail"),
+    path("orientadores/<int:pk>/entregas/zip/", views.entrega_zip_orientador_view, name="entrega_zip_orientador"),
 ]
@@ -1,13 +1,48 @@
 import os
 from django.core.exceptions import ValidationError
 
+TAMANHO_MAXIMO = 10 * 1024 * 1024  # 10 MB
+EXTENSOES_PERMITIDAS = [".pdf", ".doc", ".docx", ".zip"]
+
+# primeiros bytes esperados para cada extensão
+ASSINATURAS = {
+    ".pdf": (b"%PDF-",),
+    ".doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),  # OLE2 (Word 97-2003)
+    ".docx": (b"PK\x03\x04",),
+    ".zip": (b"PK\x03\x04", b"PK\x05\x06"),  # o segundo é um zip vazio
+}
+TAMANHO_ASSINATURA = max(len(a) for sigs in ASSINATURAS.values() for a in sigs)
+
+MENSAGEM_TAMANHO = "O arquivo não pode ter mais que 10MB."
+MENSAGEM_EXTENSAO = "Tipo de arquivo não permitido. Use PDF, DOC, DOCX ou ZIP."
+MENSAGEM_ASSINATURA = "O conteúdo do arquivo não corresponde à extensão informada."
+
+
+def extensao(nome):
+    return os.path.splitext(nome or "")[1].lower()
+
+
+def assinatura_confere(ext, cabecalho):
+    return any(cabecalho.startswith(a) for a in ASSINATURAS.get(ext, ()))
+
+
 def validate_max_file_size(value):
-    limit = 10 * 1024 * 1024  # 10 MB
-    if value.size > limit:
-        raise ValidationError("O arquivo não pode ter mais que 10MB.")
+    if value.size > TAMANHO_MAXIMO:
+        raise ValidationError(MENSAGEM_TAMANHO)
 
 def validate_file_extension(value):
-    ext = os.path.splitext(value.name)[1].lower()
-    allowed_extensions = [".pdf", ".doc", ".docx", ".zip"]
-    if ext not in allowed_extensions:
-        raise ValidationError("Tipo de arquivo não permitido. Use PDF, DOC, DOCX ou ZIP.")
+    if extensao(value.name) not in EXTENSOES_PERMITIDAS:
+        raise ValidationError(MENSAGEM_EXTENSAO)
+
+def validate_file_signature(value):
+    ext = extensao(value.name)
+    if ext not in ASSINATURAS or getattr(value, "_committed", False):
+        # extensão inválida já é tratada por validate_file_extension, e
+        # arquivos já gravados não precisam ser relidos a cada edição
+        return
+    posicao = value.tell() if hasattr(value, "tell") else 0
+    value.seek(0)
+    cabecalho = value.read(TAMANHO_ASSINATURA)
+    value.seek(posicao)
+    if not assinatura_confere(ext, cabecalho):
+        raise ValidationError(MENSAGEM_ASSINATURA)
@@ -1,31 +1,79 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied, ValidationError
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Count
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.cache import patch_cache_control
+from django.utils.http import content_disposition_header
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 from django.contrib import messages
 
+from core.assincrono import adaptar_fluxo
+from core.cache import escopo_usuario, obter_ou_calcular
+from core.condicional import condicional
 from core.models import User
-from .forms import EntregaFeedbackForm, EntregaForm, TemaTCCForm
+from core.pagination import KeysetPaginationMixin, paginate_keyset
+from core.permissoes import (
+    AVALIAR,
+    EDITAR,
+    ENVIAR_ENTREGA,
+    EXCLUIR,
+    VER,
+    exigir_no_tema,
+    pode_no_tema,
+    pode_ver_usuario,
+)
+from core.profiling import orcamento_consultas
+from core.tarefas import enfileirar
+from .busca import LIMITE_RESULTADOS, buscar_orientadores, buscar_temas
+from .downloads import nome_para_download, resposta_zip, servir_arquivo
+from .exportacao import FORMATOS, exportar, filtrar_entregas, nome_do_arquivo
+from .forms import EntregaFeedbackForm, EntregaForm, ExportarEntregasForm, TemaTCCForm
 from .models import Entrega, TemaTCC
+from .similaridade import entregas_similares
+from .uploadhandlers import EntregaUploadHandler
 
 
 # TEMAS
 
 
-class TemaListView(LoginRequiredMixin, ListView):
+def _versao_temas(request):
+    return TemaTCC.objects.permitidos(request.user, VER).versao()
+
+
+@method_decorator(condicional(_versao_temas), name="dispatch")
+class TemaListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = TemaTCC
     template_name = "tcc/tema_list.html"
+    orcamento_consultas = 3
     context_object_name = "temas"
+    keyset_ordering = ("titulo", "id")
 
     def get_queryset(self):
-        user = self.request.user
-        if user.tipo == User.TipoUsuario.ALUNO:
-            return TemaTCC.objects.filter(aluno=user)
-        if user.tipo == User.TipoUsuario.ORIENTADOR:
-            return TemaTCC.objects.filter(orientador=user)
-        return TemaTCC.objects.all()  # ADMIN vê tudo
+        self.termo = self.request.GET.get("q", "").strip()
+        queryset = TemaTCC.objects.visible_to(self.request.user).for_list()
+        if self.termo:
+            queryset = buscar_temas(queryset, self.termo)
+        return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.termo:
+            # resultados da busca vêm por relevância: mostra só os mais relevantes
+            return None, None, list(queryset[:LIMITE_RESULTADOS]), False
+        return super().paginate_queryset(queryset, page_size)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["termo"] = self.termo
+        return context
 
 
 class TemaCreateView(LoginRequiredMixin, CreateView):
@@ -35,7 +83,8 @@ class TemaCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy("tcc:tema_list")
 
     def dispatch(self, request, *args, **kwargs):
-        if request.user.tipo != User.TipoUsuario.ALUNO:
+        # anônimos seguem para o LoginRequiredMixin, que redireciona para o login
+        if request.user.is_authenticated and request.user.tipo != User.TipoUsuario.ALUNO:
             raise PermissionDenied("Somente alunos podem criar temas.")
         return super().dispatch(request, *args, **kwargs)
 
@@ -68,14 +117,9 @@ class TemaUpdateView(LoginRequiredMixin, UpdateView):
     context_object_name = "tema"
 
     def get_queryset(self):
-        user = self.request.user
-        if user.tipo == User.TipoUsuario.ALUNO:
-            return TemaTCC.objects.filter(aluno=user)
-        if user.tipo == User.TipoUsuario.ORIENTADOR:
-            return TemaTCC.objects.filter(orientador=user)
-        if user.tipo == User.TipoUsuario.ADMIN:
-            return TemaTCC.objects.all()
-        return TemaTCC.objects.none()
+        return TemaTCC.objects.permitidos(self.request.user, EDITAR).select_related(
+            "aluno", "orientador"
+        )
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
@@ -100,51 +144,76 @@ class TemaDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy("tcc:tema_list")
 
     def get_queryset(self):
-        user = self.request.user
-        if user.tipo == User.TipoUsuario.ALUNO:
-            return TemaTCC.objects.filter(aluno=user)
-        if user.tipo == User.TipoUsuario.ORIENTADOR:
-            return TemaTCC.objects.filter(orientador=user)
-        if user.tipo == User.TipoUsuario.ADMIN:
-            return TemaTCC.objects.all()
-        return TemaTCC.objects.none()
+        return TemaTCC.objects.permitidos(self.request.user, EXCLUIR)
 
 
 # ENTREGAS
 
 
+def _versao_entregas(request, tema_id):
+    return TemaTCC.objects.permitidos(request.user, VER).filter(pk=tema_id).versao()
+
+
+@orcamento_consultas(4)
 @login_required
-def entrega_list_view(request, tema_id):
-    tema = get_object_or_404(TemaTCC, id=tema_id)
-    entregas = tema.entregas.all().order_by("-data_entrega")
-    return render(
+@condicional(_versao_entregas)
+async def entrega_list_view(request, tema_id):
+    user = await request.auser()
+    tema = await aget_object_or_404(TemaTCC.objects.visible_to(user), id=tema_id)
+    page = await sync_to_async(paginate_keyset)(request, tema.entregas.all(), ("-data_entrega", "-id"))
+    return await sync_to_async(render)(
         request,
         "tcc/entrega_list.html",
-        {"tema": tema, "entregas": entregas},
+        {
+            "tema": tema,
+            "entregas": page.object_list,
+            "page_obj": page,
+            "pode_enviar": pode_no_tema(user, tema, ENVIAR_ENTREGA),
+            "pode_avaliar": pode_no_tema(user, tema, AVALIAR),
+        },
     )
 
 
+# O CSRF é verificado em _entrega_form, depois que o handler de upload foi
+# instalado: a verificação lê request.POST, o que dispara o parse do corpo.
+@csrf_exempt
 @login_required
-def entrega_create_view(request, tema_id):
-    tema = get_object_or_404(TemaTCC, id=tema_id)
+async def entrega_create_view(request, tema_id):
+    user = await request.auser()
+    tema = await aget_object_or_404(TemaTCC, id=tema_id)
 
     # Apenas aluno dono do tema (ou admin) pode criar entrega
-    if request.user != tema.aluno and request.user.tipo != User.TipoUsuario.ADMIN:
-        raise PermissionDenied("Você não pode enviar entrega para este tema.")
+    exigir_no_tema(user, tema, ENVIAR_ENTREGA, "Você não pode enviar entrega para este tema.")
+
+    upload_handler = EntregaUploadHandler(request)
+    request.upload_handlers.insert(0, upload_handler)
+    # Em ASGI o corpo já foi recebido sem ocupar uma thread; o parse do
+    # multipart, a validação e a gravação do arquivo são síncronos.
+    return await sync_to_async(_entrega_form)(request, tema, upload_handler)
 
+
+@csrf_protect
+def _entrega_form(request, tema, upload_handler):
     if request.method == "POST":
+        arquivo = request.FILES.get("arquivo")
+        if arquivo is not None:
+            arquivo.sha256 = upload_handler.hashes.get("arquivo")
         form = EntregaForm(
             request.POST,
             request.FILES,
             user=request.user,
             tema=tema,
+            erro_upload=upload_handler.erros.get("arquivo"),
         )
         if form.is_valid():
             entrega = form.save(commit=False)
             entrega.tema = tema
             try:
                 entrega.full_clean()
-                entrega.save()
+                with transaction.atomic():
+                    entrega.save()
+                    # extração de texto e similaridade ficam para o worker (run_workers)
+                    enfileirar("tcc.indexar_entrega", entrega_id=entrega.pk)
                 messages.success(request, "Entrega salva com sucesso!")
             except ValidationError as e:
                 messages.error(request, f"Erro ao salvar entrega: {e.message}")
@@ -166,15 +235,11 @@ def entrega_create_view(request, tema_id):
 
 @login_required
 def entrega_feedback_view(request, entrega_id):
-    entrega = get_object_or_404(Entrega, id=entrega_id)
+    entrega = get_object_or_404(Entrega.objects.select_related("tema"), id=entrega_id)
     tema = entrega.tema
 
     # Apenas orientador do tema ou admin pode avaliar
-    if not (
-        request.user.tipo == User.TipoUsuario.ADMIN
-        or (request.user.tipo == User.TipoUsuario.ORIENTADOR and tema.orientador == request.user)
-    ):
-        raise PermissionDenied("Você não pode avaliar esta entrega.")
+    exigir_no_tema(request.user, tema, AVALIAR, "Você não pode avaliar esta entrega.")
 
     if request.method == "POST":
         form = EntregaFeedbackForm(request.POST, instance=entrega, user=request.user)
@@ -189,7 +254,7 @@ def entrega_feedback_view(request, entrega_id):
                 return render(
                     request,
                     "tcc/entrega_feedback_form.html",
-                    {"form": form, "entrega": entrega},
+                    {"form": form, "entrega": entrega, "similares": entregas_similares(entrega, request.user)},
                 )
             return redirect("tcc:entrega_list", tema_id=tema.id)
     else:
@@ -198,28 +263,140 @@ def entrega_feedback_view(request, entrega_id):
     return render(
         request,
         "tcc/entrega_feedback_form.html",
-        {"form": form, "entrega": entrega},
+        {"form": form, "entrega": entrega, "similares": entregas_similares(entrega, request.user)},
+    )
+
+
+@orcamento_consultas(3)
+@login_required
+async def entrega_download_view(request, entrega_id):
+    user = await request.auser()
+    # a checagem de acesso e a leitura do nome do arquivo são uma única consulta
+    entrega = await aget_object_or_404(
+        Entrega.objects.visible_to(user)
+        .select_related(None)
+        .only("id", "titulo", "arquivo"),
+        id=entrega_id,
+    )
+    if not entrega.arquivo:
+        raise Http404("Entrega sem arquivo.")
+    resposta = await sync_to_async(servir_arquivo)(request, entrega.arquivo, nome_para_download(entrega))
+    # em ASGI o arquivo sai em blocos, lidos fora do event loop
+    return adaptar_fluxo(request, resposta)
+
+
+@login_required
+def entrega_zip_tema_view(request, tema_id):
+    tema = get_object_or_404(
+        TemaTCC.objects.visible_to(request.user).select_related(None).only("id", "titulo"),
+        id=tema_id,
+    )
+    resposta = resposta_zip(Entrega.objects.filter(tema=tema), f"entregas - {tema.titulo}")
+    return adaptar_fluxo(request, resposta, usa_banco=True)
+
+
+@login_required
+def entrega_zip_orientador_view(request, pk):
+    if not pode_ver_usuario(request.user, pk):
+        raise PermissionDenied("Você não pode baixar as entregas deste orientador.")
+    orientador = get_object_or_404(User, pk=pk, tipo=User.TipoUsuario.ORIENTADOR)
+    resposta = resposta_zip(
+        Entrega.objects.filter(tema__orientador=orientador),
+        f"entregas - {orientador.nome_completo or orientador.username}",
+    )
+    return adaptar_fluxo(request, resposta, usa_banco=True)
+
+
+@login_required
+def entrega_export_view(request):
+    if request.user.tipo not in (User.TipoUsuario.ADMIN, User.TipoUsuario.ORIENTADOR):
+        raise PermissionDenied("Você não pode exportar as entregas.")
+
+    # o formulário é enviado por GET: sem "formato" é só a página com os filtros
+    form = ExportarEntregasForm(request.GET or None, user=request.user)
+    if not form.is_valid():
+        return render(request, "tcc/entrega_export.html", {"form": form})
+
+    dados = form.cleaned_data
+    entregas = filtrar_entregas(
+        Entrega.objects.visible_to(request.user),
+        status=dados["status"],
+        orientador=dados.get("orientador"),
+        data_inicio=dados["data_inicio"],
+        data_fim=dados["data_fim"],
     )
+    formato = dados["formato"]
+    resposta = StreamingHttpResponse(exportar(entregas, formato), content_type=FORMATOS[formato][0])
+    resposta["Content-Disposition"] = content_disposition_header(True, nome_do_arquivo(formato))
+    return adaptar_fluxo(request, resposta, usa_banco=True)
 
 
 # ORIENTADORES
 
 
-class OrientadorListView(LoginRequiredMixin, ListView):
+class OrientadorListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = User
     template_name = "tcc/orientador_list.html"
+    orcamento_consultas = 3
     context_object_name = "orientadores"
+    keyset_ordering = ("nome_completo", "id")
 
     def get_queryset(self):
-        return User.objects.filter(tipo=User.TipoUsuario.ORIENTADOR, is_active=True)
+        return User.objects.filter(
+            tipo=User.TipoUsuario.ORIENTADOR, is_active=True
+        ).annotate(total_temas=Count("temas_como_orientador"))
+
+    def fetch_page(self, queryset, cursor, page_size):
+        # a lista é a mesma para todos os usuários: a chave não inclui o usuário
+        return obter_ou_calcular(
+            "orientador_list",
+            ["orientadores"],
+            lambda: super(OrientadorListView, self).fetch_page(queryset, cursor, page_size),
+            extra=f"{cursor}:{page_size}",
+        )
+
+
+LIMITE_AUTOCOMPLETE = 20
 
 
+@orcamento_consultas(3)
+@login_required
+def orientador_autocomplete_view(request):
+    """Orientadores ativos para o ``OrientadorAutocomplete`` (JSON), por prefixo do nome ou da área."""
+    termo = request.GET.get("q", "").strip()[:100]
+
+    def resultados():
+        orientadores = User.objects.filter(tipo=User.TipoUsuario.ORIENTADOR, is_active=True)
+        if termo:
+            orientadores = buscar_orientadores(orientadores, termo)
+        orientadores = orientadores.only("id", "username", "nome_completo", "area_atuacao")
+        return [
+            {"id": o.pk, "texto": str(o)}
+            for o in orientadores.order_by("nome_completo", "id")[:LIMITE_AUTOCOMPLETE]
+        ]
+
+    # a mesma busca digitada por qualquer usuário: a chave não inclui o usuário
+    dados = obter_ou_calcular(
+        "orientador_autocomplete",
+        ["orientadores"],
+        resultados,
+        extra=hashlib.md5(termo.lower().encode(), usedforsecurity=False).hexdigest(),
+    )
+    resposta = JsonResponse({"resultados": dados})
+    patch_cache_control(resposta, private=True, max_age=60)
+    return resposta
+
+
+@orcamento_consultas(4)
 @login_required
 def orientador_detail_view(request, pk):
-    orientador = get_object_or_404(User, pk=pk, tipo=User.TipoUsuario.ORIENTADOR)
-    temas = TemaTCC.objects.filter(orientador=orientador)
+    def contexto():
+        orientador = get_object_or_404(User, pk=pk, tipo=User.TipoUsuario.ORIENTADOR)
+        temas = list(TemaTCC.objects.filter(orientador=orientador).select_related("aluno"))
+        return {"orientador": orientador, "temas": temas}
+
     return render(
         request,
         "tcc/orientador_detail.html",
-        {"orientador": orientador, "temas": temas},
+        obter_ou_calcular("orientador_detail", [escopo_usuario(pk)], contexto, extra=str(pk)),
     )